@@ -1,10 +1,22 @@
 from openai import OpenAI
-from typing import Dict, Any, Union
-from environment import PokemonShowdownEnv, GameState, Pokemon, PokemonMove, Player
+from typing import Callable, Dict, Any, Optional, Tuple, Union
+from environment import PokemonShowdownEnv
+from game_state import GameState, Pokemon
+from type_chart import get_type_chart, format_effectiveness
+from memory import ConversationMemory
+from observation_encoder import ObservationEncoder
+from decision_cache import DecisionCache, decision_key
+from tree_search import LookaheadSearch, opponent_replies
+from damage_calc import DamageCalculator, is_damaging
+from description_dex import get_ability_dex, get_item_dex
+from rag_index import EmbeddingIndex
 import os
 from dotenv import load_dotenv
 import re
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # TODO: RAG For Type Matchups (Optimization)
 # TODO: Disillation from larger model to smaller model (Optimization)
@@ -17,244 +29,7 @@ import time
 # TODO: Clean code (functions and classes)
 
 
-class Agent:
-    def __init__(self, client: OpenAI, env: GameState, system: str = "") -> None:
-        self.client = client
-        self.system = system
-        self.env = env
-        self.messages: list = []
-        if self.system:
-            self.messages.append({"role": "system", "content": system})
-
-    def __call__(self, observation: Union[Dict[str, Any], str], print_message: bool = False) -> str:
-        if isinstance(observation, dict):
-            message = self.format_observation(observation, self.env)
-        else:
-            message = observation
-        self.messages.append({"role": "user", "content": message})
-        print(f"{message}")
-        
-        # Write message to a text file
-        with open("pokemonshowdown/conversation_log.txt", "a", encoding="utf-8") as f:
-            f.write(f"User: {message}\n")
-        
-        result = self.execute()
-        self.messages.append({"role": "assistant", "content": result})
-        print(f"{result}")
-        
-        # Write result to the same text file
-        with open("pokemonshowdown/conversation_log.txt", "a", encoding="utf-8") as f:
-            f.write(f"Assistant: {result}\n\n")
-        
-        #return self.parse_action(result)
-        return result
-
-    def execute(self):
-        completion = self.client.chat.completions.create(
-            messages=self.messages,
-            model="meta-llama/llama-3.1-405b-instruct",
-            extra_body={
-                "temperature": 0.0,
-                #"max_tokens": 100,
-                "provider": {"order": ["Fireworks", "OctoAI"], 
-                },
-            },
-        )
-        return completion.choices[0].message.content
-    
-    def battle_loop(self, max_iterations=100):
-        observation = self.env.reset()
-        done = False
-        i = 0
-
-        while not done and i < max_iterations:
-            i += 1
-            
-            result = self(observation)
-            #print(result)
-
-            if "PAUSE" in result:
-                action = re.findall(r"Action: (select_move|switch_pokemon): (.+)", result, re.IGNORECASE)
-                if action:
-                    action_type, action_name = action[0]
-                    action_dict = {
-                        "type": "move" if action_type == "select_move" else "switch",
-                        f"{'move' if action_type == 'select_move' else 'switch'}_name": action_name
-                    }
-                    if action_type == "select_move" and action_name == "Terastallize":
-                        observation = self.env.step(action_dict)
-                        #next_prompt = f"Observation: {observation}"
-                        #self.messages.append({"role": "user", "content": next_prompt})
-                        #print(next_prompt)
-                        continue
-                    observation, _, _, _ = self.env.step(action_dict)
-                    #next_prompt = f"Observation: Action taken. New game state:\n{self.format_observation(observation, self.env)}"
-                    #self.messages.append({"role": "user", "content": next_prompt})
-                    #print(next_prompt)
-                else:
-                    print("Observation: Invalid action")
-                continue
-
-            if "Answer:" in result:
-                end_result = self.parse_action(result)
-                #observation, reward, done, info = self.env.step(end_result)
-                observation, _, _, _ = self.env.step(end_result)
-                print(f"End Results: {end_result}")
-                break
-
-        self.env.close()
-        #return reward
-    
-    
-
-    def format_observation(self, observation: Dict[str, Any], env: GameState) -> str:
-        active_pokemon = observation['p1 Active Pokemon']
-        opponent_pokemon = observation['p2 Active Pokemon']
-        
-        message = f"""Current game state:
-                    Turn: {observation['turn']}
-                    
-                    Recent battle events:
-                    {observation['chat_log']}
-                    
-                    Terastallize Available: {"Yes" if self.env.game_state.player.can_terastallize else "No"}
-
-                    Your active Pokémon: {active_pokemon.name} (Level {active_pokemon.level})
-                    Current Types: {', '.join(active_pokemon.current_types)}
-                    Base Types: {', '.join(active_pokemon.base_types)}
-                    Terastallized: {"Yes" if active_pokemon.terastallized else "No"}
-                    Tera Type: {active_pokemon.tera_type}
-                    HP: {active_pokemon.current_hp}/{active_pokemon.max_hp} ({active_pokemon.hp_percentage}%)
-                    Ability: {active_pokemon.ability}
-                    Item: {active_pokemon.item}
-                    Stats: {self.format_stats(active_pokemon.current_stats)}
-
-                    Available moves:
-                    {self.format_moves(active_pokemon.moves)}
-
-                    Opponent's active Pokémon: {opponent_pokemon.name} (Level {opponent_pokemon.level})
-                    Current Types: {', '.join(opponent_pokemon.current_types)}
-                    Base Types: {', '.join(opponent_pokemon.base_types)}
-                    Terastallized: {"Yes" if opponent_pokemon.terastallized else "No"}
-                    Tera Type: {opponent_pokemon.tera_type}
-                    HP: {opponent_pokemon.hp_percentage}%
-                    Possible abilities: {', '.join(opponent_pokemon.possible_abilities)}
-                    Opponent Speed Range: {opponent_pokemon.opponent_speed_range}
-
-                    Your team:
-                    {self.format_team(observation['p1 Team Revealed'])}
-
-                    Opponent's revealed Pokémon:
-                    {self.format_team(observation['p2 Team Revealed'])}
-
-                    What action do you want to take? Analyze the situation, considering factors including, but not limited to:
-                        1. Recent battle events and their impact on the current state
-                        2. Type matchups for both active Pokémon and potential switches
-                        3. Abilities of active Pokémon and known abilities of team members
-                        4. Available moves for the active Pokémon and known moves of team members
-                        5. Potential Terastallization strategies for the active Pokémon and team members
-                        6. Items held by the active Pokémon and team members
-                        7. Current HP and status conditions of all Pokémon
-                        8. Potential threats from the opponent's revealed Pokémon
-
-                    Based on this analysis, decide whether to use a move with the active Pokémon or switch to another Pokémon that may have an advantage in the current situation. Consider both offensive and defensive strategies, as well as any other relevant factors not explicitly listed above. Be sure to take into account the recent battle events and how they affect your decision.
-                """
-
-        return message
-
-    def format_moves(self, moves):
-        formatted_moves = []
-        for i, move in enumerate(moves):
-            move_info = f"{i+1}. {move.name} (Type: {move.type}, Category: {move.category}, "
-            move_info += f"Power: {move.power if move.power else 'N/A'}, "
-            move_info += f"Accuracy: {move.accuracy if move.accuracy else 'N/A'}, "
-            move_info += f"PP: {move.current_pp}/{move.max_pp})"
-            if move.description:
-                move_info += f"\n   Description: {move.description}"
-            formatted_moves.append(move_info)
-        return "\n".join(formatted_moves)
-
-    def format_team(self, team):
-        formatted_team = []
-        for pokemon in team:
-            pokemon_info = f"- {pokemon.name} (Level {pokemon.level})"
-            pokemon_info += f"\n  Current Types: {', '.join(pokemon.current_types)}"
-            pokemon_info += f"\n  Base Types: {', '.join(pokemon.base_types)}"
-            pokemon_info += f"\n  Terastallized: {'Yes' if pokemon.terastallized else 'No'}"
-            if pokemon.tera_type != 'Unknown':
-                pokemon_info += f"\n  Tera Type: {pokemon.tera_type}"
-            else:
-                pokemon_info += f"\n  Tera Type: Not known"
-            pokemon_info += f"\n  HP: {pokemon.hp_percentage}%"
-            if pokemon.ability:
-                pokemon_info += f"\n  Ability: {pokemon.ability}"
-            else:
-                pokemon_info += f"\n  Ability: Not known"
-            if pokemon.item:
-                pokemon_info += f"\n  Item: {pokemon.item}"
-            else:
-                pokemon_info += f"\n  Item: Not known"
-                
-            # Add moves information
-            pokemon_info += "\n  Moves:"
-            if pokemon.moves:
-                for i, move in enumerate(pokemon.moves, 1):
-                    move_info = f"\n    {i}. {move.name}"
-                    if move.type:
-                        move_info += f" (Type: {move.type}"
-                        if move.category:
-                            move_info += f", Category: {move.category}"
-                        move_info += ")"
-                    if move.power is not None:
-                        move_info += f"\n       Power: {move.power}"
-                    if move.accuracy:
-                        move_info += f", Accuracy: {move.accuracy}"
-                    if move.current_pp is not None and move.max_pp is not None:
-                        move_info += f", PP: {move.current_pp}/{move.max_pp}"
-                    else: 
-                        move_info += f", PP: Not known"
-                    if move.description:
-                        move_info += f"\n       Description: {move.description}"
-                    pokemon_info += move_info
-            else:
-                pokemon_info += "\n    Moves not known"
-                
-            formatted_team.append(pokemon_info)
-        return "\n".join(formatted_team)
-
-    def format_stats(self, stats):
-        if not stats:
-            return "Unknown"
-        return ", ".join([f"{stat}: {value}" for stat, value in stats.items()])
-
-    def parse_action(self, message: str) -> Dict[str, Any]:
-        lines = message.strip().split('\n')
-        action_line = None
-        for line in lines:
-            if line.lower().startswith("action:"):
-                action_line = line.lower()
-                break
-        
-        if action_line is None:
-            raise ValueError(f"No action found in the message:\n{message}")
-
-        if "move:" in action_line:
-            move_name = action_line.split('move:')[1].strip()
-            return {"type": "move", "move_name": move_name}
-        elif "switch:" in action_line:
-            pokemon_name = action_line.split('switch:')[1].strip()
-            return {"type": "switch", "switch_name": pokemon_name}
-        else:
-            raise ValueError(f"Invalid action format: {action_line}")
-        
-def main():
-    load_dotenv()
-    
-    env = PokemonShowdownEnv(username="Poke214915", password="LLMAgent1234")
-    client = OpenAI(api_key=os.getenv("OPENROUTER_API_KEY"), 
-                    base_url="https://openrouter.ai/api/v1",)
-    
-    system_prompt = """
+SYSTEM_PROMPT = """
     You are an AI agent playing Pokémon Showdown. Your task is to make strategic decisions in battles.
     You run in a loop of Thought, Action, PAUSE, Observation.
     At the end of the loop, you output an Answer, which should be your final action decision.
@@ -536,11 +311,615 @@ def main():
 
     Now it's your turn to analyze the battle situation and make strategic decisions. Remember, Terastallization is a new mechanic that changes the current type of the Pokémon into whatever the Tera type is, but can only be used by one pokemon per team. This can be used to gain type advantages or remove weaknesses during battle. When you choose to Terastallize, you must also select a move to use in the same turn.
     """.strip()
+
+
+# A finished action or answer line; once one is streamed the rest of the reasoning isn't needed to act
+DECISION_LINE = re.compile(r"^(Action: (?:select_move|switch_pokemon): .+|Answer: .+)$", re.IGNORECASE | re.MULTILINE)
+
+
+class Agent:
+    def __init__(self, client: OpenAI, env: GameState, system: str = "",
+                 log_path: str = "pokemonshowdown/conversation_log.txt", llm_semaphore=None,
+                 memory: ConversationMemory = None, delta_observations: bool = False, full_every: int = 5,
+                 cache_hints: bool = False, stream: bool = False, decision_cache: DecisionCache = None,
+                 model: str = "meta-llama/llama-3.1-405b-instruct", votes: int = 1, vote_temperature: float = 0.7,
+                 search: LookaheadSearch = None, damage_calculator: DamageCalculator = None,
+                 rag_index: EmbeddingIndex = None, rag_k: int = 8) -> None:
+        self.client = client
+        self.model = model
+        self.system = system
+        self.env = env
+        self.log_path = log_path
+        # Shared by concurrent agents to cap the number of in-flight LLM requests
+        self.llm_semaphore = llm_semaphore
+        self.type_chart = get_type_chart()
+        self.memory = memory or ConversationMemory(system)
+        self.token_usage: list = []
+        # Mark the static prompt prefix with cache_control for providers that need explicit hints
+        self.cache_hints = cache_hints
+        self.team_sheet = None
+        # Stream completions and act on the first complete Action line
+        self.stream = stream
+        self.log_lock = threading.Lock()
+        self.usage_lock = threading.Lock()
+        self.background_logs: list = []
+        # Self-consistency: sample `votes` completions in parallel and take the majority action
+        self.votes = max(votes, 1)
+        # Exact-state decision reuse across turns and battles; only valid for single temperature 0 completions
+        if decision_cache is not None and self.votes > 1:
+            print("Decision cache disabled: voting samples at a non-zero temperature")
+            decision_cache = None
+        self.decision_cache = decision_cache
+        self.vote_temperature = vote_temperature
+        self.vote_history: list = []
+        # Lookahead search picks the action directly instead of a free-form completion
+        self.search = search
+        self.pending_move = None
+        # Damage ranges and KO chances in the observation; clearly dominated moves lose their descriptions
+        self.damage_calculator = damage_calculator
+        # Retrieve the few descriptions relevant to this turn instead of listing every move's description
+        self.rag_index = rag_index
+        self.rag_k = rag_k
+        # (kind, name) of items and abilities already explained this battle
+        self.described = set()
+        self.item_dex = get_item_dex()
+        self.ability_dex = get_ability_dex()
+        # Delta observations only make sense if earlier turns stay in the prompt
+        self.observation_encoder = None
+        if delta_observations and self.memory.policy != "latest":
+            if self.memory.policy in ("window", "summary"):
+                # The last full observation has to stay inside the window for the deltas to be readable
+                full_every = min(full_every, self.memory.window_turns)
+            self.observation_encoder = ObservationEncoder(self, full_every=full_every)
+
+    @property
+    def messages(self) -> list:
+        # What actually gets sent, after the memory policy is applied
+        return self.memory.messages()
+
+    def __call__(self, observation: Union[Dict[str, Any], str], print_message: bool = False) -> str:
+        notes = self.format_new_descriptions(observation) if isinstance(observation, dict) else ""
+        if isinstance(observation, dict) and self.observation_encoder:
+            message = self.observation_encoder.encode(observation)
+        elif isinstance(observation, dict):
+            message = self.format_observation(observation, self.env)
+        else:
+            message = observation
+        if notes:
+            message = f"{message}\n\n{notes}"
+        # Follow-ups like the Terastallize confirmation belong to the same turn
+        self.memory.add_user(message, new_turn=isinstance(observation, dict))
+        print(f"{message}")
+        
+        # Write message to a text file
+        self.write_log(f"User: {message}\n")
+        
+        key = None
+        if self.decision_cache is not None and isinstance(observation, dict):
+            key = decision_key(observation, self.env.game_state.player.can_terastallize, self.model, self.system)
+            result = self.decision_cache.get(key)
+        else:
+            result = None
+        if result is not None:
+            print("Decision cache hit, skipping the LLM call")
+        elif self.pending_move and not isinstance(observation, dict):
+            # Second half of a Terastallize + move line chosen by the search
+            result = f"Action: select_move: {self.pending_move}\nPAUSE"
+            self.pending_move = None
+        elif self.search is not None and isinstance(observation, dict):
+            result = self.search_decision()
+        else:
+            result = self.execute()
+            if key is not None and result:
+                self.decision_cache.put(key, result)
+        self.memory.add_assistant(result)
+        print(f"{result}")
+        
+        # Write result to the same text file
+        self.write_log(f"Assistant: {result}\n\n")
+        
+        #return self.parse_action(result)
+        return result
+
+    def search_decision(self) -> str:
+        self.pending_move = None
+        found = self.search.search(self.env.game_state)
+        if found.candidate is None:
+            return self.execute()
+        candidate = found.candidate
+        thought = (f"Thought: Lookahead search chose to {candidate.describe().lower()} "
+                   f"(score {found.score if found.score is not None else 'n/a'}, {found.evaluated} lines evaluated, "
+                   f"{found.cache_hits} reused, {found.elapsed:.1f}s{', out of time' if found.timed_out else ''}).")
+        if candidate.action["type"] == "switch":
+            return f"{thought}\nAction: switch_pokemon: {candidate.action['switch_name']}\nPAUSE"
+        if candidate.terastallize:
+            self.pending_move = candidate.action["move_name"]
+            return f"{thought}\nAction: select_move: Terastallize\nPAUSE"
+        return f"{thought}\nAction: select_move: {candidate.action['move_name']}\nPAUSE"
+
+    def write_log(self, text: str):
+        # Streamed reasoning is finished off in the background, so writes can come from two threads
+        with self.log_lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(text)
+
+    def execute(self):
+        messages = self.messages
+        usage = self.memory.token_report(messages)
+        self.token_usage.append(usage)
+        print(f"Prompt tokens: {usage['prompt_tokens']} (full history: {usage['full_history_tokens']}, "
+              f"saved: {usage['saved_tokens']})")
+        if self.cache_hints:
+            messages = self.apply_cache_hints(messages)
+        start = time.time()
+        if self.votes > 1:
+            result = self.vote(messages, usage)
+        else:
+            result = self.request(messages, 0.0, usage)
+        usage["decision_seconds"] = time.time() - start
+        return result
+
+    def request(self, messages: list, temperature: float, usage: dict = None,
+                cancelled: threading.Event = None) -> Optional[str]:
+        # Every request holds its own llm_semaphore slot, so votes and search evaluations count against the cap;
+        # a streamed response keeps its slot until the background reader has finished with it
+        if self.llm_semaphore is not None:
+            self.llm_semaphore.acquire()
+        release = self.llm_semaphore.release if self.llm_semaphore is not None else None
+        try:
+            if cancelled is not None and cancelled.is_set():
+                return None
+            # Streams only report usage when asked to, in an extra final chunk
+            stream_options = {"stream_options": {"include_usage": True}} if self.stream else {}
+            completion = self.client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                stream=self.stream,
+                **stream_options,
+                extra_body={
+                    "temperature": temperature,
+                    #"max_tokens": 100,
+                    "provider": {"order": ["Fireworks", "OctoAI"], 
+                    },
+                },
+            )
+            if self.stream:
+                text, release = self.read_stream(completion, usage, release)
+                return text
+            if usage is not None:
+                self.record_cache_usage(usage, completion)
+            return completion.choices[0].message.content
+        finally:
+            if release is not None:
+                release()
+
+    def vote(self, messages: list, usage: dict) -> str:
+        # Parallel requests rather than n>1, which most OpenRouter providers ignore
+        counts = Counter()
+        responses = {}
+        received = 0
+        # Requests still waiting for a slot when the vote is decided give it back without calling the API
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.votes)
+        futures = [executor.submit(self.request, messages, self.vote_temperature, usage, cancelled)
+                   for _ in range(self.votes)]
+        try:
+            for future in as_completed(futures):
+                received += 1
+                try:
+                    response = future.result()
+                except Exception as e:
+                    print(f"Vote request failed: {str(e)}")
+                    continue
+                match = DECISION_LINE.search(response or "")
+                choice = " ".join(match.group(1).lower().split()) if match else None
+                counts[choice] += 1
+                responses.setdefault(choice, response)
+                ranked = [count for choice, count in counts.most_common() if choice is not None]
+                # Stop once the leader can't be caught by the votes still outstanding
+                if ranked and ranked[0] > (ranked[1] if len(ranked) > 1 else 0) + self.votes - received:
+                    break
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        valid = [(choice, count) for choice, count in counts.most_common() if choice is not None]
+        self.vote_history.append(dict(counts))
+        usage["votes"] = dict(counts)
+        if not valid:
+            return responses.get(None, "")
+        choice, count = valid[0]
+        print(f"Self-consistency: '{choice}' won with {count}/{received} votes ({self.votes} requested)")
+        return responses[choice]
+
+    def read_stream(self, stream, usage: dict = None, release: Callable = None) -> Tuple[str, Optional[Callable]]:
+        # Return as soon as a full Action/Answer line has arrived; the tail is logged by a background thread,
+        # which takes over `release` (so the caller gets None back) and calls it once the stream has ended
+        text = ""
+        chunks = iter(stream)
+        for chunk in chunks:
+            self.record_stream_usage(usage, chunk)
+            if not chunk.choices:
+                continue
+            text += chunk.choices[0].delta.content or ""
+            complete = text[:text.rfind("\n") + 1]
+            match = DECISION_LINE.search(complete)
+            if match:
+                decision = text[:match.end()]
+                if match.group(1).lower().startswith("action:"):
+                    decision += "\nPAUSE"
+                thread = threading.Thread(target=self.finish_stream,
+                                          args=(chunks, text[match.end():], usage, release), daemon=True)
+                thread.start()
+                self.background_logs.append(thread)
+                return decision, None
+        return text, release
+
+    def finish_stream(self, chunks, tail: str, usage: dict = None, release: Callable = None):
+        try:
+            for chunk in chunks:
+                self.record_stream_usage(usage, chunk)
+                if chunk.choices:
+                    tail += chunk.choices[0].delta.content or ""
+        except Exception as e:
+            tail += f"\n[stream error: {str(e)}]"
+        finally:
+            if release is not None:
+                release()
+        if tail.strip():
+            self.write_log(f"Assistant (after action was taken): {tail.strip()}\n\n")
+
+    def apply_cache_hints(self, messages: list) -> list:
+        # Anthropic-style breakpoint on the last static message; everything before it is cached
+        prefix_length = self.memory.prefix_length()
+        if not prefix_length:
+            return messages
+        messages = list(messages)
+        last = messages[prefix_length - 1]
+        messages[prefix_length - 1] = {
+            "role": last["role"],
+            "content": [{"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}],
+        }
+        return messages
+
+    def record_cache_usage(self, usage: dict, completion):
+        # Providers that cache automatically report the reused prefix in prompt_tokens_details. Votes and
+        # background stream readers report into the same dict from several threads, so counts are summed
+        reported = getattr(completion, "usage", None)
+        details = getattr(reported, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None)
+        with self.usage_lock:
+            if reported is not None:
+                usage["billed_prompt_tokens"] = (usage.get("billed_prompt_tokens") or 0) + \
+                    (getattr(reported, "prompt_tokens", None) or 0)
+            if cached is not None:
+                usage["cached_tokens"] = usage.get("cached_tokens", 0) + cached
+        if cached is not None:
+            print(f"Cached prompt tokens: {cached}")
+
+    def record_stream_usage(self, usage: dict, chunk):
+        if usage is not None and getattr(chunk, "usage", None) is not None:
+            self.record_cache_usage(usage, chunk)
+
+    def set_battle_prefix(self, observation):
+        # Built once per battle so the system prompt plus team sheet stay byte-identical every turn
+        self.described = set()
+        if not isinstance(observation, dict) or not observation.get("p1 Team Revealed"):
+            self.team_sheet = None
+            self.memory.set_prefix([])
+            return
+        self.team_sheet = self.format_team_sheet(observation["p1 Team Revealed"])
+        self.memory.set_prefix([
+            {"role": "user", "content": f"Your team for this battle:\n{self.team_sheet}"},
+            {"role": "assistant", "content": "Understood."},
+        ])
+    
+    def battle_loop(self, max_iterations=100):
+        observation = self.env.reset()
+        self.set_battle_prefix(observation)
+        if self.observation_encoder:
+            self.observation_encoder.reset()
+        done = False
+        reward = 0
+        i = 0
+
+        while not done and i < max_iterations:
+            i += 1
+            
+            result = self(observation)
+            #print(result)
+
+            if "PAUSE" in result:
+                action = re.findall(r"Action: (select_move|switch_pokemon): (.+)", result, re.IGNORECASE)
+                if action:
+                    action_type, action_name = action[0]
+                    action_dict = {
+                        "type": "move" if action_type == "select_move" else "switch",
+                        f"{'move' if action_type == 'select_move' else 'switch'}_name": action_name
+                    }
+                    if action_type == "select_move" and action_name == "Terastallize":
+                        observation = self.env.step(action_dict)
+                        #next_prompt = f"Observation: {observation}"
+                        #self.messages.append({"role": "user", "content": next_prompt})
+                        #print(next_prompt)
+                        continue
+                    observation, reward, done, _ = self.env.step(action_dict)
+                    #next_prompt = f"Observation: Action taken. New game state:\n{self.format_observation(observation, self.env)}"
+                    #self.messages.append({"role": "user", "content": next_prompt})
+                    #print(next_prompt)
+                else:
+                    print("Observation: Invalid action")
+                continue
+
+            if "Answer:" in result:
+                end_result = self.parse_action(result)
+                #observation, reward, done, info = self.env.step(end_result)
+                observation, _, _, _ = self.env.step(end_result)
+                print(f"End Results: {end_result}")
+                break
+
+        for thread in self.background_logs:
+            thread.join(timeout=30)
+        self.background_logs = []
+        if self.decision_cache is not None:
+            print(f"Decision cache: {self.decision_cache.stats()}")
+        self.env.close()
+        return reward
+    
+    
+
+    def format_observation(self, observation: Dict[str, Any], env: GameState) -> str:
+        active_pokemon = observation['p1 Active Pokemon']
+        opponent_pokemon = observation['p2 Active Pokemon']
+        
+        message = f"""Current game state:
+                    Turn: {observation['turn']}
+                    
+                    Recent battle events:
+                    {observation['chat_log']}
+                    
+                    Terastallize Available: {"Yes" if self.env.game_state.player.can_terastallize else "No"}
+
+                    Your active Pokémon: {active_pokemon.name} (Level {active_pokemon.level})
+                    Current Types: {', '.join(active_pokemon.current_types)}
+                    Base Types: {', '.join(active_pokemon.base_types)}
+                    Terastallized: {"Yes" if active_pokemon.terastallized else "No"}
+                    Tera Type: {active_pokemon.tera_type}
+                    HP: {active_pokemon.current_hp}/{active_pokemon.max_hp} ({active_pokemon.hp_percentage}%)
+                    Ability: {active_pokemon.ability}
+                    Item: {active_pokemon.item}
+                    Stats: {self.format_stats(active_pokemon.current_stats)}
+
+                    Available moves:
+                    {self.format_moves(active_pokemon.moves, opponent_pokemon, describe=self.describe_moves)}
+                    {self.format_threats(opponent_pokemon, active_pokemon)}
+
+                    Opponent's active Pokémon: {opponent_pokemon.name} (Level {opponent_pokemon.level})
+                    Current Types: {', '.join(opponent_pokemon.current_types)}
+                    Base Types: {', '.join(opponent_pokemon.base_types)}
+                    Terastallized: {"Yes" if opponent_pokemon.terastallized else "No"}
+                    Tera Type: {opponent_pokemon.tera_type}
+                    HP: {opponent_pokemon.hp_percentage}%
+                    Possible abilities: {', '.join(opponent_pokemon.possible_abilities)}
+                    Opponent Speed Range: {opponent_pokemon.opponent_speed_range}
+
+                    Your team:
+                    {self.format_team(observation['p1 Team Revealed'], describe=self.describe_moves)}
+
+                    Opponent's revealed Pokémon:
+                    {self.format_team(observation['p2 Team Revealed'], describe=self.rag_index is None)}
+
+                    {self.format_relevant_descriptions(observation)}
+
+                    What action do you want to take? Analyze the situation, considering factors including, but not limited to:
+                        1. Recent battle events and their impact on the current state
+                        2. Type matchups for both active Pokémon and potential switches
+                        3. Abilities of active Pokémon and known abilities of team members
+                        4. Available moves for the active Pokémon and known moves of team members
+                        5. Potential Terastallization strategies for the active Pokémon and team members
+                        6. Items held by the active Pokémon and team members
+                        7. Current HP and status conditions of all Pokémon
+                        8. Potential threats from the opponent's revealed Pokémon
+
+                    Based on this analysis, decide whether to use a move with the active Pokémon or switch to another Pokémon that may have an advantage in the current situation. Consider both offensive and defensive strategies, as well as any other relevant factors not explicitly listed above. Be sure to take into account the recent battle events and how they affect your decision.
+                """
+
+        return message
+
+    @property
+    def describe_moves(self) -> bool:
+        # Our move descriptions are already in the team sheet or come from retrieval
+        return self.team_sheet is None and self.rag_index is None
+
+    def format_relevant_descriptions(self, observation: Dict[str, Any]) -> str:
+        if self.rag_index is None:
+            return ""
+        active, opponent = observation['p1 Active Pokemon'], observation['p2 Active Pokemon']
+        # Entities on the field first, then whatever the recent events are about
+        names = []
+        for pokemon in (active, opponent):
+            if pokemon is None:
+                continue
+            names += [move.name for move in pokemon.moves if move.name != "Terastallize"]
+            names += [pokemon.ability, pokemon.item] if pokemon.ability else [pokemon.item, *pokemon.possible_abilities]
+        found, seen = [], set()
+        for name in names:
+            document = self.rag_index.lookup(name) if name else None
+            if document and (document["kind"], document["name"]) in self.described:
+                continue
+            if document and document["name"] not in seen:
+                seen.add(document["name"])
+                found.append(document)
+        if len(found) < self.rag_k and observation.get('chat_log'):
+            for document in self.rag_index.search(observation['chat_log'], self.rag_k):
+                if document["name"] not in seen:
+                    seen.add(document["name"])
+                    found.append(document)
+        lines = [f"- {d['name']} ({d['kind']}): {d['text']}" for d in found[:self.rag_k] if d["text"]]
+        return "Relevant descriptions:\n" + "\n".join(lines) if lines else ""
+
+    def describe_entity(self, kind: str, name: str) -> Optional[str]:
+        # Description the first time an item or ability comes up this battle, None after that
+        dex = self.item_dex if kind == "item" else self.ability_dex
+        if not name or name not in dex:
+            return None
+        key = (kind, dex.display_name(name))
+        if key in self.described:
+            return None
+        self.described.add(key)
+        return dex.describe(name)
+
+    def format_new_descriptions(self, observation: Dict[str, Any]) -> str:
+        lines = []
+        for pokemon in observation['p1 Team Revealed'] + observation['p2 Team Revealed']:
+            abilities = [pokemon.ability] if pokemon.ability else pokemon.possible_abilities
+            for kind, name in [("ability", ability) for ability in abilities] + [("item", pokemon.item)]:
+                description = self.describe_entity(kind, name)
+                if description:
+                    lines.append(f"- {name} ({kind}): {description}")
+        return "New items and abilities:\n" + "\n".join(lines) if lines else ""
+
+    def format_moves(self, moves, target: Pokemon = None, describe: bool = True):
+        formatted_moves = []
+        damage, dominated = {}, {}
+        if self.damage_calculator and target and not target.fainted:
+            matrix = self.damage_calculator.matrix(self.env.game_state.player.active_pokemon, moves, [target])
+            damage = {move.name: matrix.range(i, 0) for i, move in enumerate(moves) if is_damaging(move)}
+            dominated = matrix.dominated(0)
+        for i, move in enumerate(moves):
+            move_info = f"{i+1}. {move.name} (Type: {move.type}, Category: {move.category}, "
+            move_info += f"Power: {move.power if move.power else 'N/A'}, "
+            move_info += f"Accuracy: {move.accuracy if move.accuracy else 'N/A'}, "
+            move_info += f"PP: {move.current_pp}/{move.max_pp}"
+            if target and target.current_types and move.power and move.category and move.category.lower() != "status":
+                multiplier = self.type_chart.effectiveness(move.type, target.current_types)
+                move_info += f", Effectiveness vs {target.name}: {format_effectiveness(multiplier)}"
+            if move.name in damage:
+                move_info += f", Damage: {damage[move.name].describe()}"
+            move_info += ")"
+            if move.name in dominated:
+                move_info += f" - not worth considering: {dominated[move.name]}"
+            elif move.description and (describe or move.name == "Terastallize"):
+                move_info += f"\n   Description: {move.description}"
+            formatted_moves.append(move_info)
+        return "\n".join(formatted_moves)
+
+    def format_threats(self, attacker: Pokemon, defender: Pokemon) -> str:
+        # The opponent's known attacks (or STAB guesses) against our active Pokémon
+        if not self.damage_calculator or attacker is None or defender is None or attacker.fainted:
+            return ""
+        moves = [move for move in opponent_replies(self.env.game_state) if is_damaging(move)]
+        if not moves:
+            return ""
+        ranges = self.damage_calculator.ranges(attacker, moves, defender)
+        threats = ", ".join(f"{name} {damage.describe()}" for name, damage in ranges.items() if damage)
+        return f"Opponent's threats to {defender.name}: {threats}"
+
+    def format_team(self, team, describe: bool = True):
+        formatted_team = []
+        for pokemon in team:
+            pokemon_info = f"- {pokemon.name} (Level {pokemon.level})"
+            pokemon_info += f"\n  Current Types: {', '.join(pokemon.current_types)}"
+            pokemon_info += f"\n  Base Types: {', '.join(pokemon.base_types)}"
+            pokemon_info += f"\n  Terastallized: {'Yes' if pokemon.terastallized else 'No'}"
+            if pokemon.tera_type != 'Unknown':
+                pokemon_info += f"\n  Tera Type: {pokemon.tera_type}"
+            else:
+                pokemon_info += f"\n  Tera Type: Not known"
+            pokemon_info += f"\n  HP: {pokemon.hp_percentage}%"
+            if pokemon.ability:
+                pokemon_info += f"\n  Ability: {pokemon.ability}"
+            else:
+                pokemon_info += f"\n  Ability: Not known"
+            if pokemon.item:
+                pokemon_info += f"\n  Item: {pokemon.item}"
+            else:
+                pokemon_info += f"\n  Item: Not known"
+                
+            # Add moves information
+            pokemon_info += "\n  Moves:"
+            if pokemon.moves:
+                for i, move in enumerate(pokemon.moves, 1):
+                    move_info = f"\n    {i}. {move.name}"
+                    if move.type:
+                        move_info += f" (Type: {move.type}"
+                        if move.category:
+                            move_info += f", Category: {move.category}"
+                        move_info += ")"
+                    if move.power is not None:
+                        move_info += f"\n       Power: {move.power}"
+                    if move.accuracy:
+                        move_info += f", Accuracy: {move.accuracy}"
+                    if move.current_pp is not None and move.max_pp is not None:
+                        move_info += f", PP: {move.current_pp}/{move.max_pp}"
+                    else: 
+                        move_info += f", PP: Not known"
+                    if move.description and describe:
+                        move_info += f"\n       Description: {move.description}"
+                    pokemon_info += move_info
+            else:
+                pokemon_info += "\n    Moves not known"
+                
+            formatted_team.append(pokemon_info)
+        return "\n".join(formatted_team)
+
+    def format_team_sheet(self, team):
+        # Only what cannot change during the battle; HP, status and PP stay in the observations
+        sheet = []
+        for pokemon in team:
+            info = f"- {pokemon.name} (Level {pokemon.level})"
+            info += f"\n  Types: {', '.join(pokemon.base_types)}"
+            info += f"\n  Tera Type: {pokemon.tera_type if pokemon.tera_type != 'Unknown' else 'Not known'}"
+            ability, item = self.describe_entity("ability", pokemon.ability), self.describe_entity("item", pokemon.item)
+            info += f"\n  Ability: {pokemon.ability or 'Not known'}" + (f" ({ability})" if ability else "")
+            info += f"\n  Starting Item: {pokemon.item or 'Not known'}" + (f" ({item})" if item else "")
+            if pokemon.base_stats:
+                info += f"\n  Stats: {self.format_stats(pokemon.base_stats)}"
+            info += "\n  Moves:"
+            for i, move in enumerate((m for m in pokemon.moves if m.name != "Terastallize"), 1):
+                info += f"\n    {i}. {move.name} (Type: {move.type}, Category: {move.category}"
+                info += f", Power: {move.power if move.power else 'N/A'}, Accuracy: {move.accuracy if move.accuracy else 'N/A'})"
+                if move.description:
+                    info += f"\n       Description: {move.description}"
+            sheet.append(info)
+        return "\n".join(sheet)
+
+    def format_stats(self, stats):
+        if not stats:
+            return "Unknown"
+        return ", ".join([f"{stat}: {value}" for stat, value in stats.items()])
+
+    def parse_action(self, message: str) -> Dict[str, Any]:
+        lines = message.strip().split('\n')
+        action_line = None
+        for line in lines:
+            if line.lower().startswith("action:"):
+                action_line = line.lower()
+                break
+        
+        if action_line is None:
+            raise ValueError(f"No action found in the message:\n{message}")
+
+        if "move:" in action_line:
+            move_name = action_line.split('move:')[1].strip()
+            return {"type": "move", "move_name": move_name}
+        elif "switch:" in action_line:
+            pokemon_name = action_line.split('switch:')[1].strip()
+            return {"type": "switch", "switch_name": pokemon_name}
+        else:
+            raise ValueError(f"Invalid action format: {action_line}")
+        
+def main():
+    load_dotenv()
+    
+    env = PokemonShowdownEnv(username="Poke214915", password="LLMAgent1234")
+    client = OpenAI(api_key=os.getenv("OPENROUTER_API_KEY"), 
+                    base_url="https://openrouter.ai/api/v1",)
     
-    agent = Agent(client= client, env= env, system= system_prompt)
+    agent = Agent(client= client, env= env, system= SYSTEM_PROMPT)
     
     final_reward = agent.battle_loop()
-    #print(f"Battle finished with reward: {final_reward}")
+    print(f"Battle finished with reward: {final_reward}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import re
+from typing import Dict, List, Optional
+
+TURN_HEADER = re.compile(r"^Turn (\d+)$")
+
+
+class BattleLogReader:
+    """Consumes the battle log incrementally and keeps it split into per-turn segments.
+
+    The cursor is the number of log entries (child nodes of the battle log) already read,
+    so each refresh only transfers what was appended since the previous call.
+    """
+
+    def __init__(self, turns: Optional[Dict[int, List[str]]] = None):
+        self.turns: Dict[int, List[str]] = turns if turns is not None else {}
+        self.reset()
+
+    def reset(self):
+        self.cursor = 0
+        self.current_turn = 0
+        self.turns.clear()
+        self.turns[0] = []
+
+    def feed(self, entries: List[str], start: int = None, count: int = None) -> List[str]:
+        """Add newly appended log entries and return the lines that were added.
+
+        `start` is the index of the first entry in `entries`; a start of 0 after the cursor has
+        moved means the log was replaced (new battle room), so the reader starts over.
+        """
+        if start is not None and start < self.cursor:
+            if start != 0:
+                # Overlapping slice, drop what was already consumed
+                entries = entries[self.cursor - start:]
+            else:
+                self.reset()
+
+        new_lines = []
+        for entry in entries:
+            for line in entry.split("\n"):
+                line = line.strip()
+                if not line:
+                    continue
+                header = TURN_HEADER.match(line)
+                if header:
+                    self.current_turn = int(header.group(1))
+                    self.turns.setdefault(self.current_turn, [])
+                else:
+                    self.turns.setdefault(self.current_turn, []).append(line)
+                new_lines.append(line)
+
+        self.cursor = count if count is not None else self.cursor + len(entries)
+        return new_lines
+
+    def full_text(self) -> str:
+        lines = []
+        for turn in sorted(self.turns):
+            if turn > 0:
+                lines.append(f"Turn {turn}")
+            lines.extend(self.turns[turn])
+        return "\n".join(lines)
+
+    def turn_text(self, turn: int) -> str:
+        # Same layout get_chat_log has always produced for the prompt
+        if turn == 0:
+            return f"Turn 0\n{self.full_text()}"
+
+        events = self.turns.get(turn)
+        if events:
+            return f"Turn {turn}\n" + "\n".join(events)
+        else:
+            return f"Turn {turn}\nNo log found for Turn {turn}"
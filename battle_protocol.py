@@ -0,0 +1,267 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Typed events for the subset of the Showdown battle protocol the agents care about.
+# See https://github.com/smogon/pokemon-showdown/blob/master/sim/SIM-PROTOCOL.md
+
+@dataclass
+class PlayerEvent:
+    side: str
+    name: str
+
+
+@dataclass
+class SwitchEvent:
+    side: str
+    name: str
+    species: str
+    level: int
+    hp: Optional[int]
+    max_hp: Optional[int]
+    status: Optional[str]
+    drag: bool = False  # Forced in by Roar, Dragon Tail, etc.
+
+
+@dataclass
+class MoveEvent:
+    side: str
+    name: str
+    move: str
+    target_side: Optional[str] = None
+    target_name: Optional[str] = None
+
+
+@dataclass
+class HpEvent:
+    side: str
+    name: str
+    hp: int
+    max_hp: Optional[int]
+    status: Optional[str]
+    heal: bool = False
+    source: Optional[str] = None  # e.g. "item: Life Orb"
+
+
+@dataclass
+class FaintEvent:
+    side: str
+    name: str
+
+
+@dataclass
+class TerastallizeEvent:
+    side: str
+    name: str
+    tera_type: str
+
+
+@dataclass
+class StatusEvent:
+    side: str
+    name: str
+    status: Optional[str]  # None when cured
+
+
+@dataclass
+class BoostEvent:
+    side: str
+    name: str
+    stat: str
+    amount: int  # Negative for -unboost
+
+
+@dataclass
+class TypeChangeEvent:
+    side: str
+    name: str
+    types: List[str]
+
+
+@dataclass
+class AbilityEvent:
+    side: str
+    name: str
+    ability: str
+
+
+@dataclass
+class ItemEvent:
+    side: str
+    name: str
+    item: str
+    removed: bool = False
+
+
+@dataclass
+class TurnEvent:
+    turn: int
+
+
+@dataclass
+class RequestEvent:
+    request: Dict[str, Any]
+
+
+@dataclass
+class WinEvent:
+    winner: Optional[str]  # None for a tie
+
+
+@dataclass
+class ErrorEvent:
+    message: str
+
+
+def parse_ident(ident: str) -> Tuple[str, str]:
+    # "p2a: Pikachu" -> ("p2", "Pikachu"); "p1: Enamorus" -> ("p1", "Enamorus")
+    position, _, name = ident.partition(": ")
+    return position[:2], name.strip()
+
+
+def parse_details(details: str) -> Tuple[str, int]:
+    # "Enamorus, L83, F" -> ("Enamorus", 83); level 100 is omitted by the server
+    parts = [part.strip() for part in details.split(",")]
+    level = 100
+    for part in parts[1:]:
+        if part.startswith("L") and part[1:].isdigit():
+            level = int(part[1:])
+    return parts[0], level
+
+
+def parse_condition(condition: str) -> Tuple[int, Optional[int], Optional[str]]:
+    # "259/259", "45/100 par", "0 fnt" -> (hp, max_hp, status)
+    hp_part, _, status = condition.strip().partition(" ")
+    if "/" in hp_part:
+        hp, max_hp = hp_part.split("/", 1)
+        return int(hp), int(max_hp), status or None
+    return int(hp_part or 0), None, status or None
+
+
+def parse_line(line: str):
+    """Parse one protocol line into an event, or None for messages we don't track."""
+    if not line.startswith("|"):
+        return None
+    parts = line[1:].split("|")
+    command, args = parts[0], parts[1:]
+    tags = [arg for arg in args if arg.startswith("[")]
+    args = [arg for arg in args if not arg.startswith("[")]
+
+    try:
+        if command == "player" and len(args) >= 2 and args[1]:
+            return PlayerEvent(side=args[0], name=args[1])
+        if command in ("switch", "drag", "replace") and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            species, level = parse_details(args[1])
+            hp, max_hp, status = parse_condition(args[2]) if len(args) > 2 else (None, None, None)
+            return SwitchEvent(side, name, species, level, hp, max_hp, status, drag=command == "drag")
+        if command == "move" and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            target_side, target_name = parse_ident(args[2]) if len(args) > 2 and args[2] else (None, None)
+            return MoveEvent(side, name, args[1], target_side, target_name)
+        if command in ("-damage", "-heal", "-sethp") and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            hp, max_hp, status = parse_condition(args[1])
+            source = next((tag[len("[from] "):] for tag in tags if tag.startswith("[from] ")), None)
+            return HpEvent(side, name, hp, max_hp, status, heal=command != "-damage", source=source)
+        if command == "faint" and args:
+            return FaintEvent(*parse_ident(args[0]))
+        if command == "-terastallize" and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            return TerastallizeEvent(side, name, args[1])
+        if command in ("-status", "-curestatus") and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            return StatusEvent(side, name, args[1] if command == "-status" else None)
+        if command in ("-boost", "-unboost") and len(args) >= 3:
+            side, name = parse_ident(args[0])
+            amount = int(args[2])
+            return BoostEvent(side, name, args[1], amount if command == "-boost" else -amount)
+        if command == "-start" and len(args) >= 3 and args[1] == "typechange":
+            side, name = parse_ident(args[0])
+            return TypeChangeEvent(side, name, args[2].split("/"))
+        if command == "-ability" and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            return AbilityEvent(side, name, args[1])
+        if command in ("-item", "-enditem") and len(args) >= 2:
+            side, name = parse_ident(args[0])
+            return ItemEvent(side, name, args[1], removed=command == "-enditem")
+        if command == "turn" and args:
+            return TurnEvent(int(args[0]))
+        if command == "request":
+            payload = "|".join(parts[1:])
+            return RequestEvent(json.loads(payload)) if payload else None
+        if command == "win":
+            return WinEvent(args[0] if args else None)
+        if command == "tie":
+            return WinEvent(None)
+        if command == "error":
+            return ErrorEvent("|".join(parts[1:]))
+    except (ValueError, IndexError):
+        return None
+    return None
+
+
+class ProtocolParser:
+    """Streaming parser for raw protocol messages (one or more lines, optionally prefixed by >roomid)."""
+
+    def __init__(self):
+        self.room_id: Optional[str] = None
+
+    def feed(self, message: str) -> List[Any]:
+        events = []
+        for line in message.split("\n"):
+            if line.startswith(">"):
+                self.room_id = line[1:].strip()
+                continue
+            event = parse_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def feed_lines(self, lines: List[str]) -> List[Any]:
+        return self.feed("\n".join(lines))
+
+
+STAT_NAMES = {"atk": "Attack", "def": "Defense", "spa": "Sp. Atk", "spd": "Sp. Def", "spe": "Speed",
+              "accuracy": "accuracy", "evasion": "evasiveness"}
+
+
+def describe_event(event, player_side: str, player_names: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """Render an event as a short battle-log line, for backends that never see the client's log text."""
+    def who(side, name):
+        return name if side == player_side else f"The opposing {name}"
+
+    if isinstance(event, TurnEvent):
+        return f"Turn {event.turn}"
+    if isinstance(event, SwitchEvent):
+        if event.side == player_side:
+            return f"Go! {event.name}!"
+        trainer = (player_names or {}).get(event.side, "The opponent")
+        return f"{trainer} sent out {event.name}!"
+    if isinstance(event, MoveEvent):
+        return f"{who(event.side, event.name)} used {event.move}!"
+    if isinstance(event, HpEvent):
+        percent = round(event.hp / event.max_hp * 100) if event.max_hp else 0
+        return f"({who(event.side, event.name)} is at {percent}% HP)"
+    if isinstance(event, FaintEvent):
+        return f"{who(event.side, event.name)} fainted!"
+    if isinstance(event, TerastallizeEvent):
+        return f"{who(event.side, event.name)} has Terastallized into the {event.tera_type}-type!"
+    if isinstance(event, StatusEvent):
+        if event.status is None:
+            return f"{who(event.side, event.name)} was cured of its status condition."
+        return f"{who(event.side, event.name)} is now {event.status.upper()}."
+    if isinstance(event, BoostEvent):
+        direction = "rose" if event.amount > 0 else "fell"
+        return f"{who(event.side, event.name)}'s {STAT_NAMES.get(event.stat, event.stat)} {direction}!"
+    if isinstance(event, TypeChangeEvent):
+        return f"{who(event.side, event.name)} transformed into the {'/'.join(event.types)} type!"
+    if isinstance(event, AbilityEvent):
+        return f"[{who(event.side, event.name)}'s {event.ability}]"
+    if isinstance(event, ItemEvent):
+        verb = "lost its" if event.removed else "is holding"
+        return f"{who(event.side, event.name)} {verb} {event.item}."
+    if isinstance(event, WinEvent):
+        return f"{event.winner} won the battle!" if event.winner else "The battle ended in a tie!"
+    return None
@@ -0,0 +1,269 @@
+from typing import Any, Dict, Optional
+
+from battle_protocol import (
+    AbilityEvent, BoostEvent, FaintEvent, HpEvent, ItemEvent, MoveEvent, PlayerEvent,
+    RequestEvent, StatusEvent, SwitchEvent, TerastallizeEvent, TurnEvent, TypeChangeEvent, WinEvent,
+    parse_condition, parse_details, parse_ident,
+)
+from description_dex import get_ability_dex, get_item_dex
+from game_state import (
+    FrozenStats, GameState, Player, Pokemon, PokemonMove, STAT_LABELS, apply_boosts, random_battle_stats,
+    speed_stat_range,
+)
+from move_dex import get_move_dex, normalize_name
+from species_dex import SpeciesDex, get_species_dex
+
+
+def item_name(item_id: Optional[str]) -> Optional[str]:
+    # Requests use ids ("weaknesspolicy"); map them back to display names from the datasets
+    return get_item_dex().display_name(item_id)
+
+
+def ability_name(ability_id: Optional[str]) -> Optional[str]:
+    return get_ability_dex().display_name(ability_id)
+
+
+class BattleStateTracker:
+    """Applies typed protocol events to a GameState incrementally.
+
+    `player_side` is our protocol side ("p1" or "p2"); GameState.player is always us.
+    The protocol never sends types, abilities or base stats, so they come from `species_dex`
+    (the downloaded Showdown Pokédex unless another table is given).
+    """
+
+    def __init__(self, player_side: str = "p1", species_dex: Optional[SpeciesDex] = None):
+        self.player_side = player_side
+        self.species_dex = species_dex if species_dex is not None else get_species_dex()
+        self.move_dex = get_move_dex()
+        self.boosts: Dict[tuple, Dict[str, int]] = {}
+        self.statuses: Dict[tuple, Optional[str]] = {}
+        self.request: Optional[Dict[str, Any]] = None
+        self.finished = False
+        self.winner: Optional[str] = None
+        self.player_names: Dict[str, str] = {}
+
+        player = Player(name="p1", revealed_pokemon=[], active_pokemon=None)
+        opponent = Player(name="p2", revealed_pokemon=[], active_pokemon=None)
+        self.game_state = GameState(player=player, opponent=opponent, turn=0, chat_log="")
+
+    def _player(self, side: str) -> Player:
+        return self.game_state.player if side == self.player_side else self.game_state.opponent
+
+    def _find(self, side: str, name: str) -> Optional[Pokemon]:
+        for pokemon in self._player(side).revealed_pokemon:
+            if pokemon.name == name:
+                return pokemon
+        return None
+
+    def _new_pokemon(self, side: str, name: str, species: str, level: int) -> Pokemon:
+        types = self.species_dex.types(species)
+        pokemon = Pokemon(name=name, level=level, current_types=types, base_types=tuple(types), tera_type="Unknown")
+        entry = self.species_dex.get(species)
+        if entry is not None and side != self.player_side:
+            # Same estimates the browser environment reads from the client tooltip
+            pokemon.possible_abilities = tuple(entry.abilities)
+            if len(entry.abilities) == 1:
+                pokemon.ability = entry.abilities[0]
+            pokemon.base_stats = FrozenStats(random_battle_stats(entry.base_stats, level))
+            pokemon.current_stats = dict(pokemon.base_stats)
+            pokemon.opponent_speed_range = speed_stat_range(entry.base_stats["spe"], level)
+        return pokemon
+
+    def _refresh_status(self, side: str, pokemon: Pokemon):
+        # Same labels the browser environment uses: major status plus non-zero stat stages
+        key = (side, pokemon.name)
+        status = self.statuses.get(key)
+        effects = [status.upper()] if status and status != "fnt" else []
+        boosts = self.boosts.get(key, {})
+        for stat, stage in boosts.items():
+            if stage:
+                effects.append(f"{stage:+d} {STAT_LABELS.get(stat, stat.capitalize())}")
+        pokemon.status_effects = effects
+        if pokemon.base_stats:
+            pokemon.current_stats = apply_boosts(pokemon.base_stats, boosts)
+
+    def _set_hp(self, side: str, pokemon: Pokemon, hp: int, max_hp: Optional[int], status: Optional[str]):
+        if status == "fnt" or hp == 0:
+            pokemon.fainted = True
+            pokemon.current_hp = 0
+            pokemon.hp_percentage = "fainted"
+            return
+        pokemon.fainted = False
+        if side == self.player_side and max_hp:
+            pokemon.current_hp, pokemon.max_hp = hp, max_hp
+        if max_hp:
+            pokemon.hp_percentage = str(round(hp / max_hp * 100, 1))
+        self.statuses[(side, pokemon.name)] = status
+        self._refresh_status(side, pokemon)
+
+    def apply(self, event):
+        handler = getattr(self, f"_on_{type(event).__name__}", None)
+        if handler:
+            handler(event)
+
+    def apply_all(self, events):
+        for event in events:
+            self.apply(event)
+
+    def _on_PlayerEvent(self, event: PlayerEvent):
+        self.player_names[event.side] = event.name
+
+    def _on_SwitchEvent(self, event: SwitchEvent):
+        player = self._player(event.side)
+        previous = player.active_pokemon
+        if previous is not None:
+            # Stat stages reset when a Pokémon leaves the field
+            self.boosts.pop((event.side, previous.name), None)
+            if not previous.terastallized:
+                previous.current_types = list(previous.base_types)
+            self._refresh_status(event.side, previous)
+
+        pokemon = self._find(event.side, event.name)
+        if pokemon is None:
+            pokemon = self._new_pokemon(event.side, event.name, event.species, event.level)
+            player.revealed_pokemon.append(pokemon)
+        if event.hp is not None:
+            self._set_hp(event.side, pokemon, event.hp, event.max_hp, event.status)
+        player.active_pokemon = pokemon
+
+    def _on_MoveEvent(self, event: MoveEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is None or event.side == self.player_side:
+            # Our own PP and movesets come from the request
+            return
+        move = next((m for m in pokemon.moves if normalize_name(m.name) == normalize_name(event.move)), None)
+        if move is None:
+            move = PokemonMove(name=event.move)
+            entry = self.move_dex.get(event.move)
+            if entry is not None:
+                move.type, move.category, move.power = entry.type, entry.category, entry.power
+                move.accuracy, move.description = entry.accuracy, entry.effect
+                if entry.pp:
+                    move.max_pp = move.current_pp = entry.pp * 8 // 5
+            pokemon.moves.append(move)
+        if move.current_pp:
+            move.current_pp -= 1
+
+    def _on_HpEvent(self, event: HpEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            self._set_hp(event.side, pokemon, event.hp, event.max_hp, event.status)
+
+    def _on_FaintEvent(self, event: FaintEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            self._set_hp(event.side, pokemon, 0, None, "fnt")
+
+    def _on_TerastallizeEvent(self, event: TerastallizeEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            pokemon.terastallized = True
+            pokemon.tera_type = event.tera_type
+            pokemon.current_types = [event.tera_type]
+        self._player(event.side).can_terastallize = False
+
+    def _on_TypeChangeEvent(self, event: TypeChangeEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None and not pokemon.terastallized:
+            pokemon.current_types = list(event.types)
+
+    def _on_StatusEvent(self, event: StatusEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            self.statuses[(event.side, pokemon.name)] = event.status
+            self._refresh_status(event.side, pokemon)
+
+    def _on_BoostEvent(self, event: BoostEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            boosts = self.boosts.setdefault((event.side, pokemon.name), {})
+            boosts[event.stat] = max(-6, min(6, boosts.get(event.stat, 0) + event.amount))
+            self._refresh_status(event.side, pokemon)
+
+    def _on_AbilityEvent(self, event: AbilityEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            pokemon.ability = event.ability
+
+    def _on_ItemEvent(self, event: ItemEvent):
+        pokemon = self._find(event.side, event.name)
+        if pokemon is not None:
+            pokemon.item = None if event.removed else event.item
+
+    def _on_TurnEvent(self, event: TurnEvent):
+        self.game_state.turn = event.turn
+
+    def _on_WinEvent(self, event: WinEvent):
+        self.finished = True
+        self.winner = event.winner
+
+    def _on_RequestEvent(self, event: RequestEvent):
+        request = event.request
+        self.request = request
+        side = request.get("side")
+        if not side:
+            return
+        self.player_side = side.get("id", self.player_side)
+        player = self.game_state.player
+
+        team = []
+        for entry in side.get("pokemon", []):
+            _, name = parse_ident(entry["ident"])
+            species, level = parse_details(entry["details"])
+            pokemon = self._find(self.player_side, name)
+            if pokemon is None:
+                pokemon = self._new_pokemon(self.player_side, name, species, level)
+            pokemon.level = level
+            hp, max_hp, status = parse_condition(entry["condition"])
+            self._set_hp(self.player_side, pokemon, hp, max_hp, status)
+            stats = {STAT_LABELS[key]: value for key, value in entry.get("stats", {}).items() if key in STAT_LABELS}
+            pokemon.base_stats = FrozenStats(stats) if stats else None
+            pokemon.item = item_name(entry.get("item"))
+            pokemon.ability = ability_name(entry.get("ability") or entry.get("baseAbility"))
+            pokemon.possible_abilities = (pokemon.ability,) if pokemon.ability else ()
+            terastallized = entry.get("terastallized")
+            pokemon.terastallized = bool(terastallized)
+            pokemon.tera_type = terastallized or entry.get("teraType") or "Unknown"
+            if terastallized:
+                pokemon.current_types = [terastallized]
+            known_moves = {normalize_name(move.name): move for move in pokemon.moves}
+            pokemon.moves = [known_moves.get(move_id) or self._dex_move(move_id) for move_id in entry.get("moves", [])]
+            self._refresh_status(self.player_side, pokemon)
+            team.append(pokemon)
+            if entry.get("active"):
+                player.active_pokemon = pokemon
+        player.revealed_pokemon = team
+
+        active_request = (request.get("active") or [None])[0]
+        player.can_terastallize = bool(active_request and active_request.get("canTerastallize"))
+        if active_request and player.active_pokemon:
+            moves = []
+            for move_data in active_request.get("moves", []):
+                move = self._dex_move(move_data["move"])
+                move.current_pp, move.max_pp = move_data.get("pp"), move_data.get("maxpp")
+                move.target = move_data.get("target")
+                move.disabled = bool(move_data.get("disabled"))
+                moves.append(move)
+            if player.can_terastallize:
+                tera_type = active_request["canTerastallize"]
+                moves.append(PokemonMove(
+                    name="Terastallize",
+                    type=tera_type,
+                    category="Status",
+                    description=f"Terastallize into {tera_type} type",
+                    target="self"
+                ))
+            player.active_pokemon.moves = moves
+
+    def _dex_move(self, name: str) -> PokemonMove:
+        entry = self.move_dex.get(name)
+        if entry is None:
+            return PokemonMove(name=name)
+        return PokemonMove(
+            name=entry.name,
+            type=entry.type,
+            category=entry.category,
+            power=entry.power,
+            accuracy=entry.accuracy,
+            description=entry.effect
+        )
@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from game_state import Pokemon, PokemonMove, random_battle_stats
+from move_dex import get_move_dex
+from type_chart import get_type_chart
+
+# The 16 damage rolls, 85% to 100%
+ROLLS = np.arange(85, 101, dtype=np.float64) / 100
+
+# Abilities that make the holder immune to a move type
+IMMUNITY_ABILITIES = {
+    "Levitate": "Ground", "Earth Eater": "Ground",
+    "Flash Fire": "Fire", "Well-Baked Body": "Fire",
+    "Water Absorb": "Water", "Storm Drain": "Water", "Dry Skin": "Water",
+    "Volt Absorb": "Electric", "Lightning Rod": "Electric", "Motor Drive": "Electric",
+    "Sap Sipper": "Grass",
+}
+
+
+def is_damaging(move: PokemonMove) -> bool:
+    return bool(move.power) and bool(move.category) and move.category.lower() != "status"
+
+
+def only_deals_damage(move: PokemonMove) -> bool:
+    # Priority, pivoting, item removal, drain, recoil and secondary effects all live in the effect text;
+    # moves missing from the MoveDex are assumed to do something more
+    entry = get_move_dex().get(move.name)
+    return entry is not None and not entry.effect
+
+
+def stats_for(pokemon: Pokemon) -> Dict[str, int]:
+    # Boosted stats when known, then unboosted, then a base-80 Random Battles estimate
+    return pokemon.current_stats or pokemon.base_stats or random_battle_stats({}, pokemon.level or 100)
+
+
+def max_hp_for(pokemon: Pokemon) -> int:
+    if pokemon.max_hp:
+        return pokemon.max_hp
+    return (pokemon.base_stats or {}).get("HP") or random_battle_stats({}, pokemon.level or 100)["HP"]
+
+
+def current_hp_for(pokemon: Pokemon) -> float:
+    if pokemon.fainted or pokemon.hp_percentage == "fainted":
+        return 0.0
+    if pokemon.current_hp is not None and pokemon.max_hp:
+        return float(pokemon.current_hp)
+    try:
+        return float(pokemon.hp_percentage) / 100 * max_hp_for(pokemon)
+    except (TypeError, ValueError):
+        return float(max_hp_for(pokemon))
+
+
+@dataclass
+class DamageRange:
+    move: str
+    target: str
+    min_damage: int
+    max_damage: int
+    min_percent: float
+    max_percent: float
+    ko_chance: float  # chance to KO from the target's current HP this hit, accuracy included
+
+    def describe(self) -> str:
+        return f"{self.min_percent:.0f}-{self.max_percent:.0f}% (KO chance {self.ko_chance * 100:.0f}%)"
+
+
+@dataclass
+class DamageMatrix:
+    """Damage of every move against every target; arrays are (moves, targets[, rolls])."""
+    moves: List[PokemonMove]
+    targets: List[Pokemon]
+    damage: np.ndarray
+    percent: np.ndarray
+    ko_chance: np.ndarray
+    accuracy: np.ndarray
+    current_hp: np.ndarray
+
+    def range(self, i: int, j: int) -> DamageRange:
+        return DamageRange(
+            move=self.moves[i].name,
+            target=self.targets[j].name,
+            min_damage=int(self.damage[i, j, 0]),
+            max_damage=int(self.damage[i, j, -1]),
+            min_percent=float(self.percent[i, j, 0]),
+            max_percent=float(self.percent[i, j, -1]),
+            ko_chance=float(self.ko_chance[i, j]),
+        )
+
+    def dominated(self, j: int = 0) -> Dict[str, str]:
+        """Damaging moves not worth considering against target j, with the reason.
+
+        Immune targets rule out any move. Being outdamaged only rules out moves that do nothing but damage,
+        since a weaker move can still be worth it for its priority, switch, drain or secondary effect.
+        """
+        reasons = {}
+        damaging = [i for i, move in enumerate(self.moves) if is_damaging(move)]
+        # Damage past the target's remaining HP doesn't count; two sure KOs are equally good
+        effective = np.minimum(self.damage[:, j], max(self.current_hp[j], 1))
+        for i in damaging:
+            if self.damage[i, j, -1] == 0:
+                reasons[self.moves[i].name] = "no effect"
+                continue
+            if not only_deals_damage(self.moves[i]):
+                continue
+            for k in damaging:
+                # Only clear-cut cases: always does more damage and is at least as accurate
+                if k != i and effective[k, 0] > effective[i, -1] and self.accuracy[k] >= self.accuracy[i]:
+                    reasons[self.moves[i].name] = f"always outdamaged by {self.moves[k].name}"
+                    break
+        return reasons
+
+
+class DamageCalculator:
+    """Generation 9 damage formula over all move x target pairs at once.
+
+    Covers stats and stages, STAB (including Terastallization and Adaptability), type effectiveness, burn,
+    common damage items and ability immunities. Crits, weather, screens and multi-hit moves are ignored.
+    """
+
+    def __init__(self, type_chart=None):
+        self.type_chart = type_chart or get_type_chart()
+
+    def matrix(self, attacker: Pokemon, moves: Sequence[PokemonMove], targets: Sequence[Pokemon]) -> DamageMatrix:
+        moves, targets = list(moves), list(targets)
+        level = attacker.level or 100
+        attack = stats_for(attacker)
+
+        physical = np.array([bool(m.category) and m.category.lower() == "physical" for m in moves])
+        power = np.array([m.power if is_damaging(m) else 0 for m in moves], dtype=np.float64)
+        accuracy = np.array([m.accuracy if isinstance(m.accuracy, int) else 100 for m in moves], dtype=np.float64)
+        move_ids = np.array([self.type_chart.type_id(m.type) for m in moves], dtype=np.intp)
+
+        attack_stat = np.where(physical, attack.get("Atk", 100), attack.get("SpA", 100)).astype(np.float64)
+        if attacker.ability in ("Huge Power", "Pure Power"):
+            attack_stat = np.where(physical, attack_stat * 2, attack_stat)
+        if attacker.item == "Choice Band":
+            attack_stat = np.where(physical, attack_stat * 1.5, attack_stat)
+        elif attacker.item == "Choice Specs":
+            attack_stat = np.where(physical, attack_stat, attack_stat * 1.5)
+
+        defence = [stats_for(t) for t in targets]
+        defence_stat = np.array([
+            [d.get("Def", 100) if is_physical else d.get("SpD", 100) * (1.5 if t.item == "Assault Vest" else 1)
+             for d, t in zip(defence, targets)]
+            for is_physical in physical
+        ], dtype=np.float64).reshape(len(moves), len(targets))
+
+        # Base damage, floored the way the games do
+        base = np.floor(np.floor(np.floor(2 * level / 5 + 2) * power[:, None] * attack_stat[:, None]
+                                 / np.maximum(defence_stat, 1)) / 50) + 2
+
+        stab_types = set(attacker.base_types or attacker.current_types) | set(attacker.current_types)
+        stab_bonus = 2.0 if attacker.ability == "Adaptability" else 1.5
+        stab = np.array([
+            (2.0 if attacker.terastallized and m.type == attacker.tera_type and m.type in (attacker.base_types or [])
+             else stab_bonus) if m.type in stab_types else 1.0
+            for m in moves
+        ])
+
+        defender_ids = self.type_chart.encode_defenders([t.current_types for t in targets])
+        effectiveness = self.type_chart.effectiveness_batch(move_ids[:, None], defender_ids[None, :, :])
+        for j, target in enumerate(targets):
+            immune_type = IMMUNITY_ABILITIES.get(target.ability)
+            if immune_type:
+                effectiveness[[m.type == immune_type for m in moves], j] = 0.0
+            if target.ability == "Thick Fat":
+                effectiveness[[m.type in ("Fire", "Ice") for m in moves], j] *= 0.5
+
+        other = np.ones((len(moves), len(targets)))
+        if "BRN" in attacker.status_effects and attacker.ability != "Guts":
+            other[physical] *= 0.5
+        if attacker.item == "Life Orb":
+            other *= 1.3
+        elif attacker.item == "Expert Belt":
+            other = np.where(effectiveness > 1, other * 1.2, other)
+
+        rolled = np.floor(base[:, :, None] * ROLLS)
+        damage = np.floor(np.floor(rolled * stab[:, None, None]) * effectiveness[:, :, None] * other[:, :, None])
+        damage = np.where((power[:, None, None] > 0) & (effectiveness[:, :, None] > 0), np.maximum(damage, 1), 0)
+
+        max_hp = np.array([max_hp_for(t) for t in targets], dtype=np.float64)
+        current_hp = np.array([current_hp_for(t) for t in targets], dtype=np.float64)
+        percent = np.minimum(damage / max_hp[None, :, None] * 100, 100)
+        ko = (damage >= np.maximum(current_hp, 1)[None, :, None]).mean(axis=-1) * (accuracy[:, None] / 100)
+        return DamageMatrix(moves, targets, damage, percent, ko, accuracy, current_hp)
+
+    def calculate(self, attacker: Pokemon, move: PokemonMove, defender: Pokemon) -> DamageRange:
+        return self.matrix(attacker, [move], [defender]).range(0, 0)
+
+    def ranges(self, attacker: Pokemon, moves: Sequence[PokemonMove], defender: Pokemon) -> Dict[str, Optional[DamageRange]]:
+        # Status moves map to None so callers can look up any move by name
+        result = self.matrix(attacker, moves, [defender])
+        return {move.name: result.range(i, 0) if is_damaging(move) else None for i, move in enumerate(result.moves)}
@@ -0,0 +1,224 @@
+import json
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+BUNDLE_PATH = os.path.join(DATA_DIR, "pokemon_data.bin")
+# The bundle is compiled from these; the Z-move-free move file is just a filter over the first one
+SOURCE_FILES = {
+    "moves": os.path.join(DATA_DIR, "pokemon_moves.json"),
+    "items": os.path.join(DATA_DIR, "pokemon_items.json"),
+    "abilities": os.path.join(DATA_DIR, "pokemon_abilities.json"),
+    "type_chart": os.path.join(DATA_DIR, "pokemon_defending_type_chart.json"),
+}
+
+# Bump whenever the layout below changes; older bundles are rebuilt on load
+BUNDLE_VERSION = 1
+MAGIC = b"PKMN"
+HEADER = struct.Struct("<4sII")          # magic, version, section count
+SECTION = struct.Struct("<16sQQ")        # name, offset, size in bytes
+ALIGNMENT = 8
+
+# Strings are interned: records hold an index into the string table, 0 is the empty string.
+# Missing numbers are stored as -1.
+MOVE_DTYPE = np.dtype([
+    ("name", "<u4"), ("type", "<u4"), ("category", "<u4"), ("effect", "<u4"),
+    ("power", "<i2"), ("accuracy", "<i2"), ("pp", "<i2"), ("probability", "<i2"), ("z_move", "u1"),
+])
+ITEM_DTYPE = np.dtype([("name", "<u4"), ("category", "<u4"), ("effect", "<u4")])
+ABILITY_DTYPE = np.dtype([("name", "<u4"), ("description", "<u4")])
+SECTION_DTYPES = {
+    "string_offsets": np.dtype("<u4"),
+    "string_data": np.dtype("u1"),
+    "moves": MOVE_DTYPE,
+    "items": ITEM_DTYPE,
+    "abilities": ABILITY_DTYPE,
+    "type_names": np.dtype("<u4"),
+    "type_matrix": np.dtype("<f4"),
+}
+
+
+def _int_or_missing(value) -> int:
+    # The scraped data stores numbers as strings and uses "∞" for moves that can't miss
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {"": 0}
+
+    def __call__(self, value) -> int:
+        value = value or ""
+        if value not in self.ids:
+            self.ids[value] = len(self.ids)
+        return self.ids[value]
+
+    def sections(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode("utf-8") for value in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        return offsets, np.frombuffer(b"".join(encoded), dtype="u1")
+
+
+def _load_json(name: str):
+    with open(SOURCE_FILES[name], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_bundle(path: str = BUNDLE_PATH) -> str:
+    """Compiles the JSON datasets into one binary file at `path`."""
+    intern = _StringTable()
+
+    moves = _load_json("moves")
+    move_records = np.zeros(len(moves), dtype=MOVE_DTYPE)
+    for record, move in zip(move_records, moves):
+        effect = move.get("effect") or ""
+        record["name"], record["type"] = intern(move["name"]), intern(move.get("type"))
+        record["category"], record["effect"] = intern(move.get("category")), intern(effect)
+        record["power"], record["accuracy"] = _int_or_missing(move.get("power")), _int_or_missing(move.get("accuracy"))
+        record["pp"], record["probability"] = _int_or_missing(move.get("pp")), _int_or_missing(move.get("probability"))
+        record["z_move"] = "Z-Move" in effect
+
+    items = _load_json("items")
+    item_records = np.zeros(len(items), dtype=ITEM_DTYPE)
+    for record, item in zip(item_records, items):
+        record["name"], record["category"], record["effect"] = \
+            intern(item["name"]), intern(item.get("category")), intern(item.get("effect"))
+
+    abilities = _load_json("abilities")
+    ability_records = np.zeros(len(abilities), dtype=ABILITY_DTYPE)
+    for record, ability in zip(ability_records, abilities):
+        record["name"], record["description"] = intern(ability["name"]), intern(ability.get("description"))
+
+    # Only single-type rows are kept, dual types are the product of two columns
+    defending_chart = _load_json("type_chart")
+    type_names = [name for name in defending_chart if "/" not in name]
+    type_matrix = np.ones((len(type_names), len(type_names)), dtype="<f4")
+    for j, defender in enumerate(type_names):
+        for attacker, multiplier in defending_chart[defender].items():
+            type_matrix[type_names.index(attacker), j] = multiplier
+    type_ids = np.array([intern(name) for name in type_names], dtype="<u4")
+
+    string_offsets, string_data = intern.sections()
+    _write(path, {
+        "string_offsets": string_offsets,
+        "string_data": string_data,
+        "moves": move_records,
+        "items": item_records,
+        "abilities": ability_records,
+        "type_names": type_ids,
+        "type_matrix": type_matrix,
+    })
+    return path
+
+
+def _write(path: str, sections: Dict[str, np.ndarray]):
+    header_size = HEADER.size + SECTION.size * len(sections)
+    offset = -(-header_size // ALIGNMENT) * ALIGNMENT
+    table, payloads = [], []
+    for name, array in sections.items():
+        data = np.ascontiguousarray(array).tobytes()
+        table.append(SECTION.pack(name.encode("ascii"), offset, len(data)))
+        payloads.append((offset, data))
+        offset += -(-len(data) // ALIGNMENT) * ALIGNMENT
+
+    # Written next to the target and renamed, so parallel workers never see a half-written file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, BUNDLE_VERSION, len(sections)))
+        for entry in table:
+            f.write(entry)
+        for offset, data in payloads:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+    os.replace(temporary, path)
+
+
+class DataBundle:
+    """Read-only view over the compiled datasets.
+
+    The file is memory-mapped and sections are wrapped as NumPy arrays on first access, so opening it
+    costs almost nothing and every worker process shares the same pages through the OS cache.
+    """
+
+    def __init__(self, path: str = BUNDLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} data bundle, rebuild it")
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, size = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self._sections[name.rstrip(b"\0").decode("ascii")] = (offset, size)
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def section(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            offset, size = self._sections[name]
+            dtype = SECTION_DTYPES[name]
+            self._arrays[name] = np.frombuffer(self._mmap, dtype=dtype, count=size // dtype.itemsize, offset=offset)
+        return self._arrays[name]
+
+    def string(self, index: int) -> str:
+        offsets = self.section("string_offsets")
+        base = self._sections["string_data"][0]
+        return self._mmap[base + int(offsets[index]):base + int(offsets[index + 1])].decode("utf-8")
+
+    def strings(self, indices: Iterable[int]) -> List[str]:
+        return [self.string(int(index)) for index in indices]
+
+    @property
+    def moves(self) -> np.ndarray:
+        return self.section("moves")
+
+    @property
+    def items(self) -> np.ndarray:
+        return self.section("items")
+
+    @property
+    def abilities(self) -> np.ndarray:
+        return self.section("abilities")
+
+    @property
+    def type_names(self) -> List[str]:
+        return self.strings(self.section("type_names"))
+
+    @property
+    def type_matrix(self) -> np.ndarray:
+        names = self.section("type_names")
+        return self.section("type_matrix").reshape(len(names), len(names))
+
+
+def _is_stale(path: str) -> bool:
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(source) > built for source in SOURCE_FILES.values())
+
+
+@lru_cache(maxsize=None)
+def get_bundle(path: str = BUNDLE_PATH) -> DataBundle:
+    # Compiled on first use or when a source file changed, then just mapped
+    if _is_stale(path):
+        build_bundle(path)
+    try:
+        return DataBundle(path)
+    except ValueError:
+        build_bundle(path)
+        return DataBundle(path)
+
+
+if __name__ == "__main__":
+    bundle = DataBundle(build_bundle())
+    print(f"Wrote {bundle.path} ({os.path.getsize(bundle.path)} bytes): {len(bundle.moves)} moves, "
+          f"{len(bundle.items)} items, {len(bundle.abilities)} abilities, {len(bundle.type_names)} types")
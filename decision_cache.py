@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Bump when the canonical state or the way prompts are built changes, so old entries stop matching
+CACHE_VERSION = 2
+
+
+def _move_key(move) -> tuple:
+    # Exact PP counts are left out, but a move that can't be selected changes the decision
+    usable = not move.disabled and (move.current_pp is None or move.current_pp > 0)
+    return move.name, usable
+
+
+def _pokemon_key(pokemon) -> Dict[str, Any]:
+    # The fields that decide what a good move is; exact PP, stats and the chat log are left out on purpose
+    return {
+        "name": pokemon.name,
+        "level": pokemon.level,
+        "hp": pokemon.hp_percentage,
+        "status": sorted(pokemon.status_effects),
+        "types": list(pokemon.current_types),
+        "terastallized": pokemon.terastallized,
+        "tera_type": pokemon.tera_type,
+        "ability": pokemon.ability,
+        "item": pokemon.item,
+        "moves": sorted(_move_key(move) for move in pokemon.moves),
+    }
+
+
+def canonical_state(observation: Dict[str, Any], can_terastallize: bool) -> Dict[str, Any]:
+    """Order-independent view of an observation; two situations with the same view get the same decision."""
+    return {
+        "can_terastallize": bool(can_terastallize),
+        "active": _pokemon_key(observation["p1 Active Pokemon"]),
+        "opponent_active": _pokemon_key(observation["p2 Active Pokemon"]),
+        "team": sorted((_pokemon_key(p) for p in observation["p1 Team Revealed"]), key=lambda p: p["name"]),
+        "opponent_team": sorted((_pokemon_key(p) for p in observation["p2 Team Revealed"]), key=lambda p: p["name"]),
+    }
+
+
+def decision_key(observation: Dict[str, Any], can_terastallize: bool, model: str, system: str) -> str:
+    payload = {
+        "version": CACHE_VERSION,
+        "model": model,
+        "prompt": hashlib.sha256(system.encode("utf-8")).hexdigest(),
+        "state": canonical_state(observation, can_terastallize),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """Persistent LLM decision cache in SQLite with TTL expiry and LRU eviction.
+
+    Only safe for deterministic (temperature 0) completions, so agents sampling several votes
+    don't use it. Shared between threads, so concurrent battles in the runner can use one instance.
+    """
+
+    def __init__(self, path: str = "pokemonshowdown/decision_cache.sqlite", ttl_seconds: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 10000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS decisions_last_used ON decisions (last_used)")
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute("SELECT response, created FROM decisions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self.connection.execute("DELETE FROM decisions WHERE key = ?", (key,))
+                self.connection.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE decisions SET last_used = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO decisions (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._evict(now)
+            self.connection.commit()
+
+    def _evict(self, now: float):
+        if self.ttl_seconds is not None:
+            self.connection.execute("DELETE FROM decisions WHERE created < ?", (now - self.ttl_seconds,))
+        count = self.connection.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM decisions WHERE key IN (SELECT key FROM decisions ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self)}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
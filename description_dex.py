@@ -0,0 +1,72 @@
+import json
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+from data_bundle import DataBundle, get_bundle
+from move_dex import normalize_name
+
+# Boilerplate that opens many item effects and tells the model nothing
+_HELD_ITEM_PREFIX = "An item to be held by a Pokémon. "
+
+
+def _entry(name: str, text: Optional[str]) -> Tuple[str, Tuple[str, Optional[str]]]:
+    text = (text or "").strip()
+    if text.startswith(_HELD_ITEM_PREFIX):
+        text = text[len(_HELD_ITEM_PREFIX):]
+    return normalize_name(name), (name, text or None)
+
+
+class DescriptionDex:
+    """Name -> (display name, short description) table keyed on normalized names."""
+
+    def __init__(self, entries: Dict[str, Tuple[str, Optional[str]]]):
+        self._entries = entries
+
+    @classmethod
+    def from_json(cls, path: str, text_field: str) -> "DescriptionDex":
+        with open(path, "r", encoding="utf-8") as f:
+            raw_entries = json.load(f)
+
+        return cls(dict(_entry(raw["name"], raw.get(text_field)) for raw in raw_entries))
+
+    @classmethod
+    def from_bundle(cls, bundle: DataBundle, section: str, text_field: str) -> "DescriptionDex":
+        records = bundle.section(section)
+        names, texts = records["name"].tolist(), records[text_field].tolist()
+        return cls(dict(_entry(bundle.string(name), bundle.string(text)) for name, text in zip(names, texts)))
+
+    def display_name(self, name: str) -> Optional[str]:
+        # Protocol ids ("weaknesspolicy") map back to display names; unknown names pass through
+        if not name:
+            return None
+        entry = self._entries.get(normalize_name(name))
+        return entry[0] if entry else name
+
+    def describe(self, name: str) -> Optional[str]:
+        if not name:
+            return None
+        entry = self._entries.get(normalize_name(name))
+        return entry[1] if entry else None
+
+    def __contains__(self, name: str) -> bool:
+        return bool(name) and normalize_name(name) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return (display for display, _ in self._entries.values())
+
+
+@lru_cache(maxsize=None)
+def get_item_dex(path: Optional[str] = None) -> DescriptionDex:
+    if path is None:
+        return DescriptionDex.from_bundle(get_bundle(), "items", "effect")
+    return DescriptionDex.from_json(path, "effect")
+
+
+@lru_cache(maxsize=None)
+def get_ability_dex(path: Optional[str] = None) -> DescriptionDex:
+    if path is None:
+        return DescriptionDex.from_bundle(get_bundle(), "abilities", "description")
+    return DescriptionDex.from_json(path, "description")
@@ -1,82 +1,313 @@
 import re
 import time
-from typing import List, Dict, Any, Union, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
 import logging
-import json
+import threading
+import os
 
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
-from langchain.prompts import SystemMessagePromptTemplate
-from langchain.agents import Tool, AgentExecutor, LLMSingleActionAgent
-from langchain.schema import AgentAction, AgentFinish
+from battle_log import BattleLogReader
+from battle_protocol import ProtocolParser, WinEvent
+from game_state import (
+    GameState, Player, Pokemon, PokemonMove, STAT_LABELS, apply_boosts, random_battle_stats, speed_stat_range,
+)
+from move_dex import get_move_dex
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+SHOWDOWN_URL = "https://play.pokemonshowdown.com/"
 
+# Upper bounds (seconds) for the readiness waits; each wait returns as soon as its condition holds
+DEFAULT_TIMEOUTS = {
+    "element": 10,
+    "login": 15,
+    "match": 60,
+    "observation": 30,
+    "turn": 180,
+}
+POLL_FREQUENCY = 0.1
 
-from dotenv import load_dotenv
-import os
+# How the client's log announces the end of a battle
+WIN_LINE = re.compile(r"^(.+) won the battle!$")
+TIE_LINE = "ended in a tie"
 
-@dataclass
-class PokemonMove:
-    name: str
-    type: Optional[str] = None
-    category: Optional[str] = None  # Physical, Special, or Status
-    power: Optional[int] = None
-    accuracy: Optional[str] = None
-    current_pp: Optional[int] = None
-    max_pp: Optional[int] = None
-    description: Optional[str] = None
-    target: Optional[str] = None
-
-@dataclass
-class Pokemon:
-    name: str
-    fainted: bool = False
-    level: Optional[int] = None
-    current_hp: Optional[int] = None
-    max_hp: Optional[int] = None
-    hp_percentage: Optional[str] = None
-    status_effects: List[str] = field(default_factory=list)
-    current_types: List[str] = field(default_factory=list)
-    terastallized: bool = False
-    tera_type: Optional[str] = None
-    base_types: List[str] = field(default_factory=list)
-    possible_abilities: List[str] = field(default_factory=list)
-    ability: Optional[str] = None
-    item: Optional[str] = None
-    base_stats: Optional[Dict[str, int]] = None
-    current_stats: Optional[Dict[str, int]] = None
-    opponent_speed_range: Optional[Tuple[int, int]] = None
-    moves: List[PokemonMove] = field(default_factory=list)
-    
-@dataclass
-class Player:
-    name: str
-    revealed_pokemon: List[Pokemon]
-    active_pokemon: Optional[Pokemon]
-    can_terastallize: bool = True
-
-@dataclass
-class GameState:
-    player: Player
-    opponent: Player
-    turn: int
-    chat_log: str
-    last_update_failed: bool = False
+# One round trip that reports everything the readiness checks need
+BATTLE_STATUS_SCRIPT = """
+const isShown = (el) => !!(el && el.offsetParent !== null);
+const controls = document.querySelector('.battle-controls');
+const headers = document.querySelectorAll('.battle-log h2.battle-history');
+let turn = 0;
+if (headers.length) {
+    const match = /Turn (\\d+)/.exec(headers[headers.length - 1].textContent);
+    turn = match ? parseInt(match[1], 10) : 0;
+}
+const log = document.querySelector('.battle-log .inner') || document.querySelector('.battle-log');
+let ended = false;
+if (log) {
+    const recent = Array.from(log.children).slice(-5);
+    ended = recent.some((el) => /won the battle!|ended in a tie/.test(el.textContent));
+}
+const waiting = controls ? Array.from(controls.querySelectorAll('small')).some(
+    (el) => el.textContent.includes('Waiting for opponent...') && isShown(el)) : false;
+const rooms = window.app ? Object.values(app.rooms || {}) : [];
+const room = (window.app && app.curRoom && app.curRoom.battle) ? app.curRoom : rooms.find((r) => r && r.battle);
+return {
+    turn: turn,
+    rqid: room && room.request ? (room.request.rqid || null) : null,
+    waiting: waiting,
+    animating: isShown(document.querySelector("button[name='skipTurn']")) ||
+        isShown(document.querySelector("button[name='goToEnd']")),
+    move_menu: isShown(controls && controls.querySelector('.movemenu')),
+    switch_menu: isShown(controls && controls.querySelector('.switchmenu')),
+    ended: ended,
+};
+"""
+
+# Forfeits an unfinished battle and closes its room, leaving the logged-in client on the main menu
+LEAVE_BATTLE_SCRIPT = """
+const rooms = window.app ? Object.values(app.rooms || {}) : [];
+for (const room of rooms) {
+    if (!room || !room.battle) continue;
+    if (!room.battle.ended) room.send('/forfeit');
+    app.leaveRoom(room.id);
+}
+"""
+
+# Returns only the log entries appended after the cursor (arguments[0]) instead of the whole log text
+LOG_SLICE_FUNCTION = """
+const readLog = (cursor) => {
+    const log = document.querySelector('.battle-log .inner') || document.querySelector('.battle-log');
+    if (!log) return {start: 0, count: 0, entries: []};
+    const count = log.children.length;
+    const start = cursor <= count ? cursor : 0;
+    return {start: start, count: count, entries: Array.from(log.children).slice(start).map((el) => el.innerText)};
+};
+"""
+LOG_SLICE_SCRIPT = LOG_SLICE_FUNCTION + "return readLog(arguments[0]);"
+
+# Reads both sides straight from the Showdown client's battle object and request JSON in one round trip
+BATTLE_SNAPSHOT_SCRIPT = LOG_SLICE_FUNCTION + """
+const rooms = window.app ? Object.values(app.rooms || {}) : [];
+const room = (app.curRoom && app.curRoom.battle) ? app.curRoom : rooms.find((r) => r && r.battle);
+if (!room || !room.battle) return null;
+const battle = room.battle;
+const dex = battle.dex || window.Dex;
+const request = room.request || null;
+
+const speciesOf = (name) => dex.species.get(name);
+const itemName = (id) => id ? dex.items.get(id).name : null;
+const abilityName = (id) => id ? dex.abilities.get(id).name : null;
+const maxPP = (move) => move.noPPBoosts ? move.pp : Math.floor(move.pp * 8 / 5);
+
+const serializePokemon = (pokemon, side) => {
+    const species = speciesOf(pokemon.speciesForme);
+    let types = species.types;
+    try { types = pokemon.getTypeList(); } catch (e) {}
+    return {
+        name: pokemon.name,
+        species: pokemon.speciesForme,
+        level: pokemon.level,
+        hp: pokemon.hp,
+        maxhp: pokemon.maxhp,
+        fainted: !!pokemon.fainted || pokemon.hp === 0,
+        status: pokemon.status || null,
+        boosts: pokemon.boosts || {},
+        types: types,
+        base_types: species.types,
+        base_stats: species.baseStats,
+        terastallized: pokemon.terastallized || null,
+        tera_type: pokemon.teraType || null,
+        item: pokemon.item || null,
+        ability: pokemon.ability || pokemon.baseAbility || null,
+        possible_abilities: Object.values(species.abilities || {}),
+        moves: (pokemon.moveTrack || []).map(([name, used]) => {
+            const move = dex.moves.get(name);
+            const max = maxPP(move);
+            return {name: move.name || name, pp: Math.max(max - used, 0), maxpp: max};
+        }),
+        active: side.active.includes(pokemon),
+    };
+};
+
+const serializeSide = (side) => side ? {
+    name: side.name,
+    id: side.sid,
+    pokemon: side.pokemon.map((pokemon) => serializePokemon(pokemon, side)),
+} : null;
+
+const queue = battle.stepQueue || [];
+const protocolStart = arguments[1] <= queue.length ? arguments[1] : 0;
+
+const mySide = battle.mySide || battle.nearSide || battle.p1;
+const request_team = request && request.side ? request.side.pokemon.map((pokemon) => ({
+    name: pokemon.ident.split(': ').slice(1).join(': '),
+    details: pokemon.details,
+    condition: pokemon.condition,
+    active: !!pokemon.active,
+    stats: pokemon.stats,
+    moves: pokemon.moves.map((id) => dex.moves.get(id).name),
+    item: itemName(pokemon.item),
+    ability: abilityName(pokemon.ability || pokemon.baseAbility),
+    tera_type: pokemon.teraType || null,
+    terastallized: pokemon.terastallized || null,
+})) : [];
+const active_request = request && request.active ? request.active[0] : null;
+
+return {
+    turn: battle.turn,
+    ended: !!battle.ended,
+    player: serializeSide(mySide),
+    opponent: serializeSide(mySide ? mySide.foe : battle.p2),
+    team: request_team,
+    active_moves: active_request ? active_request.moves.map((move) => ({
+        name: move.move, pp: move.pp, maxpp: move.maxpp, target: move.target, disabled: !!move.disabled,
+    })) : [],
+    can_terastallize: active_request ? (active_request.canTerastallize || null) : null,
+    force_switch: !!(request && request.forceSwitch),
+    log: readLog(arguments[0]),
+    protocol: {start: protocolStart, count: queue.length, lines: queue.slice(protocolStart)},
+};
+"""
+
+def _load_selenium():
+    # Selenium is only imported once a browser is actually driven, so importing this module stays cheap
+    global webdriver, By, WebDriverWait, EC, Keys, FirefoxOptions, ActionChains
+    global TimeoutException, NoSuchElementException, StaleElementReferenceException
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+
+def create_firefox_driver():
+    _load_selenium()
+    # Set up Firefox options
+    firefox_options = FirefoxOptions()
+    #firefox_options.add_argument("--headless")  # Run in headless mode if you don't need to see the browser
+    firefox_options.set_preference("dom.webnotifications.enabled", False)
+    firefox_options.set_preference("dom.push.enabled", False)
+    driver = webdriver.Firefox(options=firefox_options)
+    driver.get(SHOWDOWN_URL)
+    return driver
+
+
+class DriverPool:
+    """Keeps browsers alive (and logged in) across battles and lends them to environments.
+
+    Logins are tracked per browser and username, so an environment only gets a browser that is logged
+    in as its own account or not logged in at all. Launching and quitting browsers happens outside the
+    lock, with the slot reserved first, so one slow Firefox doesn't hold up every other worker.
+    """
+
+    def __init__(self, size: int = 1, driver_factory=create_firefox_driver):
+        self.size = size
+        self.driver_factory = driver_factory
+        self._idle = []
+        self._drivers = []
+        self._launching = 0
+        self._logins: Dict[int, str] = {}
+        self._available = threading.Condition()
+
+    def _take_idle(self, username: Optional[str]):
+        for wanted in (username, None):
+            for driver in self._idle:
+                if self._logins.get(id(driver)) == wanted:
+                    self._idle.remove(driver)
+                    return driver
+        return None
+
+    def acquire(self, username: Optional[str] = None, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.time() + timeout
+        replaced = None
+        with self._available:
+            while True:
+                driver = self._take_idle(username)
+                if driver is not None:
+                    return driver
+                if len(self._drivers) + self._launching >= self.size and self._idle:
+                    # Every idle browser is logged in as someone else; replace the oldest one
+                    replaced = self._idle[0]
+                    self._forget(replaced)
+                if len(self._drivers) + self._launching < self.size:
+                    self._launching += 1
+                    break
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No browser became available in the pool")
+                self._available.wait(remaining)
+        if replaced is not None:
+            self._quit(replaced)
+        try:
+            driver = self.driver_factory()
+        except BaseException:
+            with self._available:
+                self._launching -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._launching -= 1
+            self._drivers.append(driver)
+        return driver
+
+    def release(self, driver):
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def discard(self, driver):
+        # Quits a browser that is broken or no longer wanted and frees its slot
+        with self._available:
+            self._forget(driver)
+            self._available.notify()
+        self._quit(driver)
+
+    def _forget(self, driver):
+        if driver in self._idle:
+            self._idle.remove(driver)
+        if driver in self._drivers:
+            self._drivers.remove(driver)
+        self._logins.pop(id(driver), None)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.error(f"Error closing driver: {str(e)}")
+
+    def is_logged_in(self, driver, username: str) -> bool:
+        return self._logins.get(id(driver)) == username
+
+    def mark_logged_in(self, driver, username: str):
+        self._logins[id(driver)] = username
+
+    def close(self):
+        with self._available:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+            self._idle.clear()
+            self._logins.clear()
+            self._available.notify_all()
+        for driver in drivers:
+            self._quit(driver)
 
 
 class PokemonShowdownEnv:
-    def __init__(self, username, password):
+    def __init__(self, username, password, timeouts: Optional[Dict[str, float]] = None,
+                 reuse_session: bool = False, driver_pool: Optional[DriverPool] = None):
+        _load_selenium()
         self.username = username
         self.password = password
+        # With reuse_session (or a pool) the browser stays logged in between battles
+        self.reuse_session = reuse_session or driver_pool is not None
+        self.driver_pool = driver_pool
+        self.driver = None
+        self.logged_in = False
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.log_reader = BattleLogReader()
+        self.protocol_parser = ProtocolParser()
+        self.protocol_cursor = 0
+        self.move_dex = get_move_dex()
         #self.game_state = self.initialize_game_state()
         #self.setup_driver()
         
@@ -87,13 +318,27 @@ class PokemonShowdownEnv:
 
         
     def setup_driver(self):
-        # Set up Firefox options
-        firefox_options = FirefoxOptions()
-        #firefox_options.add_argument("--headless")  # Run in headless mode if you don't need to see the browser
-        firefox_options.set_preference("dom.webnotifications.enabled", False)
-        firefox_options.set_preference("dom.push.enabled", False)
-        self.driver = webdriver.Firefox(options=firefox_options)
-        self.driver.get("https://play.pokemonshowdown.com/")
+        if self.driver_pool:
+            self.driver = self.driver_pool.acquire(self.username)
+            self.logged_in = self.driver_pool.is_logged_in(self.driver, self.username)
+        else:
+            self.driver = create_firefox_driver()
+            self.logged_in = False
+
+    def session_alive(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def leave_battle(self):
+        try:
+            self.driver.execute_script(LEAVE_BATTLE_SCRIPT)
+        except Exception as e:
+            logging.error(f"Error leaving battle: {str(e)}")
         
     def enter_credentials(self) -> str:
         try:
@@ -118,7 +363,8 @@ class PokemonShowdownEnv:
         except Exception as e:
             return f"Error entering credentials: {str(e)}"
         
-    def verify_match_found(self, timeout=60) -> bool:
+    def verify_match_found(self, timeout=None) -> bool:
+        timeout = timeout or self.timeouts["match"]
         try:
             # Wait for the battle interface to load
             WebDriverWait(self.driver, timeout).until(
@@ -138,37 +384,12 @@ class PokemonShowdownEnv:
         
     def update_game_state(self):
         try:
-            self.game_state.chat_log = self.get_chat_log(self.game_state.turn)
-            if self.game_state.turn == 0:
-                self.update_revealed_pokemon_from_switch_options()
-                for pokemon in self.game_state.player.revealed_pokemon:
-                    for move in pokemon.moves:
-                        self.update_move_info(move)
-                        
-            # Update the game state based on the current battle situation
-            player_pokemon = self.get_pokemon_stats('p1')
-            opponent_pokemon = self.get_pokemon_stats('p2')
-
-            self.game_state.player.active_pokemon = self.parse_player_pokemon_stats(player_pokemon)
-            self.game_state.opponent.active_pokemon = self.parse_opponent_pokemon_stats(opponent_pokemon)
-            
-            # Update moves for the active Pokémon
-            moves = self.get_move_information()
-            self.game_state.player.active_pokemon.moves = moves
-            
-            # Update opponent's active Pokémon moves with correct information
-            if self.game_state.opponent.active_pokemon and self.game_state.opponent.active_pokemon.moves:
-                for move in self.game_state.opponent.active_pokemon.moves:
-                    self.update_move_info(move)
-
-            # Update revealed Pokémon lists
-            self.update_revealed_pokemon(self.game_state.player, self.game_state.player.active_pokemon)
-            self.update_revealed_pokemon(self.game_state.opponent, self.game_state.opponent.active_pokemon)
-            
-            # Check for fainted Pokémon and update revealed_pokemon
-            revealed_pokemon_info = self.get_revealed_pokemon()
-            parsed_revealed_pokemon = self.parse_revealed_pokemon(revealed_pokemon_info)
-            self.update_fainted_pokemon(parsed_revealed_pokemon)
+            snapshot = self.get_battle_snapshot()
+            if snapshot:
+                self.update_game_state_from_snapshot(snapshot)
+            else:
+                # Fall back to scraping the rendered UI if the client objects aren't reachable
+                self.update_game_state_from_dom()
             
             self.game_state.turn += 1
             
@@ -178,7 +399,203 @@ class PokemonShowdownEnv:
             self.game_state.last_update_failed = True
         else:
             self.game_state.last_update_failed = False
+
+    def get_battle_snapshot(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self.driver.execute_script(BATTLE_SNAPSHOT_SCRIPT, self.log_reader.cursor, self.protocol_cursor)
+        except Exception as e:
+            logging.error(f"Error reading battle snapshot: {str(e)}")
+            return None
+
+    def update_game_state_from_snapshot(self, snapshot: Dict[str, Any]):
+        log_slice = snapshot.get("log") or {}
+        self.log_reader.feed(log_slice.get("entries", []), log_slice.get("start"), log_slice.get("count"))
+        self.game_state.chat_log = self.log_reader.turn_text(self.game_state.turn)
+        self.read_protocol_events(snapshot.get("protocol") or {})
+        self.game_state.player.can_terastallize = bool(snapshot.get("can_terastallize"))
+
+        player_side = snapshot.get("player") or {"pokemon": []}
+        opponent_side = snapshot.get("opponent") or {"pokemon": []}
+
+        # Our own team comes from the request JSON (exact HP, stats, item, ability, full movesets)
+        battle_pokemon = {pokemon["name"]: pokemon for pokemon in player_side["pokemon"]}
+        player_team = [
+            self._pokemon_from_request(entry, battle_pokemon.get(entry["name"]))
+            for entry in snapshot.get("team", [])
+        ]
+        if not player_team:
+            player_team = [self._pokemon_from_snapshot(pokemon, own=True) for pokemon in player_side["pokemon"]]
+        opponent_team = [self._pokemon_from_snapshot(pokemon, own=False) for pokemon in opponent_side["pokemon"]]
+
+        self.game_state.player.revealed_pokemon = [pokemon for pokemon, _ in player_team]
+        self.game_state.opponent.revealed_pokemon = [pokemon for pokemon, _ in opponent_team]
+        self.game_state.player.active_pokemon = next((pokemon for pokemon, active in player_team if active), None)
+        self.game_state.opponent.active_pokemon = next((pokemon for pokemon, active in opponent_team if active), None)
+
+        active = self.game_state.player.active_pokemon
+        if active and snapshot.get("active_moves"):
+            active.moves = [
+                self._move_from_snapshot(move) for move in snapshot["active_moves"]
+            ]
+            if snapshot.get("can_terastallize"):
+                tera_type = snapshot["can_terastallize"]
+                active.moves.append(PokemonMove(
+                    name="Terastallize",
+                    type=tera_type,
+                    category="Status",
+                    description=f"Terastallize into {tera_type} type",
+                    target="self"
+                ))
+
+    def read_protocol_events(self, protocol_slice: Dict[str, Any]) -> List[Any]:
+        # Raw protocol lines appended to the client's step queue since the last refresh
+        if protocol_slice.get("start", 0) < self.protocol_cursor:
+            self.protocol_parser = ProtocolParser()
+            self.game_state.events.clear()
+        events = self.protocol_parser.feed_lines(protocol_slice.get("lines", []))
+        self.game_state.events.extend(events)
+        self.protocol_cursor = protocol_slice.get("count", self.protocol_cursor)
+        return events
+
+    def _move_from_snapshot(self, move_data: Dict[str, Any]) -> PokemonMove:
+        move = PokemonMove(
+            name=move_data["name"],
+            current_pp=move_data.get("pp"),
+            max_pp=move_data.get("maxpp"),
+            target=move_data.get("target"),
+            disabled=bool(move_data.get("disabled"))
+        )
+        self.update_move_info(move)
+        return move
+
+    def _pokemon_from_request(self, entry: Dict[str, Any], battle_data: Optional[Dict[str, Any]]) -> Tuple[Pokemon, bool]:
+        level_match = re.search(r", L(\d+)", entry.get("details", ""))
+        level = int(level_match.group(1)) if level_match else 100
+
+        condition = entry.get("condition", "")
+        fainted = condition.endswith("fnt")
+        hp_match = re.match(r"(\d+)/(\d+)", condition)
+        current_hp, max_hp = (int(hp_match.group(1)), int(hp_match.group(2))) if hp_match else (0, None)
+        if fainted:
+            hp_percentage = "fainted"
+        else:
+            hp_percentage = str(round(current_hp / max_hp * 100, 1)) if max_hp else None
+
+        base_types = battle_data["base_types"] if battle_data else []
+        current_types = battle_data["types"] if battle_data else base_types
+        terastallized = entry.get("terastallized")
+        stats = {STAT_LABELS[key]: value for key, value in (entry.get("stats") or {}).items() if key in STAT_LABELS}
+        boosts = battle_data["boosts"] if battle_data else {}
+
+        pokemon = Pokemon(
+            name=entry["name"],
+            fainted=fainted,
+            level=level,
+            current_hp=current_hp,
+            max_hp=max_hp,
+            hp_percentage=hp_percentage,
+            status_effects=self._status_effects(battle_data),
+            current_types=[terastallized] if terastallized else current_types,
+            terastallized=bool(terastallized),
+            tera_type=terastallized or entry.get("tera_type") or "Unknown",
+            base_types=base_types,
+            possible_abilities=[entry["ability"]] if entry.get("ability") else [],
+            ability=entry.get("ability"),
+            item=entry.get("item"),
+            base_stats=stats or None,
+            current_stats=apply_boosts(stats, boosts) if stats else None,
+            moves=[self._move_from_snapshot({"name": name}) for name in entry.get("moves", [])]
+        )
+        return pokemon, entry.get("active", False)
+
+    def _pokemon_from_snapshot(self, data: Dict[str, Any], own: bool) -> Tuple[Pokemon, bool]:
+        fainted = data.get("fainted", False)
+        max_hp = data.get("maxhp") or None
+        current_hp = data.get("hp")
+        if fainted:
+            hp_percentage = "fainted"
+        else:
+            hp_percentage = str(round(current_hp / max_hp * 100, 1)) if max_hp and current_hp is not None else None
+
+        terastallized = data.get("terastallized")
+        possible_abilities = data.get("possible_abilities") or []
+        ability = data.get("ability") or (possible_abilities[0] if len(possible_abilities) == 1 else None)
+
+        speed_range = None
+        estimated_stats = None
+        base_speed = (data.get("base_stats") or {}).get("spe")
+        if not own and base_speed and data.get("level"):
+            speed_range = speed_stat_range(base_speed, data["level"])
+            estimated_stats = random_battle_stats(data["base_stats"], data["level"])
+
+        pokemon = Pokemon(
+            name=data["name"],
+            fainted=fainted,
+            level=data.get("level"),
+            current_hp=current_hp if own else None,
+            max_hp=max_hp if own else None,
+            hp_percentage=hp_percentage,
+            status_effects=self._status_effects(data),
+            current_types=data.get("types") or [],
+            terastallized=bool(terastallized),
+            tera_type=terastallized or data.get("tera_type") or "Unknown",
+            base_types=data.get("base_types") or [],
+            possible_abilities=possible_abilities,
+            ability=ability,
+            item=data.get("item"),
+            base_stats=estimated_stats,
+            current_stats=apply_boosts(estimated_stats, data.get("boosts") or {}) if estimated_stats else None,
+            opponent_speed_range=speed_range,
+            moves=[self._move_from_snapshot(move) for move in data.get("moves", [])]
+        )
+        return pokemon, data.get("active", False)
+
+    def _status_effects(self, data: Optional[Dict[str, Any]]) -> List[str]:
+        # Same labels the statbar shows: major status plus non-zero stat stages
+        if not data:
+            return []
+        status_effects = [data["status"].upper()] if data.get("status") else []
+        for stat, stage in (data.get("boosts") or {}).items():
+            if stage:
+                label = STAT_LABELS.get(stat, stat.capitalize())
+                status_effects.append(f"{stage:+d} {label}")
+        return status_effects
+
+    def update_game_state_from_dom(self):
+        self.game_state.chat_log = self.get_chat_log(self.game_state.turn)
+        # Checked first: after the last turn the active Pokémon may be gone and the rest can fail
+        self.record_battle_end()
+        if self.game_state.turn == 0:
+            self.update_revealed_pokemon_from_switch_options()
+            for pokemon in self.game_state.player.revealed_pokemon:
+                for move in pokemon.moves:
+                    self.update_move_info(move)
+                    
+        # Update the game state based on the current battle situation
+        player_pokemon = self.get_pokemon_stats('p1')
+        opponent_pokemon = self.get_pokemon_stats('p2')
+
+        self.game_state.player.active_pokemon = self.parse_player_pokemon_stats(player_pokemon)
+        self.game_state.opponent.active_pokemon = self.parse_opponent_pokemon_stats(opponent_pokemon)
         
+        # Update moves for the active Pokémon
+        moves = self.get_move_information()
+        self.game_state.player.active_pokemon.moves = moves
+        
+        # Update opponent's active Pokémon moves with correct information
+        if self.game_state.opponent.active_pokemon and self.game_state.opponent.active_pokemon.moves:
+            for move in self.game_state.opponent.active_pokemon.moves:
+                self.update_move_info(move)
+
+        # Update revealed Pokémon lists
+        self.update_revealed_pokemon(self.game_state.player, self.game_state.player.active_pokemon)
+        self.update_revealed_pokemon(self.game_state.opponent, self.game_state.opponent.active_pokemon)
+        
+        # Check for fainted Pokémon and update revealed_pokemon
+        revealed_pokemon_info = self.get_revealed_pokemon()
+        parsed_revealed_pokemon = self.parse_revealed_pokemon(revealed_pokemon_info)
+        self.update_fainted_pokemon(parsed_revealed_pokemon)
+
     def get_game_state(self) -> GameState:
         # First, update the game state
         self.update_game_state()
@@ -189,18 +606,27 @@ class PokemonShowdownEnv:
     
     def start_game(self):
         try:
-            time.sleep(2)
-            battle_button = WebDriverWait(self.driver, 10).until(
+            battle_button = WebDriverWait(self.driver, self.timeouts["element"], POLL_FREQUENCY).until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button.button.mainmenu1.big[name='search']"))
             )
             battle_button.click() # Click the battle button
             
-            result = self.enter_credentials()  # Use the method to enter both username and password
-            print(result)
-            
-            time.sleep(2)
-            
-            battle_button.click() # Click the battle button
+            # A reused session is already logged in, so the first click starts the search
+            if not self.logged_in:
+                result = self.enter_credentials()  # Use the method to enter both username and password
+                print(result)
+                
+                # Wait for the login to land instead of sleeping
+                WebDriverWait(self.driver, self.timeouts["login"], POLL_FREQUENCY).until(
+                    EC.text_to_be_present_in_element((By.CSS_SELECTOR, ".userbar"), self.username)
+                )
+                self.logged_in = True
+                if self.driver_pool:
+                    self.driver_pool.mark_logged_in(self.driver, self.username)
+                battle_button = WebDriverWait(self.driver, self.timeouts["element"], POLL_FREQUENCY).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button.button.mainmenu1.big[name='search']"))
+                )
+                battle_button.click() # Click the battle button
             
             
             print("Waiting for a match...")
@@ -214,7 +640,8 @@ class PokemonShowdownEnv:
             return f"Error starting the game: {str(e)}"
         
     def get_observation(self):
-        time.sleep(6)
+        if not self.wait_for_battle_ready():
+            print("Timeout waiting for the battle to be ready")
         self.get_game_state()
         return {
             "chat_log": self.game_state.chat_log,
@@ -228,29 +655,33 @@ class PokemonShowdownEnv:
     def reset(self):
         # Reset game state and restart the game driver
         self.game_state = self.initialize_game_state()
+        self.log_reader = BattleLogReader(self.game_state.turn_logs)
+        self.protocol_parser = ProtocolParser()
+        self.protocol_cursor = 0
         
-        # Close the current browser session
-        if hasattr(self, 'driver'):
-            self.close()
-        
-        # Set up a new driver
-        self.setup_driver()
-        
-        time.sleep(2)
+        if self.reuse_session and self.session_alive():
+            # Keep the logged-in browser, just get back to the main menu
+            self.leave_battle()
+        else:
+            # Quit the current browser session; a dead reused one can't leave its battle or go back to a pool
+            if self.driver is not None:
+                self.shutdown()
+            
+            # Set up a new driver
+            self.setup_driver()
         
         # Start a new game
         start_result = self.start_game()
         print(f"Game start result: {start_result}")
         
-        # Wait for the game to initialize
-        time.sleep(5)
-        
-        # Return the initial observation
+        # Return the initial observation (waits for the first request to render)
         return self.get_observation()
 
     def step(self, action):
         # TODO: Update game state with action and get observation
         # Execute action
+        before = self.get_battle_status()
+        previous_turn, previous_rqid = before.get("turn", 0), before.get("rqid")
         if action["type"] == "move":
             result = self.select_move(action["move_name"])
             if action["move_name"] == "Terastallize":
@@ -263,51 +694,65 @@ class PokemonShowdownEnv:
             raise ValueError(f"Invalid action type: {action['type']}")
         
         # Wait for the turn to complete
-        if self.wait_for_turn_completion():
+        if self.wait_for_turn_completion(previous_turn=previous_turn, previous_rqid=previous_rqid):
             print("Turn completed")
         else:
             print("Timeout waiting for turn completion")
 
-        time.sleep(1)
         next_observation = self.get_observation()
-        #reward = self.calculate_reward(next_observation)
-        #done = self.is_game_over()
-        #info = {"action_result": result}
+        reward = self.calculate_reward(next_observation)
+        done = self.is_game_over()
+        info = {"action_result": result}
 
-        #return next_observation, reward, done, info
-        return next_observation, 0, False, {}
+        return next_observation, reward, done, info
     
-    def is_waiting_for_opponent(self):
+    def get_battle_status(self) -> Dict[str, Any]:
         try:
-            return self.driver.find_element(By.XPATH, "//small[contains(text(), 'Waiting for opponent...')]").is_displayed()
-        except NoSuchElementException:
+            return self.driver.execute_script(BATTLE_STATUS_SCRIPT) or {}
+        except Exception as e:
+            logging.error(f"Error reading battle status: {str(e)}")
+            return {}
+
+    def is_battle_ready(self, status: Dict[str, Any]) -> bool:
+        if status.get("ended"):
+            return True
+        if status.get("waiting") or status.get("animating"):
             return False
-        
-    def is_animation_in_progress(self):
-        try:
-            skip_turn_button = self.driver.find_element(By.XPATH, "//button[@name='skipTurn']")
-            if skip_turn_button.is_displayed():
-                return True
-        except (NoSuchElementException, StaleElementReferenceException):
-            pass
+        return bool(status.get("move_menu") or status.get("switch_menu"))
 
+    def wait_for_battle_ready(self, timeout=None) -> bool:
+        # Resolves as soon as a move/switch request is rendered (or the battle is over)
+        timeout = timeout or self.timeouts["observation"]
         try:
-            go_to_end_button = self.driver.find_element(By.XPATH, "//button[@name='goToEnd']")
-            if go_to_end_button.is_displayed():
-                return True
-        except (NoSuchElementException, StaleElementReferenceException):
-            pass
+            WebDriverWait(self.driver, timeout, POLL_FREQUENCY).until(
+                lambda driver: self.is_battle_ready(self.get_battle_status())
+            )
+            return True
+        except TimeoutException:
+            return False
 
-        return False
-        
-    
-    def wait_for_turn_completion(self, max_wait_time=180):
-        wait_start = time.time()
-        while time.time() - wait_start < max_wait_time:
-            if not self.is_waiting_for_opponent() and not self.is_animation_in_progress():
+    def wait_for_turn_completion(self, max_wait_time=None, previous_turn=None, previous_rqid=None):
+        max_wait_time = max_wait_time or self.timeouts["turn"]
+        # Right after a choice is sent the old controls are still on screen, so readiness only counts
+        # once they have changed: the client is waiting, a new turn started, or a new request arrived
+        changed = previous_turn is None and previous_rqid is None
+
+        def turn_completed(driver):
+            nonlocal changed
+            status = self.get_battle_status()
+            if status.get("ended"):
                 return True
-            time.sleep(0.5)
-        return False
+            rqid = status.get("rqid")
+            if (status.get("waiting") or status.get("turn", 0) > (previous_turn or 0)
+                    or (rqid is not None and rqid != previous_rqid)):
+                changed = True
+            return changed and self.is_battle_ready(status)
+
+        try:
+            WebDriverWait(self.driver, max_wait_time, POLL_FREQUENCY).until(turn_completed)
+            return True
+        except TimeoutException:
+            return False
     
     def select_move(self, move_name):
         try:
@@ -374,9 +819,31 @@ class PokemonShowdownEnv:
         except Exception as e:
             return f"An error occurred while trying to switch: {str(e)}"
 
+    def record_battle_end(self):
+        # The DOM fallback has no protocol events, so the result is read off the last turn of the log
+        if self.get_winner() is not None:
+            return
+        for line in self.log_reader.turns.get(self.log_reader.current_turn, []):
+            match = WIN_LINE.match(line)
+            if match or TIE_LINE in line:
+                self.game_state.events.append(WinEvent(match.group(1).strip() if match else None))
+                return
+
+    def get_winner(self) -> Optional[WinEvent]:
+        for event in reversed(self.game_state.events):
+            if isinstance(event, WinEvent):
+                return event
+        return None
+
+    def is_game_over(self) -> bool:
+        return self.get_winner() is not None
+
     def calculate_reward(self, observation):
-        # Implement reward calculation
-        pass
+        # +1 for a win, -1 for a loss, 0 while the battle is running or on a tie
+        winner = self.get_winner()
+        if winner is None or winner.winner is None:
+            return 0
+        return 1 if winner.winner.lower() == self.username.lower() else -1
 
     def render(self):
         # Implement rendering logic
@@ -384,19 +851,12 @@ class PokemonShowdownEnv:
     
 
     def get_chat_log(self, turn=None):
-        chat_log = self.driver.find_element(By.CSS_SELECTOR, ".battle-log")
-        full_log = chat_log.text
-
-        if turn == 0:
-            return f"Turn 0\n{full_log}"
+        self.read_new_log_entries()
+        return self.log_reader.turn_text(turn or 0)
 
-        turn_pattern = re.compile(f"Turn {turn}\n(.*?)(?:\nTurn {turn+1}|\Z)", re.DOTALL)
-        turn_match = turn_pattern.search(full_log)
-
-        if turn_match:
-            return f"Turn {turn}\n{turn_match.group(1).strip()}"
-        else:
-            return f"Turn {turn}\nNo log found for Turn {turn}"
+    def read_new_log_entries(self) -> List[str]:
+        log_slice = self.driver.execute_script(LOG_SLICE_SCRIPT, self.log_reader.cursor) or {}
+        return self.log_reader.feed(log_slice.get("entries", []), log_slice.get("start"), log_slice.get("count"))
             
     def update_revealed_pokemon_from_switch_options(self):
         switch_options = self.get_switch_options()
@@ -450,29 +910,22 @@ class PokemonShowdownEnv:
                         revealed.current_hp = 0
                         
     def update_move_info(self, move):
-        """Update move information from the JSON file."""
-        try:
-            with open('C:/Users/JJ/OneDrive/Documents/Coding/LLMAgents/pokemonshowdown/data/pokemon_moves_no_zmoves.json', 'r') as f:
-                move_data = json.load(f)
-            
-            move_name = move.name.lower()
-            for move_info in move_data:
-                if move_info['name'].lower() == move_name:
-                    if move_info['type'] is not None:
-                        move.type = move_info['type']
-                    if move_info['category'] is not None:
-                        move.category = move_info['category']
-                    if move_info['power'] is not None:
-                        move.power = move_info['power']
-                    if move_info['accuracy'] is not None:
-                        move.accuracy = move_info['accuracy']
-                    if move_info['effect'] is not None:
-                        move.description = move_info['effect']
-                    return True
-            return False
-        except Exception as e:
-            logging.error(f"Error updating move info: {str(e)}")
+        """Update move information from the in-memory MoveDex."""
+        entry = self.move_dex.get(move.name)
+        if entry is None:
             return False
+
+        if entry.type is not None:
+            move.type = entry.type
+        if entry.category is not None:
+            move.category = entry.category
+        if entry.power is not None:
+            move.power = entry.power
+        if entry.accuracy is not None:
+            move.accuracy = entry.accuracy
+        if entry.effect is not None:
+            move.description = entry.effect
+        return True
     
     def get_pokemon_stats(self, player='p2'):
         try:
@@ -557,7 +1010,24 @@ class PokemonShowdownEnv:
                 pp_text = button.find_element(By.CSS_SELECTOR, "small.pp").text
                 current_pp, max_pp = map(int, pp_text.split('/'))
                 move_target = button.get_attribute("data-target")
-                
+
+                # Known moves come straight from the MoveDex; the button's type label covers
+                # type-changing moves like Hidden Power and Tera Blast
+                entry = self.move_dex.get(move_name)
+                if entry is not None:
+                    moves.append(PokemonMove(
+                        name=move_name,
+                        type=move_type or entry.type,
+                        category=entry.category,
+                        power=entry.power,
+                        accuracy=entry.accuracy,
+                        current_pp=current_pp,
+                        max_pp=max_pp,
+                        description=entry.effect,
+                        target=move_target
+                    ))
+                    continue
+
                 # Hover over the button to get the tooltip
                 ActionChains(self.driver).move_to_element(button).perform()
                 tooltip = WebDriverWait(self.driver, 5).until(
@@ -1123,7 +1593,29 @@ class PokemonShowdownEnv:
         return pokemon_list
 
     def close(self):
-        self.driver.quit()
+        if self.driver is None:
+            return
+        if self.reuse_session:
+            # Leave the battle but keep the browser (and login) for the next reset
+            self.leave_battle()
+            if self.driver_pool:
+                self.driver_pool.release(self.driver)
+                self.driver = None
+            return
+        self.shutdown()
+
+    def shutdown(self):
+        # Quits the browser for good, also when it was borrowed from a pool (the pool then opens a new one)
+        if self.driver is None:
+            return
+        if self.driver_pool:
+            self.driver_pool.discard(self.driver)
+        else:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logging.error(f"Error closing driver: {str(e)}")
+        self.driver = None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+STAT_LABELS = {"atk": "Atk", "def": "Def", "spa": "SpA", "spd": "SpD", "spe": "Spe"}
+
+
+def apply_boosts(stats: Dict[str, int], boosts: Dict[str, int]) -> Dict[str, int]:
+    # Stat stages: +n multiplies by (2 + n) / 2, -n by 2 / (2 + n)
+    boosted = {}
+    for key, label in STAT_LABELS.items():
+        if label not in stats:
+            continue
+        stage = boosts.get(key, 0)
+        multiplier = (2 + stage) / 2 if stage >= 0 else 2 / (2 - stage)
+        boosted[label] = int(stats[label] * multiplier)
+    return boosted
+
+
+def speed_stat_range(base_speed: int, level: int) -> Tuple[int, int]:
+    # Same bounds as the client tooltip: 0 IV/0 EV/hindering nature up to 31 IV/252 EV/boosting nature
+    low = int((int(2 * base_speed * level / 100) + 5) * 0.9)
+    high = int((int((2 * base_speed + 31 + 63) * level / 100) + 5) * 1.1)
+    return low, high
+
+
+def random_battle_stats(base_stats: Dict[str, int], level: int) -> Dict[str, int]:
+    # Random Battles sets use 31 IVs, 84 EVs and a neutral nature, so opponents' stats follow from species and level
+    stats = {"HP": int((2 * base_stats.get("hp", 80) + 31 + 21) * level / 100) + level + 10}
+    for key, label in STAT_LABELS.items():
+        stats[label] = int((2 * base_stats.get(key, 80) + 31 + 21) * level / 100) + 5
+    return stats
+
+
+def _intern(value):
+    # Names and types repeat across millions of stored states; interning keeps one copy of each string
+    return sys.intern(value) if type(value) is str else value
+
+
+class FrozenStats(dict):
+    """Read-only stat table, so clones share it instead of copying it."""
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrozenStats is read-only, assign a new table instead")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return FrozenStats, (dict(self),)
+
+
+@dataclass(frozen=True, slots=True)
+class MoveInfo:
+    """What a move is, as opposed to how much of it is left; one shared record per distinct move."""
+    name: str
+    type: Optional[str] = None
+    category: Optional[str] = None  # Physical, Special, or Status
+    power: Optional[int] = None
+    accuracy: Optional[Union[int, str]] = None  # int from the MoveDex, tooltip text such as "can't miss" otherwise
+    max_pp: Optional[int] = None
+    description: Optional[str] = None
+    target: Optional[str] = None
+
+    def __post_init__(self):
+        for name in ("name", "type", "category"):
+            object.__setattr__(self, name, _intern(getattr(self, name)))
+
+
+_MOVE_INFOS: Dict[MoveInfo, MoveInfo] = {}
+
+
+def _shared_info(info: MoveInfo) -> MoveInfo:
+    # Every Pokémon (and every stored state) using the same move points at the same record
+    return _MOVE_INFOS.setdefault(info, info)
+
+
+def _move_info_field(name: str) -> property:
+    def get(self):
+        return getattr(self.info, name)
+
+    def set(self, value):
+        # Copy-on-write: other copies keep the record they share
+        self.info = _shared_info(replace(self.info, **{name: value}))
+
+    return property(get, set)
+
+
+@dataclass(slots=True, init=False)
+class PokemonMove:
+    """One move slot: the shared MoveInfo plus the PP and disabled state of this copy.
+
+    The MoveInfo attributes (name, type, power, ...) read and write through to the record, so callers
+    use a PokemonMove as before while clones only copy the two fields that change during a battle.
+    """
+    info: MoveInfo
+    current_pp: Optional[int]
+    disabled: bool  # Disable, Taunt, Choice lock, etc. as reported by the request
+
+    def __init__(self, name: str, type: Optional[str] = None, category: Optional[str] = None,
+                 power: Optional[int] = None, accuracy: Optional[Union[int, str]] = None,
+                 current_pp: Optional[int] = None, max_pp: Optional[int] = None, description: Optional[str] = None,
+                 target: Optional[str] = None, disabled: bool = False):
+        self.info = _shared_info(MoveInfo(name, type, category, power, accuracy, max_pp, description, target))
+        self.current_pp = current_pp
+        self.disabled = disabled
+
+    name = _move_info_field("name")
+    type = _move_info_field("type")
+    category = _move_info_field("category")
+    power = _move_info_field("power")
+    accuracy = _move_info_field("accuracy")
+    max_pp = _move_info_field("max_pp")
+    description = _move_info_field("description")
+    target = _move_info_field("target")
+
+    def clone(self) -> "PokemonMove":
+        new = object.__new__(PokemonMove)
+        new.info, new.current_pp, new.disabled = self.info, self.current_pp, self.disabled
+        return new
+
+
+@dataclass(slots=True)
+class Pokemon:
+    """A Pokémon as seen by one side.
+
+    `base_types`, `possible_abilities` and `base_stats` rarely change, so they are stored immutable
+    (tuples and FrozenStats) and shared between clones; assign new values to change them. clone()
+    copies the rest: moves, status effects, current types and current stats.
+    """
+    name: str
+    fainted: bool = False
+    level: Optional[int] = None
+    current_hp: Optional[int] = None
+    max_hp: Optional[int] = None
+    hp_percentage: Optional[str] = None
+    status_effects: List[str] = field(default_factory=list)
+    current_types: List[str] = field(default_factory=list)
+    terastallized: bool = False
+    tera_type: Optional[str] = None
+    base_types: Tuple[str, ...] = ()
+    possible_abilities: Tuple[str, ...] = ()
+    ability: Optional[str] = None
+    item: Optional[str] = None
+    base_stats: Optional[FrozenStats] = None
+    current_stats: Optional[Dict[str, int]] = None
+    opponent_speed_range: Optional[Tuple[int, int]] = None
+    moves: List[PokemonMove] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.name, self.tera_type = _intern(self.name), _intern(self.tera_type)
+        self.ability, self.item = _intern(self.ability), _intern(self.item)
+        self.current_types = [_intern(t) for t in self.current_types]
+        self.freeze()
+
+    def freeze(self):
+        # Also run by clone(), so a list or dict assigned to a shared field is converted before it is shared
+        if type(self.base_types) is not tuple:
+            self.base_types = tuple(_intern(t) for t in self.base_types)
+        if type(self.possible_abilities) is not tuple:
+            self.possible_abilities = tuple(_intern(a) for a in self.possible_abilities)
+        if self.base_stats is not None and type(self.base_stats) is not FrozenStats:
+            self.base_stats = FrozenStats(self.base_stats)
+
+    def clone(self) -> "Pokemon":
+        self.freeze()
+        new = object.__new__(Pokemon)
+        new.name, new.fainted, new.level = self.name, self.fainted, self.level
+        new.current_hp, new.max_hp, new.hp_percentage = self.current_hp, self.max_hp, self.hp_percentage
+        new.status_effects = list(self.status_effects)
+        new.current_types = list(self.current_types)
+        new.terastallized, new.tera_type = self.terastallized, self.tera_type
+        new.base_types, new.possible_abilities = self.base_types, self.possible_abilities
+        new.ability, new.item = self.ability, self.item
+        new.base_stats = self.base_stats
+        new.current_stats = dict(self.current_stats) if self.current_stats is not None else None
+        new.opponent_speed_range = self.opponent_speed_range
+        new.moves = [move.clone() for move in self.moves]
+        return new
+
+
+@dataclass(slots=True)
+class Player:
+    name: str
+    revealed_pokemon: List[Pokemon]
+    active_pokemon: Optional[Pokemon]
+    can_terastallize: bool = True
+
+    def clone(self) -> "Player":
+        new = object.__new__(Player)
+        new.name, new.can_terastallize = self.name, self.can_terastallize
+        new.revealed_pokemon = [pokemon.clone() for pokemon in self.revealed_pokemon]
+        # Keep the active Pokémon pointing into the copied team
+        active = self.active_pokemon
+        new.active_pokemon = next((c for o, c in zip(self.revealed_pokemon, new.revealed_pokemon) if o is active),
+                                  active.clone() if active is not None else None)
+        return new
+
+
+@dataclass(slots=True)
+class GameState:
+    player: Player
+    opponent: Player
+    turn: int
+    chat_log: str
+    last_update_failed: bool = False
+    turn_logs: Dict[int, List[str]] = field(default_factory=dict)  # Battle log lines keyed by turn number
+    events: List[Any] = field(default_factory=list)  # Typed protocol events (see battle_protocol.py)
+
+    def clone(self) -> "GameState":
+        """Independent copy for search and simulation; the log history is copied as well."""
+        new = self.snapshot()
+        new.turn_logs = {turn: list(lines) for turn, lines in self.turn_logs.items()}
+        new.events = list(self.events)
+        return new
+
+    def snapshot(self) -> "GameState":
+        """Like clone() but without the turn logs and protocol events, for replay buffers and search nodes."""
+        new = object.__new__(GameState)
+        new.player, new.opponent = self.player.clone(), self.opponent.clone()
+        new.turn, new.chat_log, new.last_update_failed = self.turn, self.chat_log, self.last_update_failed
+        new.turn_logs, new.events = {}, []
+        return new
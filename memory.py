@@ -0,0 +1,137 @@
+import re
+from typing import Callable, Dict, List, Optional
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+POLICIES = ("full", "window", "summary", "latest")
+
+
+def count_tokens(text: str) -> int:
+    # tiktoken when available, otherwise the usual ~4 characters per token estimate
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    # +4 per message for the role/separator overhead of chat formats
+    return sum(count_tokens(message["content"]) + 4 for message in messages)
+
+
+def extractive_summary(previous_summary: str, turns: List[List[Dict[str, str]]]) -> str:
+    """Cheap summarizer: keeps each evicted turn's number, battle events and chosen actions."""
+    lines = [previous_summary] if previous_summary else []
+    for turn in turns:
+        turn_number = None
+        events = []
+        actions = []
+        for message in turn:
+            content = message["content"]
+            if message["role"] == "user":
+                match = re.search(r"Turn: (\d+)", content)
+                if match and turn_number is None:
+                    turn_number = match.group(1)
+                events_match = re.search(r"Recent battle events:\s*(.*?)\n\s*\n", content, re.DOTALL)
+                if events_match:
+                    events.extend(line.strip() for line in events_match.group(1).split("\n")[1:] if line.strip())
+            else:
+                actions.extend(re.findall(r"Action: (.+)", content))
+        summary = f"Turn {turn_number or '?'}:"
+        if events:
+            summary += " " + " ".join(events)
+        if actions:
+            summary += " We chose " + ", then ".join(actions) + "."
+        lines.append(summary)
+    return "\n".join(lines)
+
+
+class ConversationMemory:
+    """Holds the agent's conversation and decides what gets sent on each call.
+
+    Messages are grouped into turns (a full observation plus any follow-ups such as the
+    Terastallize confirmation). The system prompt and the optional `prefix` messages come first
+    and never change within a battle, so providers can reuse their cached prefix. Policies:
+      full    - everything, the original behaviour
+      window  - system prompt plus the last `window_turns` turns
+      summary - like window, plus a rolling summary of the turns that fell out of the window
+      latest  - system prompt plus the current turn only
+    """
+
+    def __init__(self, system: str = "", policy: str = "full", window_turns: int = 3,
+                 summarizer: Optional[Callable] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown memory policy: {policy}")
+        self.system = system
+        self.policy = policy
+        self.window_turns = max(window_turns, 1)
+        self.summarizer = summarizer or extractive_summary
+        self.prefix: List[Dict[str, str]] = []
+        self.turns: List[List[Dict[str, str]]] = []
+        self.summary = ""
+        self.summarized_turns = 0
+        # Running size of the unbounded history, to report what the policy saves
+        self.full_history_tokens = count_tokens(system) + 4 if system else 0
+
+    def set_prefix(self, messages: List[Dict[str, str]]):
+        # Static per-battle context (e.g. the team sheet), sent right after the system prompt
+        for message in self.prefix:
+            self.full_history_tokens -= count_tokens(message["content"]) + 4
+        self.prefix = list(messages)
+        for message in self.prefix:
+            self.full_history_tokens += count_tokens(message["content"]) + 4
+
+    def prefix_length(self) -> int:
+        # Number of leading messages in messages() that stay identical from call to call
+        return (1 if self.system else 0) + len(self.prefix)
+
+    def add_user(self, content: str, new_turn: bool = True):
+        if new_turn or not self.turns:
+            self.turns.append([])
+        self._add({"role": "user", "content": content})
+
+    def add_assistant(self, content: str):
+        if not self.turns:
+            self.turns.append([])
+        self._add({"role": "assistant", "content": content})
+
+    def _add(self, message: Dict[str, str]):
+        self.turns[-1].append(message)
+        self.full_history_tokens += count_tokens(message["content"]) + 4
+
+    def _kept_turns(self) -> List[List[Dict[str, str]]]:
+        if self.policy == "full":
+            return self.turns
+        if self.policy == "latest":
+            return self.turns[-1:]
+        return self.turns[-self.window_turns:]
+
+    def _update_summary(self):
+        # Fold turns that just left the window into the rolling summary
+        evicted_until = max(len(self.turns) - self.window_turns, 0)
+        if evicted_until > self.summarized_turns:
+            self.summary = self.summarizer(self.summary, self.turns[self.summarized_turns:evicted_until])
+            self.summarized_turns = evicted_until
+
+    def messages(self) -> List[Dict[str, str]]:
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        messages.extend(self.prefix)
+        # The rolling summary changes as turns are evicted, so it goes after the static prefix
+        if self.policy == "summary":
+            self._update_summary()
+            if self.summary:
+                messages.append({"role": "user", "content": f"Summary of earlier turns:\n{self.summary}"})
+                messages.append({"role": "assistant", "content": "Understood."})
+        for turn in self._kept_turns():
+            messages.extend(turn)
+        return messages
+
+    def token_report(self, messages: Optional[List[Dict[str, str]]] = None) -> Dict[str, int]:
+        sent = count_message_tokens(messages if messages is not None else self.messages())
+        return {"prompt_tokens": sent, "full_history_tokens": self.full_history_tokens,
+                "saved_tokens": max(self.full_history_tokens - sent, 0)}
@@ -0,0 +1,125 @@
+import json
+import os
+import re
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+
+from data_bundle import DataBundle, get_bundle
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+MOVES_PATH = os.path.join(DATA_DIR, "pokemon_moves_no_zmoves.json")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+_HIDDEN_POWER = "hiddenpower"
+
+
+def normalize_name(name: str) -> str:
+    # Same idea as Showdown's toID(): "U-turn", "u turn" and "Uturn" all become "uturn"
+    return _NON_ALNUM.sub("", name.lower())
+
+
+def _to_int(value) -> Optional[int]:
+    # The scraped data stores numbers as strings and uses "∞" for moves that can't miss
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class MoveEntry:
+    name: str
+    type: Optional[str]
+    category: Optional[str]
+    power: Optional[int]
+    accuracy: Optional[int]  # None means the move can't miss
+    pp: Optional[int]
+    effect: Optional[str]
+    probability: Optional[int]
+    z_move: bool = False
+
+
+class MoveDex:
+    """In-memory move table keyed on normalized move names."""
+
+    def __init__(self, moves: Dict[str, MoveEntry]):
+        self._moves = moves
+
+    @classmethod
+    def from_json(cls, path: str = MOVES_PATH) -> "MoveDex":
+        with open(path, "r", encoding="utf-8") as f:
+            raw_moves = json.load(f)
+
+        moves = {}
+        for raw in raw_moves:
+            entry = MoveEntry(
+                name=raw["name"],
+                type=raw.get("type") or None,
+                category=raw.get("category") or None,
+                power=_to_int(raw.get("power")),
+                accuracy=_to_int(raw.get("accuracy")),
+                pp=_to_int(raw.get("pp")),
+                effect=raw.get("effect") or None,
+                probability=_to_int(raw.get("probability")),
+            )
+            moves[normalize_name(entry.name)] = entry
+        return cls(moves)
+
+    @classmethod
+    def from_bundle(cls, bundle: DataBundle, include_z_moves: bool = False) -> "MoveDex":
+        def number(value: int) -> Optional[int]:
+            return value if value >= 0 else None
+
+        moves = {}
+        # tolist() turns the records into plain tuples in one pass, much faster than indexing each field
+        for name, type_id, category, effect, power, accuracy, pp, probability, z_move in bundle.moves.tolist():
+            if z_move and not include_z_moves:
+                continue
+            entry = MoveEntry(
+                name=bundle.string(name),
+                type=bundle.string(type_id) or None,
+                category=bundle.string(category) or None,
+                power=number(power),
+                accuracy=number(accuracy),
+                pp=number(pp),
+                effect=bundle.string(effect) or None,
+                probability=number(probability),
+                z_move=bool(z_move),
+            )
+            moves[normalize_name(entry.name)] = entry
+        return cls(moves)
+
+    def get(self, name: str) -> Optional[MoveEntry]:
+        if not name:
+            return None
+        key = normalize_name(name)
+        entry = self._moves.get(key)
+        if entry is not None:
+            return entry
+
+        # "Hidden Power Fire" / "Hidden Power [Fire]" share the Hidden Power entry with the type filled in
+        if key.startswith(_HIDDEN_POWER) and _HIDDEN_POWER in self._moves:
+            hidden_power = self._moves[_HIDDEN_POWER]
+            type_suffix = key[len(_HIDDEN_POWER):].rstrip("0123456789").capitalize()
+            return replace(hidden_power, type=type_suffix or hidden_power.type)
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def __iter__(self) -> Iterator[MoveEntry]:
+        return iter(self._moves.values())
+
+
+@lru_cache(maxsize=None)
+def get_move_dex(path: Optional[str] = None) -> MoveDex:
+    # Loaded once per process and shared by every environment instance; the compiled bundle unless a JSON path is given
+    if path is None:
+        return MoveDex.from_bundle(get_bundle())
+    return MoveDex.from_json(path)
@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional
+
+from type_chart import format_effectiveness
+
+
+def _pokemon_state(pokemon) -> Dict[str, Any]:
+    # Only the fields whose changes are worth telling the model about
+    return {
+        "level": pokemon.level,
+        "hp": pokemon.hp_percentage,
+        "status": tuple(pokemon.status_effects),
+        "types": tuple(pokemon.current_types),
+        "terastallized": pokemon.terastallized,
+        "tera_type": pokemon.tera_type,
+        "item": pokemon.item,
+        "ability": pokemon.ability,
+        "moves": {move.name: move.current_pp for move in pokemon.moves if move.name != "Terastallize"},
+    }
+
+
+def _team_state(team) -> Dict[str, Dict[str, Any]]:
+    return {pokemon.name: _pokemon_state(pokemon) for pokemon in team}
+
+
+class ObservationEncoder:
+    """Turns observations into prompts that only describe what changed since the last one.
+
+    The first observation, and every `full_every`-th one after it, is sent as the full
+    Agent.format_observation snapshot so the model can always re-anchor.
+    """
+
+    def __init__(self, agent, full_every: int = 5):
+        self.agent = agent
+        self.full_every = max(full_every, 1)
+        self.sent = 0
+        self.last_state: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+
+    def reset(self):
+        self.sent = 0
+        self.last_state = None
+
+    def encode(self, observation: Dict[str, Any]) -> str:
+        state = {
+            "player": _team_state(observation["p1 Team Revealed"]),
+            "opponent": _team_state(observation["p2 Team Revealed"]),
+        }
+        full = self.last_state is None or self.sent % self.full_every == 0
+        if full:
+            message = self.agent.format_observation(observation, self.agent.env)
+        else:
+            message = self.format_delta(observation, self.last_state, state)
+        self.last_state = state
+        self.sent += 1
+        return message
+
+    def format_delta(self, observation, previous, current) -> str:
+        active = observation["p1 Active Pokemon"]
+        opponent = observation["p2 Active Pokemon"]
+        can_terastallize = self.agent.env.game_state.player.can_terastallize
+
+        changes = []
+        for side, label in (("player", "Your"), ("opponent", "Opponent's")):
+            changes.extend(self.diff_team(label, previous[side], current[side]))
+
+        lines = [
+            "Game state update (only changes since the last observation are listed):",
+            f"Turn: {observation['turn']}",
+            "",
+            "Recent battle events:",
+            observation["chat_log"],
+            "",
+            f"Terastallize Available: {'Yes' if can_terastallize else 'No'}",
+            "",
+            f"Your active Pokémon: {active.name} ({', '.join(active.current_types)}) "
+            f"HP: {active.current_hp}/{active.max_hp} ({active.hp_percentage}%)"
+            + (f" Status: {', '.join(active.status_effects)}" if active.status_effects else ""),
+            f"Opponent's active Pokémon: {opponent.name} ({', '.join(opponent.current_types)}) "
+            f"HP: {opponent.hp_percentage}%"
+            + (f" Status: {', '.join(opponent.status_effects)}" if opponent.status_effects else ""),
+            "",
+            "Available moves:",
+            self.format_moves_compact(active.moves, opponent),
+            "",
+            "Changes:",
+            "\n".join(changes) if changes else "No other changes.",
+            "",
+            "What action do you want to take? Use the same analysis as before.",
+        ]
+        return "\n".join(lines)
+
+    def format_moves_compact(self, moves, target) -> str:
+        # Descriptions were already sent with the last full snapshot
+        formatted = []
+        for i, move in enumerate(moves, 1):
+            move_info = f"{i}. {move.name} ({move.type}, {move.category}"
+            if move.power:
+                move_info += f", Power: {move.power}"
+                if target and target.current_types and move.category and move.category.lower() != "status":
+                    multiplier = self.agent.type_chart.effectiveness(move.type, target.current_types)
+                    move_info += f", {format_effectiveness(multiplier)}"
+            if move.current_pp is not None:
+                move_info += f", PP: {move.current_pp}/{move.max_pp}"
+            formatted.append(move_info + ")")
+        return "\n".join(formatted)
+
+    def diff_team(self, label: str, previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> List[str]:
+        changes = []
+        for name, state in current.items():
+            before = previous.get(name)
+            if before is None:
+                changes.append(f"- {label} {name} revealed (Level {state['level']}, Types: {', '.join(state['types'])}"
+                               f", HP: {state['hp']}%)")
+                continue
+            if state["hp"] != before["hp"]:
+                if state["hp"] == "fainted":
+                    changes.append(f"- {label} {name} fainted")
+                else:
+                    changes.append(f"- {label} {name} HP: {before['hp']}% -> {state['hp']}%")
+            if state["status"] != before["status"]:
+                status = ", ".join(state["status"]) or "none"
+                changes.append(f"- {label} {name} status: {status}")
+            if state["terastallized"] and not before["terastallized"]:
+                changes.append(f"- {label} {name} Terastallized into {state['tera_type']}")
+            elif state["types"] != before["types"]:
+                changes.append(f"- {label} {name} types: {', '.join(state['types'])}")
+            elif state["tera_type"] != before["tera_type"]:
+                changes.append(f"- {label} {name} Tera Type: {state['tera_type']}")
+            for field in ("item", "ability"):
+                if state[field] != before[field]:
+                    changes.append(f"- {label} {name} {field}: {state[field] or 'none'}")
+            for move, pp in state["moves"].items():
+                if move not in before["moves"]:
+                    changes.append(f"- {label} {name} revealed move: {move}")
+                elif pp != before["moves"][move] and pp is not None and label != "Your":
+                    changes.append(f"- {label} {name} {move} PP: {before['moves'][move]} -> {pp}")
+        return changes
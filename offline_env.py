@@ -0,0 +1,547 @@
+import random
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from game_state import GameState, Player, Pokemon, PokemonMove, STAT_LABELS, apply_boosts, random_battle_stats
+from move_dex import MoveEntry, get_move_dex
+from type_chart import TYPE_INDEX, TYPES, get_type_chart
+
+STAT_KEYS = {"attack": "atk", "defense": "def", "special attack": "spa", "special defense": "spd", "speed": "spe"}
+STATUS_IMMUNE_TYPES = {"PAR": ("Electric",), "BRN": ("Fire",), "FRZ": ("Ice",), "PSN": ("Poison", "Steel"),
+                       "TOX": ("Poison", "Steel"), "SLP": ()}
+STATUS_PATTERNS = [
+    (re.compile(r"badly poison"), "TOX"),
+    (re.compile(r"paraly"), "PAR"),
+    (re.compile(r"\bburn"), "BRN"),
+    (re.compile(r"poison"), "PSN"),
+    (re.compile(r"freez"), "FRZ"),
+    (re.compile(r"sleep"), "SLP"),
+]
+# Status the move inflicts on the opponent; STATUS_PATTERNS only says a status is mentioned at all
+INFLICT_PATTERNS = [
+    (re.compile(r"badly poisons? (?:the )?(?:opponent|target)\b"), "TOX"),
+    (re.compile(r"paralyze[sd]? (?:the )?(?:opponent|target)\b"), "PAR"),
+    (re.compile(r"\bburns? (?:the )?(?:opponent|target)\b"), "BRN"),
+    (re.compile(r"poisons? (?:the )?(?:opponent|target)\b"), "PSN"),
+    (re.compile(r"freezes? (?:the )?(?:opponent|target)\b"), "FRZ"),
+    (re.compile(r"puts? (?:the )?(?:opponent|target) to sleep"), "SLP"),
+]
+# One clause per raise/lower; a clause without a subject ("... but lowers Defense") keeps the previous one
+BOOST_PATTERN = re.compile(
+    r"(sharply |harshly |drastically )?(raises?|lowers?) (all )?(?:(user's|opponent's|target's|its) )?([a-z ,]+)")
+CLAUSE_SPLIT = re.compile(r"\.\s*|,? but |;\s*| and (?=(?:sharply |harshly |drastically )?(?:raises|lowers))")
+# Conditions, delays and side effects the engine cannot play out; such moves are kept out of generated sets
+UNSUPPORTED_PHRASES = ("only works", "only if", " if ", "on contact", "switching", "next turn", "cures", "while",
+                       "user sleeps", "protects", "fails", "turns", "charges", "must recharge", "traps", "confus",
+                       "flinch", "critical", "multiple times", "2-5 times", "twice", "weather", "terrain", "next",
+                       "plus/minus", "-types", "ally", "allies")
+
+
+@dataclass(frozen=True)
+class MoveEffect:
+    """What the simulator does with a move beyond damage, parsed from the dataset's effect text."""
+    priority: int = 0
+    heal: float = 0.0
+    drain: float = 0.0
+    recoil: float = 0.0
+    status: Optional[str] = None
+    chance: float = 1.0
+    self_boosts: Tuple[Tuple[str, int], ...] = ()
+    target_boosts: Tuple[Tuple[str, int], ...] = ()
+    supported: bool = True  # False when the text has parts the engine ignores
+
+
+@lru_cache(maxsize=None)
+def move_effect(entry: MoveEntry) -> MoveEffect:
+    text = (entry.effect or "").lower().replace("sp. ", "special ")
+    # "May burn opponent" can follow a guaranteed part, as in "User receives recoil damage. May burn opponent."
+    secondary = re.search(r"\bmay\b", text) is not None
+    chance = (entry.probability or 10) / 100 if secondary else 1.0
+
+    status = next((code for pattern, code in INFLICT_PATTERNS if pattern.search(text)), None)
+    mentions_status = any(pattern.search(text) for pattern, _ in STATUS_PATTERNS)
+
+    self_boosts, target_boosts = [], []
+    who = None
+    for clause in CLAUSE_SPLIT.split(text):
+        match = BOOST_PATTERN.search(clause)
+        if not match:
+            continue
+        sharply, verb, every, subject, stats = match.groups()
+        # "its" points back at whoever the move hit, as in "Poisons opponent and lowers its Speed"
+        who = {"its": "opponent's"}.get(subject, subject) or who or "user's"
+        amount = {"sharply ": 2, "harshly ": 2, "drastically ": 3}.get(sharply, 1) * (1 if verb.startswith("raise") else -1)
+        names = list(STAT_KEYS) if every else [s.strip() for s in re.split(r",| and ", stats.split(" by ")[0]) if s.strip()]
+        boosts = [(STAT_KEYS[name], amount) for name in names if name in STAT_KEYS]
+        (self_boosts if who == "user's" else target_boosts).extend(boosts)
+
+    supported = not any(phrase in f" {text} " for phrase in UNSUPPORTED_PHRASES) and (status is not None or not mentions_status)
+    return MoveEffect(
+        priority=1 if "attacks first" in text or "goes first" in text else 0,
+        heal=0.5 if "recovers half its max hp" in text or "restores half its max hp" in text else 0.0,
+        drain=0.5 if "recovers half the hp inflicted" in text else 0.0,
+        recoil=1 / 3 if "recoil" in text else 0.0,
+        status=status,
+        chance=chance,
+        self_boosts=tuple(self_boosts),
+        target_boosts=tuple(target_boosts),
+        supported=supported,
+    )
+
+
+def _move_from_entry(entry: MoveEntry) -> PokemonMove:
+    max_pp = entry.pp * 8 // 5 if entry.pp else None
+    return PokemonMove(name=entry.name, type=entry.type, category=entry.category, power=entry.power,
+                       accuracy=entry.accuracy, current_pp=max_pp, max_pp=max_pp, description=entry.effect)
+
+
+@lru_cache(maxsize=None)
+def _move_pools() -> Tuple[Dict[str, List[MoveEntry]], List[MoveEntry]]:
+    # Reasonable attacks per type plus support moves the engine knows how to play out
+    damaging, support = {}, []
+    for entry in get_move_dex():
+        if not move_effect(entry).supported:
+            continue
+        if entry.category in ("physical", "special") and entry.power and 60 <= entry.power <= 120 \
+                and (entry.accuracy or 100) >= 80 and entry.type and entry.type.lower() in TYPE_INDEX:
+            damaging.setdefault(entry.type, []).append(entry)
+        elif entry.category == "status":
+            effect = move_effect(entry)
+            if effect.heal or effect.self_boosts or effect.status:
+                support.append(entry)
+    return damaging, support
+
+
+def random_pokemon(rng: random.Random, index: int, level: Optional[int] = None) -> Pokemon:
+    """A synthetic species: random types, base stats and a four-move set built from the move data.
+
+    The datasets have no Pokédex, so species are generated rather than sampled from real ones.
+    """
+    types = rng.sample(TYPES, rng.choice((1, 2)))
+    level = level or rng.randint(75, 95)
+    base = {key: rng.randint(50, 125) for key in ("hp", "atk", "def", "spa", "spd", "spe")}
+    stats = random_battle_stats(base, level)
+    physical = base["atk"] >= base["spa"]
+
+    damaging, support = _move_pools()
+    moves: List[MoveEntry] = []
+
+    def pick(pool):
+        options = [m for m in pool if m not in moves and (m.category == "physical") == physical] or \
+                  [m for m in pool if m not in moves]
+        if options:
+            moves.append(rng.choice(options))
+
+    for t in types:
+        pick(damaging.get(t, []))
+    while len(moves) < 3:
+        pick(damaging[rng.choice([t for t in damaging if t not in types])])
+    if rng.random() < 0.6:
+        moves.append(rng.choice([m for m in support if m not in moves]))
+    else:
+        pick(damaging[rng.choice(list(damaging))])
+
+    max_hp = stats.pop("HP")
+    return Pokemon(
+        name=f"{'-'.join(types)} {index + 1}",
+        level=level,
+        current_hp=max_hp,
+        max_hp=max_hp,
+        hp_percentage="100.0",
+        current_types=list(types),
+        base_types=list(types),
+        tera_type=rng.choice(TYPES),
+        base_stats=stats,
+        current_stats=dict(stats),
+        moves=[_move_from_entry(entry) for entry in moves],
+    )
+
+
+def random_team(rng: random.Random, size: int = 6, level: Optional[int] = None) -> List[Pokemon]:
+    return [random_pokemon(rng, i, level) for i in range(size)]
+
+
+def random_policy(env: "OfflineShowdownEnv", side: int) -> Dict[str, Any]:
+    # Uniform over legal actions, terastallizing now and then
+    action = dict(env.rng.choice(env.legal_actions(side)))
+    if action["type"] == "move" and env.can_terastallize[side] and env.rng.random() < 0.1:
+        action["terastallize"] = True
+    return action
+
+
+class OfflineShowdownEnv:
+    """Pure-Python singles battle engine with the same reset/step interface as PokemonShowdownEnv.
+
+    Runs without a browser or server for fast RL training. It models the damage formula, STAB,
+    Terastallization, priority, speed order, accuracy, major status, stat stages, drain, recoil and healing
+    moves. Abilities, items, weather, hazards and volatile effects are not modelled. Side 0 is us ("p1"),
+    side 1 is the opponent, driven by `opponent_policy(env, side)`.
+
+    Like a real battle, the opponent's Pokémon, moves and tera type only show up in observations once
+    revealed. Set `log=False` to skip building the battle log text when only throughput matters.
+    """
+
+    def __init__(self, seed: Optional[int] = None, team_size: int = 6, level: Optional[int] = None,
+                 opponent_policy: Optional[Callable] = None, teams: Optional[Callable] = None,
+                 max_turns: int = 300, log: bool = True):
+        self.rng = random.Random(seed)
+        self.team_size = team_size
+        self.level = level
+        self.opponent_policy = opponent_policy or random_policy
+        # teams(rng) -> (our team, their team); defaults to two random teams
+        self.teams = teams
+        self.max_turns = max_turns
+        self.log_enabled = log
+        chart = get_type_chart()
+        self._chart = chart.matrix.tolist()
+        self.game_state: Optional[GameState] = None
+        self.done = True
+
+    def reset(self):
+        if self.teams:
+            ours, theirs = self.teams(self.rng)
+        else:
+            ours = random_team(self.rng, self.team_size, self.level)
+            theirs = random_team(self.rng, self.team_size, self.level)
+        self.sides = [ours, theirs]
+        self.active = [ours[0], theirs[0]]
+        self.movesets = [{p.name: p.moves for p in ours}, {p.name: p.moves for p in theirs}]
+        self.tera_types = [{p.name: p.tera_type for p in ours}, {p.name: p.tera_type for p in theirs}]
+        self.boosts = [{}, {}]
+        self.status = [{}, {}]
+        self.sleep_turns = [{}, {}]
+        self.toxic_turns = [{}, {}]
+        self.can_terastallize = [True, True]
+        self.pending_terastallize = False
+        self.winner: Optional[int] = None
+        self.done = False
+        self.lines: List[str] = []
+
+        for pokemon in theirs:
+            # What we know about them is filled in as it gets revealed
+            pokemon.moves = []
+            pokemon.tera_type = "Unknown"
+        player = Player(name="p1", revealed_pokemon=ours, active_pokemon=ours[0])
+        opponent = Player(name="p2", revealed_pokemon=[theirs[0]], active_pokemon=theirs[0])
+        self.game_state = GameState(player=player, opponent=opponent, turn=1, chat_log="")
+        self._log(f"Go! {ours[0].name}!")
+        self._log(f"The opposing player sent out {theirs[0].name}!")
+        self._end_log(0)
+        return self.get_observation()
+
+    def step(self, action):
+        if action["type"] == "move" and action["move_name"] == "Terastallize":
+            # Same two-step flow as the browser: flag tera now, submit it with the next move
+            if not self.can_terastallize[0]:
+                return "Cannot terastallize as you are already terastallized"
+            self.pending_terastallize = True
+            active = self.active[0]
+            return f"You have selected to terastallize {active.name} into the {self.tera_types[0][active.name]} type."
+        if self.done:
+            return self.get_observation(), self.calculate_reward(None), True, {"action_result": "The battle is over"}
+
+        turn = self.game_state.turn
+        try:
+            ours = self._resolve(0, action)
+        except ValueError as e:
+            return self.get_observation(), 0, False, {"action_result": str(e)}
+        if action.get("terastallize"):
+            self.pending_terastallize = True
+
+        if self.active[0].fainted:
+            # Replacing a fainted Pokémon doesn't use up a turn
+            self._switch(0, ours[1])
+        else:
+            theirs = self._resolve(1, self.opponent_policy(self, 1))
+            self._play_turn(ours, theirs)
+        self.pending_terastallize = False
+        self._end_log(turn)
+
+        observation = self.get_observation()
+        return observation, self.calculate_reward(observation), self.done, {"action_result": f"{ours[0]} {ours[1].name}"}
+
+    def get_observation(self):
+        return {
+            "chat_log": self.game_state.chat_log,
+            "p1 Active Pokemon": self.game_state.player.active_pokemon,
+            "p2 Active Pokemon": self.game_state.opponent.active_pokemon,
+            "p1 Team Revealed": self.game_state.player.revealed_pokemon,
+            "p2 Team Revealed": self.game_state.opponent.revealed_pokemon,
+            "turn": self.game_state.turn
+        }
+
+    def is_game_over(self) -> bool:
+        return self.done
+
+    def calculate_reward(self, observation):
+        # +1 for a win, -1 for a loss, 0 while the battle is running or on a tie
+        if not self.done or self.winner is None:
+            return 0
+        return 1 if self.winner == 0 else -1
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def legal_actions(self, side: int = 0) -> List[Dict[str, str]]:
+        active = self.active[side]
+        switches = [{"type": "switch", "switch_name": p.name} for p in self.sides[side] if p is not active and not p.fainted]
+        if active.fainted:
+            return switches
+        moves = [{"type": "move", "move_name": m.name} for m in self.movesets[side][active.name] if m.current_pp]
+        return (moves or [{"type": "move", "move_name": "Struggle"}]) + switches
+
+    def _resolve(self, side: int, action) -> Tuple[str, Any]:
+        active = self.active[side]
+        if action["type"] == "switch":
+            target = next((p for p in self.sides[side] if p.name.lower() == action["switch_name"].strip().lower()), None)
+            if target is None:
+                raise ValueError(f"Could not find {action['switch_name']} in the switch options")
+            if target is active or target.fainted:
+                raise ValueError(f"Cannot switch to {action['switch_name']} as it is fainted or active")
+            return "switch", target
+        if active.fainted:
+            raise ValueError(f"{active.name} has fainted, choose a Pokémon to switch in")
+        if action["move_name"] == "Struggle":
+            return "move", PokemonMove(name="Struggle", type=None, category="physical", power=50)
+        move = next((m for m in self.movesets[side][active.name]
+                     if m.name.lower() == action["move_name"].strip().lower()), None)
+        if move is None:
+            raise ValueError(f"Could not find move: {action['move_name']}")
+        if not move.current_pp:
+            raise ValueError(f"Cannot select {move.name} as it is disabled")
+        if side == 1 and action.get("terastallize") and self.can_terastallize[1]:
+            self._terastallize(1)
+        return "move", move
+
+    def _speed(self, side: int) -> float:
+        pokemon = self.active[side]
+        speed = (pokemon.current_stats or {}).get("Spe", 100)
+        return speed / 2 if self.status[side].get(pokemon.name) == "PAR" else speed
+
+    def _play_turn(self, ours, theirs):
+        if self.pending_terastallize and self.can_terastallize[0] and ours[0] == "move":
+            self._terastallize(0)
+        choices = [ours, theirs]
+        for side in (0, 1):
+            if choices[side][0] == "switch":
+                self._switch(side, choices[side][1])
+
+        order = [side for side in (0, 1) if choices[side][0] == "move"]
+        order.sort(key=lambda s: (move_effect_for(choices[s][1]).priority, self._speed(s), self.rng.random()), reverse=True)
+        movers = {side: self.active[side] for side in order}
+        for side in order:
+            if self.active[side] is movers[side] and not movers[side].fainted and not self.done:
+                self._use_move(side, choices[side][1])
+
+        if not self.done:
+            for side in (0, 1):
+                self._residual(side)
+            self._check_faints()
+        if not self.done:
+            self.game_state.turn += 1
+            if self.game_state.turn > self.max_turns:
+                self.done = True
+                self._log("The battle ended in a tie.")
+
+    def _terastallize(self, side: int):
+        pokemon = self.active[side]
+        tera_type = self.tera_types[side][pokemon.name]
+        pokemon.terastallized = True
+        pokemon.tera_type = tera_type
+        pokemon.current_types = [tera_type]
+        self.can_terastallize[side] = False
+        if side == 0:
+            self.game_state.player.can_terastallize = False
+        self._log(f"{self._label(side, pokemon)} has Terastallized into the {tera_type}-type!")
+
+    def _switch(self, side: int, pokemon: Pokemon):
+        previous = self.active[side]
+        self.boosts[side].pop(previous.name, None)
+        self._refresh(side, previous)
+        self.toxic_turns[side].pop(previous.name, None)
+        self.active[side] = pokemon
+        player = self.game_state.player if side == 0 else self.game_state.opponent
+        player.active_pokemon = pokemon
+        if pokemon not in player.revealed_pokemon:
+            player.revealed_pokemon.append(pokemon)
+        self._log(f"Go! {pokemon.name}!" if side == 0 else f"The opposing player sent out {pokemon.name}!")
+
+    def _use_move(self, side: int, move: PokemonMove):
+        attacker, defender = self.active[side], self.active[1 - side]
+        label = self._label(side, attacker)
+        status = self.status[side].get(attacker.name)
+        if status == "SLP":
+            turns = self.sleep_turns[side].get(attacker.name, 0)
+            if turns > 0:
+                self.sleep_turns[side][attacker.name] = turns - 1
+                self._log(f"{label} is fast asleep.")
+                return
+            self._set_status(side, attacker, None)
+            self._log(f"{label} woke up!")
+        elif status == "FRZ":
+            if self.rng.random() >= 0.2:
+                self._log(f"{label} is frozen solid!")
+                return
+            self._set_status(side, attacker, None)
+            self._log(f"{label} thawed out!")
+        elif status == "PAR" and self.rng.random() < 0.25:
+            self._log(f"{label} is paralyzed! It can't move!")
+            return
+
+        if move.current_pp:
+            move.current_pp -= 1
+        if side == 1:
+            self._reveal_move(attacker, move)
+        self._log(f"{label} used {move.name}!")
+        if isinstance(move.accuracy, int) and self.rng.random() * 100 >= move.accuracy:
+            self._log(f"{self._label(1 - side, defender)} avoided the attack!")
+            return
+
+        effect = move_effect_for(move)
+        if move.power and move.category != "status":
+            damage = self._damage(side, attacker, defender, move)
+            if damage is None:
+                self._log(f"It doesn't affect {self._label(1 - side, defender)}...")
+                return
+            dealt = min(damage, defender.current_hp)
+            self._set_hp(1 - side, defender, defender.current_hp - dealt)
+            if dealt and effect.drain:
+                self._set_hp(side, attacker, min(attacker.max_hp, attacker.current_hp + max(int(dealt * effect.drain), 1)))
+            if dealt and (effect.recoil or move.name == "Struggle"):
+                recoil = int(attacker.max_hp / 4) if move.name == "Struggle" else int(dealt * effect.recoil)
+                self._set_hp(side, attacker, max(attacker.current_hp - max(recoil, 1), 0))
+            if self.rng.random() < effect.chance and not defender.fainted:
+                self._apply_secondary(1 - side, defender, effect)
+            if effect.self_boosts and (effect.chance >= 1 or self.rng.random() < effect.chance):
+                self._boost(side, attacker, effect.self_boosts)
+        else:
+            if effect.heal:
+                self._set_hp(side, attacker, min(attacker.max_hp, attacker.current_hp + int(attacker.max_hp * effect.heal)))
+            if effect.self_boosts:
+                self._boost(side, attacker, effect.self_boosts)
+            if effect.status or effect.target_boosts:
+                self._apply_secondary(1 - side, defender, effect)
+        self._check_faints()
+
+    def _damage(self, side: int, attacker: Pokemon, defender: Pokemon, move: PokemonMove) -> Optional[int]:
+        effectiveness = 1.0
+        attack_type = TYPE_INDEX.get((move.type or "").lower())
+        if attack_type is not None:
+            for defender_type in defender.current_types:
+                effectiveness *= self._chart[attack_type][TYPE_INDEX[defender_type.lower()]]
+        if effectiveness == 0:
+            return None
+        physical = move.category == "physical"
+        attack = attacker.current_stats["Atk" if physical else "SpA"]
+        defence = defender.current_stats["Def" if physical else "SpD"]
+        base = int(int(int(2 * attacker.level / 5 + 2) * move.power * attack / max(defence, 1)) / 50) + 2
+        damage = int(base * self.rng.randint(85, 100) / 100)
+        if move.type in attacker.base_types or move.type in attacker.current_types:
+            original = attacker.terastallized and move.type == attacker.tera_type and move.type in attacker.base_types
+            damage = int(damage * (2.0 if original else 1.5))
+        damage = int(damage * effectiveness)
+        if physical and self.status[side].get(attacker.name) == "BRN":
+            damage = int(damage / 2)
+        if effectiveness > 1:
+            self._log("It's super effective!")
+        elif effectiveness < 1:
+            self._log("It's not very effective...")
+        return max(damage, 1)
+
+    def _apply_secondary(self, side: int, pokemon: Pokemon, effect: MoveEffect):
+        if effect.status and not self.status[side].get(pokemon.name) \
+                and not any(t in pokemon.current_types for t in STATUS_IMMUNE_TYPES[effect.status]):
+            self._set_status(side, pokemon, effect.status)
+            if effect.status == "SLP":
+                self.sleep_turns[side][pokemon.name] = self.rng.randint(1, 3)
+            self._log(f"{self._label(side, pokemon)} was inflicted with {effect.status}!")
+        if effect.target_boosts:
+            self._boost(side, pokemon, effect.target_boosts)
+
+    def _boost(self, side: int, pokemon: Pokemon, boosts):
+        stages = self.boosts[side].setdefault(pokemon.name, {})
+        for stat, amount in boosts:
+            stages[stat] = max(-6, min(6, stages.get(stat, 0) + amount))
+            self._log(f"{self._label(side, pokemon)}'s {STAT_LABELS[stat]} {'rose' if amount > 0 else 'fell'}!")
+        self._refresh(side, pokemon)
+
+    def _residual(self, side: int):
+        pokemon = self.active[side]
+        status = self.status[side].get(pokemon.name)
+        if pokemon.fainted or status not in ("BRN", "PSN", "TOX"):
+            return
+        if status == "TOX":
+            turns = self.toxic_turns[side].get(pokemon.name, 0) + 1
+            self.toxic_turns[side][pokemon.name] = turns
+            damage = pokemon.max_hp * turns // 16
+        else:
+            damage = pokemon.max_hp // (16 if status == "BRN" else 8)
+        self._set_hp(side, pokemon, max(pokemon.current_hp - max(damage, 1), 0))
+        self._log(f"{self._label(side, pokemon)} was hurt by its {'burn' if status == 'BRN' else 'poisoning'}!")
+
+    def _check_faints(self):
+        for side in (0, 1):
+            pokemon = self.active[side]
+            if pokemon.current_hp <= 0 and not pokemon.fainted:
+                pokemon.fainted = True
+                pokemon.hp_percentage = "fainted"
+                self._log(f"{self._label(side, pokemon)} fainted!")
+        remaining = [[p for p in team if not p.fainted] for team in self.sides]
+        if not remaining[0] or not remaining[1]:
+            self.done = True
+            self.winner = None if not remaining[0] and not remaining[1] else (0 if remaining[0] else 1)
+            self._log(f"{'p1' if self.winner == 0 else 'p2'} won the battle!" if self.winner is not None else "Tie!")
+        elif self.active[1].fainted:
+            # The opponent replaces its fainted Pokémon right away; we get asked through the next step
+            choice = self.opponent_policy(self, 1)
+            if choice["type"] != "switch":
+                choice = self.rng.choice(self.legal_actions(1))
+            self._switch(1, self._resolve(1, choice)[1])
+
+    def _set_hp(self, side: int, pokemon: Pokemon, hp: int):
+        pokemon.current_hp = hp
+        pokemon.hp_percentage = str(round(hp / pokemon.max_hp * 100, 1))
+
+    def _set_status(self, side: int, pokemon: Pokemon, status: Optional[str]):
+        self.status[side][pokemon.name] = status
+        self._refresh(side, pokemon)
+
+    def _refresh(self, side: int, pokemon: Pokemon):
+        # Same labels the browser environment uses: major status plus non-zero stat stages
+        status = self.status[side].get(pokemon.name)
+        boosts = self.boosts[side].get(pokemon.name, {})
+        effects = [status] if status else []
+        effects += [f"{stage:+d} {STAT_LABELS[stat]}" for stat, stage in boosts.items() if stage]
+        pokemon.status_effects = effects
+        pokemon.current_stats = apply_boosts(pokemon.base_stats, boosts)
+
+    def _reveal_move(self, pokemon: Pokemon, move: PokemonMove):
+        if not any(known is move for known in pokemon.moves):
+            pokemon.moves.append(move)
+
+    def _label(self, side: int, pokemon: Pokemon) -> str:
+        return pokemon.name if side == 0 else f"The opposing {pokemon.name}"
+
+    def _log(self, line: str):
+        if self.log_enabled:
+            self.lines.append(line)
+
+    def _end_log(self, turn: int):
+        if self.log_enabled:
+            self.game_state.chat_log = f"Turn {turn}\n" + "\n".join(self.lines)
+            self.lines = []
+
+
+def move_effect_for(move: PokemonMove) -> MoveEffect:
+    return _effect_by_name(move.name)
+
+
+@lru_cache(maxsize=None)
+def _effect_by_name(name: str) -> MoveEffect:
+    entry = get_move_dex().get(name)
+    return move_effect(entry) if entry is not None else MoveEffect()
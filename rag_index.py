@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from data_bundle import get_bundle
+
+VECTOR_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vector_store")
+EMBEDDINGS_FILE = "embeddings.f16"
+IDS_FILE = "ids.json"
+META_FILE = "meta.json"
+INDEX_VERSION = 1
+# Rows upcast to float32 at a time while scoring, so the mapped matrix is never copied whole
+SEARCH_CHUNK = 1024
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Dependency-free text embedder: hashed unigrams and bigrams, signed, sublinear tf, L2-normalized.
+
+    It only captures lexical overlap, which is what matching move, item and ability names needs. Any
+    callable mapping a list of texts to an (n, dim) array can be used in its place.
+    """
+
+    name = "hashing-v1"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> Dict[int, float]:
+        tokens = _TOKEN.findall(text.lower())
+        counts: Dict[int, float] = {}
+        for token in tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(token.encode("utf-8"))
+            index = h % self.dim
+            counts[index] = counts.get(index, 0.0) + (1.0 if (h >> 31) & 1 else -1.0)
+        return counts
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, count in self._features(text).items():
+                vectors[row, index] = np.sign(count) * (1 + np.log(abs(count))) if count else 0.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-8)
+
+
+def _documents() -> List[Dict[str, str]]:
+    # Z-moves are left out, like in the MoveDex
+    bundle, string = get_bundle(), get_bundle().string
+    documents = []
+    for move in bundle.moves[bundle.moves["z_move"] == 0]:
+        details = f"{string(move['type'])} {string(move['category'])} move"
+        if move["power"] > 0:
+            details += f", power {move['power']}"
+        documents.append({"kind": "move", "name": string(move["name"]), "text": string(move["effect"]), "details": details})
+    for item in bundle.items:
+        documents.append({"kind": "item", "name": string(item["name"]), "text": string(item["effect"]),
+                          "details": string(item["category"])})
+    for ability in bundle.abilities:
+        documents.append({"kind": "ability", "name": string(ability["name"]), "text": string(ability["description"]),
+                          "details": ""})
+    return documents
+
+
+def build_index(directory: str = VECTOR_STORE_DIR, embedder: Optional[Callable] = None) -> "EmbeddingIndex":
+    """Embeds every move, item and ability description and writes the index files to `directory`."""
+    embedder = embedder or HashingEmbedder()
+    documents = _documents()
+    texts = [f"{d['name']} {d['kind']}. {d['details']}. {d['text']}" for d in documents]
+    vectors = np.asarray(embedder(texts), dtype=np.float16)
+
+    os.makedirs(directory, exist_ok=True)
+    matrix = np.memmap(os.path.join(directory, EMBEDDINGS_FILE), dtype=np.float16, mode="w+", shape=vectors.shape)
+    matrix[:] = vectors
+    matrix.flush()
+    del matrix
+    with open(os.path.join(directory, IDS_FILE), "w", encoding="utf-8") as f:
+        json.dump(documents, f, ensure_ascii=False)
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "count": vectors.shape[0], "dim": vectors.shape[1],
+                   "embedder": getattr(embedder, "name", type(embedder).__name__)}, f)
+    return EmbeddingIndex.load(directory, embedder)
+
+
+class EmbeddingIndex:
+    """Brute-force top-k cosine search over a memory-mapped float16 embedding matrix.
+
+    Loading only maps the file, so it is close to free. Searches score the mapped rows chunk by chunk,
+    so every process using the index shares the same page cache instead of holding its own copy.
+    """
+
+    def __init__(self, matrix: np.ndarray, documents: List[Dict[str, str]], embedder: Callable):
+        self.matrix = matrix
+        self.documents = documents
+        self.embedder = embedder
+        self.kinds = np.array([d["kind"] for d in documents])
+        self.names = {d["name"].lower(): i for i, d in enumerate(documents)}
+
+    @classmethod
+    def load(cls, directory: str = VECTOR_STORE_DIR, embedder: Optional[Callable] = None) -> "EmbeddingIndex":
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["version"] != INDEX_VERSION:
+            raise ValueError(f"Index version {meta['version']} does not match {INDEX_VERSION}, rebuild it")
+        embedder = embedder or HashingEmbedder(meta["dim"])
+        name = getattr(embedder, "name", type(embedder).__name__)
+        dim = getattr(embedder, "dim", None) or np.asarray(embedder(["dimension probe"])).shape[1]
+        if (meta["embedder"], meta["dim"]) != (name, dim):
+            raise ValueError(f"Index was built with {meta['embedder']} ({meta['dim']} dimensions) but the embedder "
+                             f"is {name} ({dim} dimensions), rebuild it")
+        matrix = np.memmap(os.path.join(directory, EMBEDDINGS_FILE), dtype=np.float16, mode="r",
+                           shape=(meta["count"], meta["dim"]))
+        with open(os.path.join(directory, IDS_FILE), "r", encoding="utf-8") as f:
+            documents = json.load(f)
+        return cls(matrix, documents, embedder)
+
+    def search_many(self, queries: Sequence[str], k: int = 5, kinds: Optional[Sequence[str]] = None,
+                    exclude: Sequence[int] = ()) -> List[List[Dict[str, object]]]:
+        query_vectors = np.asarray(self.embedder(list(queries)), dtype=np.float32)
+        scores = np.empty((len(query_vectors), self.matrix.shape[0]), dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], SEARCH_CHUNK):
+            rows = np.asarray(self.matrix[start:start + SEARCH_CHUNK], dtype=np.float32)
+            scores[:, start:start + SEARCH_CHUNK] = query_vectors @ rows.T
+        if kinds is not None:
+            scores[:, ~np.isin(self.kinds, list(kinds))] = -np.inf
+        if len(exclude):
+            scores[:, list(exclude)] = -np.inf
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            results.append([dict(self.documents[i], score=float(row[i]), id=int(i)) for i in ordered if row[i] > -np.inf])
+        return results
+
+    def search(self, query: str, k: int = 5, kinds: Optional[Sequence[str]] = None) -> List[Dict[str, object]]:
+        return self.search_many([query], k, kinds)[0]
+
+    def lookup(self, name: str) -> Optional[Dict[str, str]]:
+        index = self.names.get((name or "").lower())
+        return self.documents[index] if index is not None else None
+
+
+@lru_cache(maxsize=None)
+def get_index(directory: str = VECTOR_STORE_DIR) -> EmbeddingIndex:
+    # Built on first use if the store is empty, then just memory-mapped
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        return build_index(directory)
+    return EmbeddingIndex.load(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the move/item/ability embedding index")
+    parser.add_argument("--output", default=VECTOR_STORE_DIR)
+    parser.add_argument("--dim", type=int, default=512)
+    args = parser.parse_args()
+    index = build_index(args.output, HashingEmbedder(args.dim))
+    print(f"Indexed {len(index.documents)} descriptions into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
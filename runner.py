@@ -0,0 +1,201 @@
+import argparse
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+
+@dataclass
+class BattleResult:
+    index: int
+    reward: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+class BattleRunner:
+    """Plays many battles concurrently, each with its own environment and agent.
+
+    `env_factory(index)` and `agent_factory(env, index, llm_semaphore)` build fresh objects per battle,
+    so no state or logs are shared. Concurrency is bounded separately for whole battles, for live
+    browsers and for in-flight LLM requests.
+
+    With `accounts`, every running battle checks out its own `(username, password)` pair and the factory
+    is called as `env_factory(index, account)`. Showdown joins every connection of an account to each of
+    its battles, so browser battles that share an account would see (and act in) each other's games.
+    """
+
+    def __init__(self, env_factory: Callable, agent_factory: Callable, max_concurrent_battles: int = 4,
+                 max_browsers: Optional[int] = None, max_llm_calls: Optional[int] = None,
+                 accounts: Optional[List[Tuple[str, Optional[str]]]] = None):
+        if accounts is not None and max_concurrent_battles > len(accounts):
+            raise ValueError(f"{max_concurrent_battles} concurrent battles need as many accounts, "
+                             f"got {len(accounts)}")
+        self.env_factory = env_factory
+        self.agent_factory = agent_factory
+        self.max_concurrent_battles = max_concurrent_battles
+        self.accounts: Optional[queue.Queue] = None
+        if accounts is not None:
+            self.accounts = queue.Queue()
+            for account in accounts:
+                self.accounts.put(account)
+        self.browser_slots = threading.BoundedSemaphore(max_browsers) if max_browsers else None
+        self.llm_semaphore = threading.BoundedSemaphore(max_llm_calls) if max_llm_calls else None
+        self.results: List[BattleResult] = []
+        self.elapsed = 0.0
+
+    def run_battle(self, index: int) -> BattleResult:
+        start = time.time()
+        result = BattleResult(index=index)
+        account = self.accounts.get() if self.accounts is not None else None
+        if self.browser_slots:
+            self.browser_slots.acquire()
+        env = None
+        try:
+            env = self.env_factory(index, account) if account is not None else self.env_factory(index)
+            agent = self.agent_factory(env, index, self.llm_semaphore)
+            result.reward = agent.battle_loop() or 0
+        except Exception as e:
+            logging.error(f"Battle {index} failed: {str(e)}")
+            result.error = str(e)
+        finally:
+            # battle_loop closes the env when it finishes; after a failure the browser or socket is still open
+            if env is not None:
+                try:
+                    env.close()
+                except Exception as e:
+                    logging.error(f"Closing battle {index} failed: {str(e)}")
+            if self.browser_slots:
+                self.browser_slots.release()
+            if account is not None:
+                self.accounts.put(account)
+        result.duration = time.time() - start
+        return result
+
+    def run(self, n_battles: int) -> List[BattleResult]:
+        start = time.time()
+        self.results = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_battles) as executor:
+            futures = [executor.submit(self.run_battle, i) for i in range(n_battles)]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results.append(result)
+                print(f"Battle {result.index} finished: reward={result.reward} "
+                      f"({result.duration:.1f}s){' error: ' + result.error if result.error else ''}")
+        self.elapsed = time.time() - start
+        self.results.sort(key=lambda r: r.index)
+        return self.results
+
+    def summary(self) -> dict:
+        finished = [r for r in self.results if r.error is None]
+        wins = sum(1 for r in finished if r.reward > 0)
+        losses = sum(1 for r in finished if r.reward < 0)
+        decided = wins + losses
+        return {
+            "battles": len(self.results),
+            "wins": wins,
+            "losses": losses,
+            "undecided": len(finished) - decided,
+            "errors": len(self.results) - len(finished),
+            "win_rate": wins / decided if decided else 0.0,
+            "elapsed_seconds": self.elapsed,
+            "battles_per_hour": len(self.results) / self.elapsed * 3600 if self.elapsed else 0.0,
+            "mean_battle_seconds": sum(r.duration for r in self.results) / len(self.results) if self.results else 0.0,
+        }
+
+
+def load_accounts() -> List[Tuple[str, Optional[str]]]:
+    # SHOWDOWN_ACCOUNTS="user1:pass1,user2:pass2" for concurrent browser battles, else the single account
+    accounts = []
+    for entry in os.getenv("SHOWDOWN_ACCOUNTS", "").split(","):
+        if entry.strip():
+            username, _, password = entry.strip().partition(":")
+            accounts.append((username, password or None))
+    if not accounts:
+        accounts.append((os.getenv("SHOWDOWN_USERNAME"), os.getenv("SHOWDOWN_PASSWORD")))
+    return accounts
+
+
+def main():
+    from openai import OpenAI
+    from battle_agent import Agent, SYSTEM_PROMPT
+    from damage_calc import DamageCalculator
+    from memory import ConversationMemory, POLICIES
+
+    parser = argparse.ArgumentParser(description="Play many Showdown battles concurrently")
+    parser.add_argument("--battles", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="Battles played at the same time")
+    parser.add_argument("--max-browsers", type=int, default=None, help="Firefox instances alive at once")
+    parser.add_argument("--max-llm-calls", type=int, default=None, help="LLM requests in flight at once")
+    parser.add_argument("--backend", choices=["browser", "websocket"], default="browser")
+    parser.add_argument("--log-dir", default="pokemonshowdown/battle_logs")
+    parser.add_argument("--votes", type=int, default=1, help="Self-consistency samples per decision")
+    parser.add_argument("--decision-cache", default=None, help="SQLite file for reusing decisions across battles")
+    parser.add_argument("--memory", choices=POLICIES, default="full", help="What past turns are sent to the model")
+    parser.add_argument("--window-turns", type=int, default=3, help="Turns kept by the window and summary policies")
+    parser.add_argument("--delta-observations", action="store_true", help="Send only what changed between turns")
+    parser.add_argument("--full-every", type=int, default=5, help="Full observation every N turns with deltas")
+    parser.add_argument("--stream", action="store_true", help="Act on the first complete Action line")
+    parser.add_argument("--damage-calc", action="store_true", help="Add damage ranges and KO chances to observations")
+    args = parser.parse_args()
+    if args.decision_cache and args.votes > 1:
+        parser.error("--decision-cache only works with single temperature 0 completions, drop --votes")
+
+    load_dotenv()
+    os.makedirs(args.log_dir, exist_ok=True)
+    client = OpenAI(api_key=os.getenv("OPENROUTER_API_KEY"), base_url="https://openrouter.ai/api/v1")
+    accounts = load_accounts()
+    if args.backend == "browser" and args.concurrency > len(accounts):
+        parser.error(f"--concurrency {args.concurrency} needs one Showdown account per browser battle, "
+                     f"only {len(accounts)} configured in SHOWDOWN_ACCOUNTS")
+    decision_cache = None
+    if args.decision_cache:
+        from decision_cache import DecisionCache
+        decision_cache = DecisionCache(args.decision_cache)
+
+    driver_pool = None
+    if args.backend == "browser":
+        # Browsers stay open and logged in between battles instead of cold-starting Firefox every time
+        from environment import DriverPool
+        driver_pool = DriverPool(size=args.max_browsers or args.concurrency)
+
+    def env_factory(index, account=None):
+        if args.backend == "websocket":
+            # Battles of one account share a socket that serializes searches and routes by room id
+            from websocket_env import ShowdownWebSocketEnv
+            username, password = accounts[0]
+            return ShowdownWebSocketEnv(username, password)
+        from environment import PokemonShowdownEnv
+        username, password = account
+        return PokemonShowdownEnv(username=username, password=password, reuse_session=True, driver_pool=driver_pool)
+
+    def agent_factory(env, index, llm_semaphore):
+        log_path = os.path.join(args.log_dir, f"battle_{index}.txt")
+        memory = ConversationMemory(SYSTEM_PROMPT, policy=args.memory, window_turns=args.window_turns)
+        return Agent(client=client, env=env, system=SYSTEM_PROMPT, log_path=log_path, llm_semaphore=llm_semaphore,
+                     memory=memory, delta_observations=args.delta_observations, full_every=args.full_every,
+                     stream=args.stream, damage_calculator=DamageCalculator() if args.damage_calc else None,
+                     decision_cache=decision_cache, votes=args.votes)
+
+    runner = BattleRunner(env_factory, agent_factory, max_concurrent_battles=args.concurrency,
+                          max_browsers=args.max_browsers, max_llm_calls=args.max_llm_calls,
+                          accounts=accounts if args.backend == "browser" else None)
+    try:
+        runner.run(args.battles)
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+    for key, value in runner.summary().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+    if decision_cache is not None:
+        print(f"decision cache: {decision_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
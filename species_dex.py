@@ -0,0 +1,94 @@
+import json
+import os
+import urllib.request
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from move_dex import DATA_DIR, normalize_name
+
+SPECIES_PATH = os.path.join(DATA_DIR, "pokemon_species.json")
+POKEDEX_URL = "https://play.pokemonshowdown.com/data/pokedex.json"
+
+
+@dataclass(frozen=True)
+class SpeciesEntry:
+    name: str
+    types: Tuple[str, ...]
+    base_stats: Dict[str, int]  # Protocol keys: hp, atk, def, spa, spd, spe
+    abilities: Tuple[str, ...]
+    base_species: Optional[str] = None
+
+
+class SpeciesDex:
+    """Species -> types, abilities and base stats, keyed on normalized species names.
+
+    The battle protocol only ever names species, so browserless backends need this table to know
+    what an opposing Pokémon can be.
+    """
+
+    def __init__(self, species: Dict[str, SpeciesEntry]):
+        self._species = species
+
+    @classmethod
+    def from_json(cls, path: str = SPECIES_PATH) -> "SpeciesDex":
+        # Showdown's pokedex.json layout: {"id": {"name", "types", "baseStats", "abilities": {"0", "1", "H"}}}
+        with open(path, "r", encoding="utf-8") as f:
+            raw_species = json.load(f)
+
+        species = {}
+        for key, raw in raw_species.items():
+            if not raw.get("types") or not raw.get("baseStats"):
+                continue
+            entry = SpeciesEntry(
+                name=raw.get("name", key),
+                types=tuple(raw["types"]),
+                base_stats=dict(raw["baseStats"]),
+                abilities=tuple(dict.fromkeys(raw.get("abilities", {}).values())),
+                base_species=raw.get("baseSpecies"),
+            )
+            species[normalize_name(entry.name)] = entry
+        return cls(species)
+
+    def get(self, name: str) -> Optional[SpeciesEntry]:
+        if not name:
+            return None
+        entry = self._species.get(normalize_name(name))
+        if entry is None and "-" in name:
+            # Cosmetic formes ("Gastrodon-East", "Vivillon-Fancy") aren't listed separately
+            entry = self._species.get(normalize_name(name.split("-", 1)[0]))
+        return entry
+
+    def types(self, name: str) -> List[str]:
+        entry = self.get(name)
+        return list(entry.types) if entry else []
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return len(self._species)
+
+    def __iter__(self) -> Iterator[SpeciesEntry]:
+        return iter(self._species.values())
+
+
+def download_species(path: str = SPECIES_PATH, url: str = POKEDEX_URL) -> str:
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    json.loads(data)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+@lru_cache(maxsize=None)
+def get_species_dex(path: str = SPECIES_PATH) -> SpeciesDex:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} is missing; run `python species_dex.py` to download the Showdown Pokédex")
+    return SpeciesDex.from_json(path)
+
+
+if __name__ == "__main__":
+    dex = SpeciesDex.from_json(download_species())
+    print(f"Wrote {SPECIES_PATH}: {len(dex)} species")
@@ -0,0 +1,213 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_state import GameState, Pokemon, PokemonMove
+from move_dex import get_move_dex
+from type_chart import TYPE_INDEX, TYPES, get_type_chart
+
+# Bump whenever the layout below changes; saved policies should check it
+ENCODER_VERSION = 1
+
+TEAM_SLOTS = 6
+MOVE_SLOTS = 4
+STATUSES = ["BRN", "PAR", "SLP", "FRZ", "PSN", "TOX"]
+STAT_ORDER = ["Atk", "Def", "SpA", "SpD", "Spe"]
+CATEGORIES = ["physical", "special", "status"]
+STAGE_PATTERN = re.compile(r"^([+-]\d+) (Atk|Def|SpA|SpD|Spe)$")
+
+# Field name and width, in order. Offsets are computed below.
+GLOBAL_FIELDS = [
+    ("turn", 1),                # turn / 100, capped at 1
+    ("can_terastallize", 1),
+    ("player_remaining", 1),    # healthy Pokémon / 6
+    ("opponent_remaining", 1),  # revealed healthy Pokémon plus unrevealed ones / 6
+]
+MOVE_FIELDS = [
+    ("present", 1),
+    ("type", len(TYPES)),       # one-hot
+    ("category", len(CATEGORIES)),
+    ("power", 1),               # / 150
+    ("accuracy", 1),            # / 100, 1 for moves that can't miss
+    ("pp", 1),                  # current / max, 1 when unknown
+    ("effectiveness", 1),       # log2 multiplier vs the opposing active Pokémon, / 2
+]
+POKEMON_FIELDS = [
+    ("present", 1),
+    ("active", 1),
+    ("fainted", 1),
+    ("hp", 1),                  # fraction of max HP
+    ("level", 1),               # / 100
+    ("types", len(TYPES)),      # current types, multi-hot
+    ("tera_type", len(TYPES)),  # one-hot, all zero when unknown
+    ("terastallized", 1),
+    ("status", len(STATUSES)),
+    ("stages", len(STAT_ORDER)),  # stat stage / 6
+    ("stats", len(STAT_ORDER)),   # stat / 500, zero when unknown
+    ("moves", MOVE_SLOTS * sum(width for _, width in MOVE_FIELDS)),
+]
+
+
+def _offsets(fields: Sequence[Tuple[str, int]]) -> Tuple[Dict[str, slice], int]:
+    offsets, position = {}, 0
+    for name, width in fields:
+        offsets[name] = slice(position, position + width)
+        position += width
+    return offsets, position
+
+
+MOVE_OFFSETS, MOVE_SIZE = _offsets(MOVE_FIELDS)
+POKEMON_OFFSETS, POKEMON_SIZE = _offsets(POKEMON_FIELDS)
+GLOBAL_OFFSETS, GLOBAL_SIZE = _offsets(GLOBAL_FIELDS)
+PLAYER_OFFSET = GLOBAL_SIZE
+OPPONENT_OFFSET = PLAYER_OFFSET + TEAM_SLOTS * POKEMON_SIZE
+OBSERVATION_SIZE = OPPONENT_OFFSET + TEAM_SLOTS * POKEMON_SIZE
+
+
+def layout() -> List[Tuple[str, int, int]]:
+    """(name, offset, width) of every field in the vector, e.g. ("player.0.hp", 7, 1)."""
+    fields = [(name, s.start, s.stop - s.start) for name, s in GLOBAL_OFFSETS.items()]
+    for side, base in (("player", PLAYER_OFFSET), ("opponent", OPPONENT_OFFSET)):
+        for slot in range(TEAM_SLOTS):
+            start = base + slot * POKEMON_SIZE
+            for name, s in POKEMON_OFFSETS.items():
+                if name != "moves":
+                    fields.append((f"{side}.{slot}.{name}", start + s.start, s.stop - s.start))
+                    continue
+                for move in range(MOVE_SLOTS):
+                    move_start = start + s.start + move * MOVE_SIZE
+                    for move_name, m in MOVE_OFFSETS.items():
+                        fields.append((f"{side}.{slot}.move{move}.{move_name}", move_start + m.start, m.stop - m.start))
+    return fields
+
+
+def hp_fraction(pokemon: Pokemon) -> float:
+    if pokemon.fainted or pokemon.hp_percentage == "fainted":
+        return 0.0
+    if pokemon.current_hp is not None and pokemon.max_hp:
+        return pokemon.current_hp / pokemon.max_hp
+    try:
+        return float(pokemon.hp_percentage) / 100
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class StateEncoder:
+    """Maps a GameState to a fixed-layout float32 vector (see `layout()` and ENCODER_VERSION).
+
+    Slot 0 of each side is the active Pokémon, then the rest in team order; unrevealed slots are all
+    zero. Move features fall back to the move dataset when a move only has a name. encode() and
+    encode_batch() write into preallocated buffers that are reused between calls, so copy the result
+    if it needs to outlive the next call.
+    """
+
+    version = ENCODER_VERSION
+    size = OBSERVATION_SIZE
+
+    def __init__(self):
+        self.move_dex = get_move_dex()
+        self._chart = get_type_chart().matrix.tolist()
+        self.buffer = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        self.batch_buffer = np.zeros((0, OBSERVATION_SIZE), dtype=np.float32)
+
+    def __call__(self, game_state: GameState) -> np.ndarray:
+        return self.encode(game_state)
+
+    def encode(self, game_state: GameState, out: Optional[np.ndarray] = None) -> np.ndarray:
+        out = self.buffer if out is None else out
+        out[:] = 0
+        player, opponent = game_state.player, game_state.opponent
+
+        out[GLOBAL_OFFSETS["turn"]] = min((game_state.turn or 0) / 100, 1.0)
+        out[GLOBAL_OFFSETS["can_terastallize"]] = float(bool(player.can_terastallize))
+        out[GLOBAL_OFFSETS["player_remaining"]] = sum(not self._fainted(p) for p in player.revealed_pokemon) / TEAM_SLOTS
+        unrevealed = max(TEAM_SLOTS - len(opponent.revealed_pokemon), 0)
+        out[GLOBAL_OFFSETS["opponent_remaining"]] = \
+            (sum(not self._fainted(p) for p in opponent.revealed_pokemon) + unrevealed) / TEAM_SLOTS
+
+        self._encode_side(out, PLAYER_OFFSET, player.active_pokemon, player.revealed_pokemon, opponent.active_pokemon)
+        self._encode_side(out, OPPONENT_OFFSET, opponent.active_pokemon, opponent.revealed_pokemon, player.active_pokemon)
+        return out
+
+    def encode_batch(self, game_states: Sequence[GameState], out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            if self.batch_buffer.shape[0] < len(game_states):
+                self.batch_buffer = np.zeros((len(game_states), OBSERVATION_SIZE), dtype=np.float32)
+            out = self.batch_buffer[:len(game_states)]
+        for row, game_state in zip(out, game_states):
+            self.encode(game_state, row)
+        return out
+
+    @staticmethod
+    def _fainted(pokemon: Pokemon) -> bool:
+        return pokemon.fainted or pokemon.hp_percentage == "fainted"
+
+    def _encode_side(self, out: np.ndarray, base: int, active: Optional[Pokemon], team: List[Pokemon],
+                     target: Optional[Pokemon]):
+        ordered = ([active] if active is not None else []) + [p for p in team if p is not active]
+        for slot, pokemon in enumerate(ordered[:TEAM_SLOTS]):
+            start = base + slot * POKEMON_SIZE
+            self._encode_pokemon(out[start:start + POKEMON_SIZE], pokemon, pokemon is active, target)
+
+    def _encode_pokemon(self, out: np.ndarray, pokemon: Pokemon, active: bool, target: Optional[Pokemon]):
+        o = POKEMON_OFFSETS
+        out[o["present"]] = 1.0
+        out[o["active"]] = float(active)
+        out[o["fainted"]] = float(self._fainted(pokemon))
+        out[o["hp"]] = hp_fraction(pokemon)
+        out[o["level"]] = (pokemon.level or 100) / 100
+
+        types = out[o["types"]]
+        for type_name in pokemon.current_types:
+            index = TYPE_INDEX.get(type_name.lower())
+            if index is not None:
+                types[index] = 1.0
+        tera = TYPE_INDEX.get((pokemon.tera_type or "").lower())
+        if tera is not None:
+            out[o["tera_type"].start + tera] = 1.0
+        out[o["terastallized"]] = float(pokemon.terastallized)
+
+        status, stages = out[o["status"]], out[o["stages"]]
+        for effect in pokemon.status_effects:
+            if effect in STATUSES:
+                status[STATUSES.index(effect)] = 1.0
+                continue
+            match = STAGE_PATTERN.match(effect)
+            if match:
+                stages[STAT_ORDER.index(match.group(2))] = int(match.group(1)) / 6
+
+        stats = pokemon.current_stats or pokemon.base_stats
+        if stats:
+            out[o["stats"]] = [stats.get(stat, 0) / 500 for stat in STAT_ORDER]
+
+        moves = [move for move in pokemon.moves if move.name != "Terastallize"][:MOVE_SLOTS]
+        defender_types = [TYPE_INDEX[t.lower()] for t in target.current_types if t.lower() in TYPE_INDEX] if target else []
+        for slot, move in enumerate(moves):
+            start = o["moves"].start + slot * MOVE_SIZE
+            self._encode_move(out[start:start + MOVE_SIZE], move, defender_types)
+
+    def _encode_move(self, out: np.ndarray, move: PokemonMove, defender_types: List[int]):
+        o = MOVE_OFFSETS
+        move_type, category, power, accuracy = move.type, move.category, move.power, move.accuracy
+        if move_type is None or category is None:
+            entry = self.move_dex.get(move.name)
+            if entry is not None:
+                move_type, category, power, accuracy = entry.type, entry.category, entry.power, entry.accuracy
+
+        out[o["present"]] = 1.0
+        type_index = TYPE_INDEX.get((move_type or "").lower())
+        if type_index is not None:
+            out[o["type"].start + type_index] = 1.0
+        if category and category.lower() in CATEGORIES:
+            out[o["category"].start + CATEGORIES.index(category.lower())] = 1.0
+        out[o["power"]] = (power or 0) / 150
+        out[o["accuracy"]] = accuracy / 100 if isinstance(accuracy, int) else 1.0
+        out[o["pp"]] = move.current_pp / move.max_pp if move.current_pp is not None and move.max_pp else 1.0
+
+        if type_index is not None and power and defender_types:
+            multiplier = 1.0
+            for defender in defender_types:
+                multiplier *= self._chart[type_index][defender]
+            # log2 keeps 0.25x..4x symmetric; immunities get the floor value
+            out[o["effectiveness"]] = max(np.log2(multiplier), -3.0) / 2 if multiplier > 0 else -1.5
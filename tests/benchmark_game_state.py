@@ -0,0 +1,142 @@
+"""Memory per stored GameState and cost per copy: the pre-series dataclasses against the slotted ones.
+
+Run with `python tests/benchmark_game_state.py`. The state is a 6v6 battle with four moves per Pokémon
+from the offline simulator's random teams. "baseline" are the plain (__dict__) dataclasses environment.py
+had before the state model moved to game_state.py; they have no turn logs or events, so they compare
+with snapshot(). "built" states are rebuilt from freshly parsed JSON each time, the way every refresh
+reads the battle, which is where interning pays off; the copies share their strings with the original.
+"""
+import copy
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState, Player, Pokemon, PokemonMove
+from offline_env import random_team
+
+STORED_STATES = 1000
+COPIES = 2000
+
+
+@dataclass
+class BaselineMove:
+    name: str
+    type: Optional[str] = None
+    category: Optional[str] = None
+    power: Optional[int] = None
+    accuracy: Optional[str] = None
+    current_pp: Optional[int] = None
+    max_pp: Optional[int] = None
+    description: Optional[str] = None
+    target: Optional[str] = None
+
+
+@dataclass
+class BaselinePokemon:
+    name: str
+    fainted: bool = False
+    level: Optional[int] = None
+    current_hp: Optional[int] = None
+    max_hp: Optional[int] = None
+    hp_percentage: Optional[str] = None
+    status_effects: List[str] = field(default_factory=list)
+    current_types: List[str] = field(default_factory=list)
+    terastallized: bool = False
+    tera_type: Optional[str] = None
+    base_types: List[str] = field(default_factory=list)
+    possible_abilities: List[str] = field(default_factory=list)
+    ability: Optional[str] = None
+    item: Optional[str] = None
+    base_stats: Optional[Dict[str, int]] = None
+    current_stats: Optional[Dict[str, int]] = None
+    opponent_speed_range: Optional[Tuple[int, int]] = None
+    moves: List[BaselineMove] = field(default_factory=list)
+
+
+@dataclass
+class BaselinePlayer:
+    name: str
+    revealed_pokemon: List[BaselinePokemon]
+    active_pokemon: Optional[BaselinePokemon]
+    can_terastallize: bool = True
+
+
+@dataclass
+class BaselineGameState:
+    player: BaselinePlayer
+    opponent: BaselinePlayer
+    turn: int
+    chat_log: str
+    last_update_failed: bool = False
+
+
+def battle_json() -> str:
+    # Every Pokémon and move revealed on both sides, as late in a battle
+    rng = random.Random(0)
+    teams = []
+    for team in (random_team(rng), random_team(rng)):
+        teams.append([{
+            "name": p.name, "level": p.level, "current_hp": p.current_hp, "max_hp": p.max_hp,
+            "hp_percentage": p.hp_percentage, "current_types": list(p.current_types), "tera_type": p.tera_type,
+            "base_types": list(p.base_types), "possible_abilities": list(p.possible_abilities),
+            "ability": p.ability, "item": p.item, "base_stats": dict(p.base_stats or {}),
+            "current_stats": dict(p.current_stats or p.base_stats or {}),
+            "moves": [{"name": m.name, "type": m.type, "category": m.category, "power": m.power,
+                       "accuracy": m.accuracy, "current_pp": m.current_pp, "max_pp": m.max_pp,
+                       "description": m.description} for m in p.moves],
+        } for p in team])
+    return json.dumps(teams)
+
+
+def build(raw: str, slotted: bool):
+    move_cls, pokemon_cls, player_cls = (PokemonMove, Pokemon, Player) if slotted else \
+        (BaselineMove, BaselinePokemon, BaselinePlayer)
+    players = []
+    for side, team in zip(("p1", "p2"), json.loads(raw)):
+        pokemon = [pokemon_cls(**{**p, "moves": [move_cls(**m) for m in p["moves"]]}) for p in team]
+        players.append(player_cls(side, pokemon, pokemon[0]))
+    if slotted:
+        turn_logs = {turn: [f"{players[0].active_pokemon.name} used a move!"] * 4 for turn in range(10)}
+        return GameState(players[0], players[1], turn=10, chat_log="", turn_logs=turn_logs)
+    return BaselineGameState(players[0], players[1], turn=10, chat_log="")
+
+
+def memory_per_state(make_state) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stored = [make_state() for _ in range(STORED_STATES)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del stored
+    return used / STORED_STATES
+
+
+def seconds_per_call(make_state) -> float:
+    return min(timeit.repeat(make_state, number=COPIES, repeat=5)) / COPIES
+
+
+def main():
+    raw = battle_json()
+    baseline, slotted = build(raw, slotted=False), build(raw, slotted=True)
+    variants = {
+        "baseline built": lambda: build(raw, slotted=False),
+        "slotted built": lambda: build(raw, slotted=True),
+        "baseline deepcopy": lambda: copy.deepcopy(baseline),
+        "slotted deepcopy": lambda: copy.deepcopy(slotted),
+        "clone": slotted.clone,
+        "snapshot": slotted.snapshot,
+    }
+    for name, make_state in variants.items():
+        print(f"{name:>17}: {memory_per_state(make_state) / 1024:6.1f} KB per state, "
+              f"{seconds_per_call(make_state) * 1e6:7.1f} us per state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from damage_calc import DamageCalculator
+from game_state import Pokemon, PokemonMove
+from move_dex import get_move_dex
+
+STATS = {"HP": 300, "Atk": 300, "Def": 250, "SpA": 300, "SpD": 250, "Spe": 250}
+
+
+def move(name: str) -> PokemonMove:
+    entry = get_move_dex().get(name)
+    return PokemonMove(name=entry.name, type=entry.type, category=entry.category, power=entry.power,
+                       accuracy=entry.accuracy)
+
+
+def pokemon(name: str, types, ability=None) -> Pokemon:
+    return Pokemon(name=name, level=100, current_types=list(types), base_types=list(types), ability=ability,
+                   base_stats=dict(STATS), max_hp=STATS["HP"], current_hp=STATS["HP"], hp_percentage="100")
+
+
+def dominated(attacker: Pokemon, names, target: Pokemon):
+    return DamageCalculator().matrix(attacker, [move(name) for name in names], [target]).dominated(0)
+
+
+@pytest.mark.parametrize("weaker", ["Extreme Speed", "U-turn", "Knock Off", "Body Slam"])
+def test_moves_with_effects_are_never_outdamaged(weaker):
+    attacker = pokemon("Snorlax", ["Normal"])
+    target = pokemon("Slowbro", ["Water", "Psychic"])
+    assert weaker not in dominated(attacker, [weaker, "Double-Edge"], target)
+
+
+@pytest.mark.parametrize("weaker", ["Nuzzle", "Volt Switch"])
+def test_electric_utility_moves_are_kept(weaker):
+    attacker = pokemon("Raichu", ["Electric"])
+    target = pokemon("Snorlax", ["Normal"])
+    assert weaker not in dominated(attacker, [weaker, "Double Shock"], target)
+
+
+@pytest.mark.parametrize("weaker", ["Scald", "Giga Drain"])
+def test_drain_and_secondary_effects_are_kept(weaker):
+    attacker = pokemon("Ludicolo", ["Water", "Grass"])
+    target = pokemon("Snorlax", ["Normal"])
+    assert weaker not in dominated(attacker, [weaker, "Wood Hammer", "Wave Crash"], target)
+
+
+def test_plain_damage_move_is_outdamaged():
+    attacker = pokemon("Snorlax", ["Normal"])
+    target = pokemon("Slowbro", ["Water", "Psychic"])
+    assert dominated(attacker, ["Tackle", "Double-Edge"], target) == {"Tackle": "always outdamaged by Double-Edge"}
+
+
+def test_immune_target_rules_out_any_move():
+    attacker = pokemon("Raichu", ["Electric"])
+    assert dominated(attacker, ["Volt Switch"], pokemon("Garchomp", ["Dragon", "Ground"])) == {"Volt Switch": "no effect"}
+    assert dominated(attacker, ["Nuzzle"], pokemon("Lanturn", ["Water", "Electric"], ability="Volt Absorb")) == \
+        {"Nuzzle": "no effect"}
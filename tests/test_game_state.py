@@ -0,0 +1,113 @@
+import dataclasses
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState, Player, Pokemon, PokemonMove
+
+
+def make_state() -> GameState:
+    def pokemon(name, moves):
+        return Pokemon(name=name, level=80, current_hp=250, max_hp=250, hp_percentage="100",
+                       status_effects=["+1 Atk"], current_types=["Water"], base_types=["Water"],
+                       possible_abilities=["Torrent"], ability="Torrent", item="Leftovers",
+                       base_stats={"HP": 250, "Atk": 200}, current_stats={"HP": 250, "Atk": 300},
+                       opponent_speed_range=(150, 200),
+                       moves=[PokemonMove(name=m, type="Water", category="Special", power=80, accuracy=100,
+                                          current_pp=16, max_pp=16) for m in moves])
+    ours = [pokemon("Vaporeon", ["Scald"]), pokemon("Milotic", ["Surf"])]
+    theirs = [pokemon("Gyarados", ["Waterfall"])]
+    return GameState(player=Player("p1", ours, ours[1]), opponent=Player("p2", theirs, theirs[0]), turn=3,
+                     chat_log="Turn 3", turn_logs={3: ["Turn 3"]}, events=["event"])
+
+
+def test_clone_copies_every_field():
+    state = make_state()
+    assert state.clone() == state
+    snapshot = state.snapshot()
+    assert (snapshot.turn_logs, snapshot.events) == ({}, [])
+    assert dataclasses.replace(snapshot, turn_logs=state.turn_logs, events=state.events) == state
+
+
+def test_clone_keeps_active_pokemon_in_the_copied_team():
+    clone = make_state().clone()
+    assert clone.player.active_pokemon is clone.player.revealed_pokemon[1]
+    assert clone.opponent.active_pokemon is clone.opponent.revealed_pokemon[0]
+
+
+def test_clone_isolates_moves():
+    state = make_state()
+    clone = state.clone()
+    clone.player.active_pokemon.moves[0].current_pp = 0
+    clone.player.active_pokemon.moves.append(PokemonMove(name="Recover"))
+    assert [(m.name, m.current_pp) for m in state.player.active_pokemon.moves] == [("Surf", 16)]
+
+
+def test_clone_isolates_revealed_pokemon():
+    state = make_state()
+    clone = state.clone()
+    clone.opponent.revealed_pokemon.append(Pokemon(name="Pelipper"))
+    clone.player.revealed_pokemon[0].fainted = True
+    assert [p.name for p in state.opponent.revealed_pokemon] == ["Gyarados"]
+    assert not state.player.revealed_pokemon[0].fainted
+
+
+def test_clone_isolates_stats_and_lists():
+    state = make_state()
+    clone = state.clone()
+    pokemon = clone.player.active_pokemon
+    pokemon.current_stats["Atk"] = 1
+    pokemon.status_effects.append("BRN")
+    pokemon.current_types.append("Flying")
+    pokemon.base_stats = {"HP": 1}
+    pokemon.base_types = ("Fire",)
+    original = state.player.active_pokemon
+    assert original.current_stats["Atk"] == 300 and original.base_stats == {"HP": 250, "Atk": 200}
+    assert original.status_effects == ["+1 Atk"]
+    assert (original.current_types, original.base_types) == (["Water"], ("Water",))
+
+
+def test_clone_shares_fields_that_rarely_change():
+    state = make_state()
+    original = state.player.active_pokemon
+    pokemon = state.clone().player.active_pokemon
+    assert pokemon.base_types is original.base_types
+    assert pokemon.possible_abilities is original.possible_abilities
+    assert pokemon.base_stats is original.base_stats
+    assert pokemon.moves[0].info is original.moves[0].info
+    with pytest.raises(TypeError):
+        pokemon.base_stats["Atk"] = 1
+    with pytest.raises(AttributeError):
+        pokemon.base_types.append("Flying")
+
+
+def test_move_edits_are_copy_on_write():
+    state = make_state()
+    move = state.clone().player.active_pokemon.moves[0]
+    move.power, move.current_pp, move.disabled = 120, 1, True
+    original = state.player.active_pokemon.moves[0]
+    assert (original.power, original.current_pp, original.disabled) == (80, 16, False)
+    assert PokemonMove(name="Surf", type="Water", category="Special", power=80, accuracy=100,
+                       max_pp=16).info is original.info
+
+
+def test_shared_fields_are_frozen_when_assigned_as_lists():
+    state = make_state()
+    original = state.player.active_pokemon
+    original.possible_abilities = ["Torrent", "Rain Dish"]
+    original.base_stats = {"HP": 250}
+    pokemon = state.clone().player.active_pokemon
+    assert pokemon.possible_abilities == ("Torrent", "Rain Dish")
+    assert pokemon.possible_abilities is original.possible_abilities
+    assert pokemon.base_stats is original.base_stats and pokemon.base_stats == {"HP": 250}
+
+
+def test_clone_isolates_logs_and_events():
+    state = make_state()
+    clone = state.clone()
+    clone.turn_logs[3].append("Vaporeon used Scald!")
+    clone.events.append("another")
+    assert state.turn_logs == {3: ["Turn 3"]} and state.events == ["event"]
@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous for a cold interpreter on CI; importing Selenium or LangChain alone blows well past it
+IMPORT_BUDGET_SECONDS = 1.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import game_state, environment
+elapsed = time.perf_counter() - start
+heavy = sorted({name.split(".")[0] for name in sys.modules if name.split(".")[0] in ("selenium", "langchain")})
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def _probe():
+    # A fresh interpreter, so nothing imported by pytest or other tests is already cached
+    result = subprocess.run([sys.executable, "-c", _PROBE], cwd=REPO_ROOT, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_data_model_stays_light():
+    probe = _probe()
+    assert probe["heavy"] == [], f"imported eagerly: {probe['heavy']}"
+
+
+def test_import_time_budget():
+    probe = _probe()
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS, f"import took {probe['elapsed']:.2f}s"
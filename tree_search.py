@@ -0,0 +1,290 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from decision_cache import canonical_state
+from game_state import GameState, Pokemon, PokemonMove
+from memory import count_message_tokens
+from type_chart import get_type_chart
+
+# Stand-in power when the opponent hasn't revealed a damaging move yet
+UNKNOWN_MOVE_POWER = 80
+
+
+@dataclass
+class Candidate:
+    """One line of play: our action, optionally with Terastallization, optionally followed by an opponent reply."""
+    action: Dict[str, str]
+    terastallize: bool = False
+    opponent_move: Optional[PokemonMove] = None
+
+    def describe(self) -> str:
+        if self.action["type"] == "move":
+            text = f"{'Terastallize and use' if self.terastallize else 'Use'} {self.action['move_name']}"
+        else:
+            text = f"Switch to {self.action['switch_name']}"
+        if self.opponent_move is not None:
+            text += f", opponent replies with {self.opponent_move.name}"
+        return text
+
+    def root(self) -> "Candidate":
+        return Candidate(self.action, self.terastallize)
+
+
+@dataclass
+class SearchResult:
+    candidate: Optional[Candidate]
+    score: Optional[float]
+    scores: Dict[str, float] = field(default_factory=dict)
+    evaluated: int = 0
+    cache_hits: int = 0
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+
+def state_key(game_state: GameState) -> str:
+    observation = {
+        "p1 Active Pokemon": game_state.player.active_pokemon,
+        "p2 Active Pokemon": game_state.opponent.active_pokemon,
+        "p1 Team Revealed": game_state.player.revealed_pokemon,
+        "p2 Team Revealed": game_state.opponent.revealed_pokemon,
+    }
+    payload = json.dumps(canonical_state(observation, game_state.player.can_terastallize), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def candidate_actions(game_state: GameState) -> List[Candidate]:
+    """Our legal choices: each move, each move with Terastallization, and each healthy switch."""
+    player = game_state.player
+    active = player.active_pokemon
+    candidates = []
+    if active is not None and not active.fainted:
+        for move in active.moves:
+            if move.name == "Terastallize" or move.current_pp == 0:
+                continue
+            candidates.append(Candidate({"type": "move", "move_name": move.name}))
+            if player.can_terastallize and not active.terastallized:
+                candidates.append(Candidate({"type": "move", "move_name": move.name}, terastallize=True))
+    # Same options get_switch_options reads off the switch menu, taken from the game state instead
+    for pokemon in player.revealed_pokemon:
+        if pokemon is active or pokemon.fainted or pokemon.hp_percentage == "fainted":
+            continue
+        candidates.append(Candidate({"type": "switch", "switch_name": pokemon.name}))
+    return candidates
+
+
+def opponent_replies(game_state: GameState) -> List[PokemonMove]:
+    opponent = game_state.opponent.active_pokemon
+    if opponent is None:
+        return []
+    known = [move for move in opponent.moves if move.category and move.category.lower() != "status" and move.power]
+    if known:
+        return known
+    # Nothing revealed yet: assume a STAB attack of each of its types
+    return [PokemonMove(name=f"an unknown {t}-type attack", type=t, category="physical", power=UNKNOWN_MOVE_POWER)
+            for t in opponent.current_types]
+
+
+class HeuristicEvaluator:
+    """Cheap evaluator from type matchups, base power, accuracy and STAB; no LLM calls.
+
+    Scores are our expected pressure minus the opponent's, in units of a 100 power neutral hit.
+    """
+
+    def __init__(self, type_chart=None):
+        self.type_chart = type_chart or get_type_chart()
+
+    def _our_pokemon(self, game_state: GameState, candidate: Candidate) -> Optional[Pokemon]:
+        if candidate.action["type"] == "switch":
+            return next((p for p in game_state.player.revealed_pokemon if p.name == candidate.action["switch_name"]), None)
+        return game_state.player.active_pokemon
+
+    def _hit(self, move: PokemonMove, attacker_types: List[str], defender_types: List[str]) -> float:
+        if not move.power or not move.category or move.category.lower() == "status":
+            return 0.0
+        accuracy = move.accuracy if isinstance(move.accuracy, int) else 100
+        stab = 1.5 if move.type in attacker_types else 1.0
+        return move.power / 100 * accuracy / 100 * stab * self.type_chart.effectiveness(move.type, defender_types)
+
+    def score(self, game_state: GameState, candidate: Candidate) -> float:
+        ours = self._our_pokemon(game_state, candidate)
+        opponent = game_state.opponent.active_pokemon
+        if ours is None or opponent is None:
+            return 0.0
+        our_types = list(ours.current_types)
+        attack_types = list(our_types)
+        if candidate.terastallize and ours.tera_type and ours.tera_type != "Unknown":
+            our_types = [ours.tera_type]
+            attack_types.append(ours.tera_type)
+
+        pressure = 0.0
+        if candidate.action["type"] == "move":
+            move = next((m for m in ours.moves if m.name == candidate.action["move_name"]), None)
+            if move is not None:
+                pressure = self._hit(move, attack_types, opponent.current_types)
+
+        replies = [candidate.opponent_move] if candidate.opponent_move is not None else opponent_replies(game_state)
+        threat = max((self._hit(move, opponent.current_types, our_types) for move in replies), default=0.0)
+        return pressure - 0.5 * threat
+
+    def __call__(self, game_state: GameState, candidates: List[Candidate]) -> List[float]:
+        return [self.score(game_state, candidate) for candidate in candidates]
+
+
+class LLMEvaluator:
+    """Scores a whole batch of lines with one LLM request, so a search turn costs a few parallel calls.
+
+    Requests go through Agent.request, so they hold an llm_semaphore slot and show up in token_usage.
+    """
+
+    PROMPT = ("You are evaluating lines of play in a Pokémon Showdown battle. Rate how good each line is for "
+              "us from 0 (losing) to 10 (winning). Reply with exactly one line per candidate in the form "
+              "'<number>: <score>' and nothing else.")
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    def __call__(self, game_state: GameState, candidates: List[Candidate]) -> List[float]:
+        observation = {
+            "turn": game_state.turn,
+            "chat_log": "",
+            "p1 Active Pokemon": game_state.player.active_pokemon,
+            "p2 Active Pokemon": game_state.opponent.active_pokemon,
+            "p1 Team Revealed": game_state.player.revealed_pokemon,
+            "p2 Team Revealed": game_state.opponent.revealed_pokemon,
+        }
+        lines = "\n".join(f"{i}. {candidate.describe()}" for i, candidate in enumerate(candidates, 1))
+        messages = [
+            {"role": "system", "content": self.PROMPT},
+            {"role": "user", "content": f"{self.agent.format_observation(observation, self.agent.env)}\n\nCandidates:\n{lines}"},
+        ]
+        usage = {"prompt_tokens": count_message_tokens(messages), "search": True}
+        with self.agent.usage_lock:
+            self.agent.token_usage.append(usage)
+        response = self.agent.request(messages, 0.0, usage) or ""
+        scores = [float("nan")] * len(candidates)
+        for index, score in re.findall(r"^\s*(\d+)\s*[:.)-]\s*([\d.]+)", response, re.MULTILINE):
+            if 1 <= int(index) <= len(candidates):
+                scores[int(index) - 1] = float(score)
+        return scores
+
+
+class LookaheadSearch:
+    """Scores our actions, then the best few against each opponent reply, under a wall-clock budget.
+
+    No successor states are generated: every line is scored from the current position, with the
+    opponent's reply attached at depth 2, and an action is worth its worst reply. `max_depth` is
+    therefore 1 (our actions only) or 2 (with replies).
+
+    Lines are scored in batches of `batch_size`, with up to `max_workers` batches in flight at once.
+    Scores are cached by (state, line), so searching the same position again (a repeated turn, another
+    battle) is free. When the budget runs out the best action found so far is returned (none if nothing
+    was scored in time).
+    """
+
+    def __init__(self, evaluator: Optional[Callable] = None, time_budget: float = 20.0, batch_size: int = 4,
+                 max_workers: int = 4, max_depth: int = 2, beam_width: int = 3, cache_size: int = 50000):
+        if max_depth not in (1, 2):
+            raise ValueError(f"max_depth must be 1 or 2, got {max_depth}")
+        self.evaluator = evaluator or HeuristicEvaluator()
+        self.time_budget = time_budget
+        self.batch_size = max(batch_size, 1)
+        self.max_workers = max(max_workers, 1)
+        self.max_depth = max_depth
+        self.beam_width = beam_width
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, float]" = OrderedDict()
+
+    def node_key(self, state: str, candidate: Candidate) -> str:
+        return f"{state}|{candidate.describe()}"
+
+    def _remember(self, key: str, score: float):
+        self.cache[key] = score
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def evaluate(self, game_state: GameState, state: str, candidates: List[Candidate], deadline: float,
+                 result: SearchResult) -> Dict[str, float]:
+        scores = {}
+        pending = []
+        for candidate in candidates:
+            key = self.node_key(state, candidate)
+            if key in scores:
+                continue
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                scores[key] = self.cache[key]
+                result.cache_hits += 1
+            elif candidate not in pending:
+                pending.append(candidate)
+        if not pending:
+            return scores
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches)))
+        futures = {executor.submit(self.evaluator, game_state, batch): batch for batch in batches}
+        try:
+            for future in as_completed(futures, timeout=max(deadline - time.time(), 0)):
+                batch = futures[future]
+                try:
+                    batch_scores = future.result()
+                except Exception as e:
+                    print(f"Lookahead evaluation failed: {str(e)}")
+                    continue
+                for candidate, score in zip(batch, batch_scores):
+                    if score == score:  # skip NaN (unparsed) scores
+                        key = self.node_key(state, candidate)
+                        scores[key] = score
+                        self._remember(key, score)
+                        result.evaluated += 1
+        except TimeoutError:
+            result.timed_out = True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return scores
+
+    def search(self, game_state: GameState, time_budget: Optional[float] = None) -> SearchResult:
+        start = time.time()
+        deadline = start + (self.time_budget if time_budget is None else time_budget)
+        result = SearchResult(candidate=None, score=None)
+        roots = candidate_actions(game_state)
+        if not roots:
+            return result
+        state = state_key(game_state)
+
+        scores = self.evaluate(game_state, state, roots, deadline, result)
+        values = {self.node_key(state, c): scores[self.node_key(state, c)] for c in roots
+                  if self.node_key(state, c) in scores}
+
+        replies = opponent_replies(game_state)
+        if self.max_depth == 2 and replies and values and time.time() < deadline:
+            # Expand the most promising actions against every opponent reply and back up the worst case
+            beam = sorted((c for c in roots if self.node_key(state, c) in values),
+                          key=lambda c: values[self.node_key(state, c)], reverse=True)[:self.beam_width]
+            children = [Candidate(c.action, c.terastallize, move) for c in beam for move in replies]
+            child_scores = self.evaluate(game_state, state, children, deadline, result)
+            backed_up = {}
+            for root in beam:
+                keys = {self.node_key(state, Candidate(root.action, root.terastallize, m)) for m in replies}
+                if all(key in child_scores for key in keys):
+                    backed_up[self.node_key(state, root)] = min(child_scores[key] for key in keys)
+            # Worst-case and one-ply scores aren't comparable, so once any root has been fully expanded
+            # only fully expanded roots compete
+            if backed_up:
+                values = backed_up
+
+        result.elapsed = time.time() - start
+        result.scores = values
+        if not values:
+            # Out of time before anything was scored: no candidate, so the caller falls back to the LLM
+            return result
+        best = max((c for c in roots if self.node_key(state, c) in values), key=lambda c: values[self.node_key(state, c)])
+        result.candidate = best
+        result.score = values[self.node_key(state, best)]
+        return result
@@ -0,0 +1,135 @@
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from data_bundle import DataBundle, get_bundle
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFENDING_CHART_PATH = os.path.join(DATA_DIR, "pokemon_defending_type_chart.json")
+
+TYPES = [
+    "Normal", "Fire", "Water", "Electric", "Grass", "Ice",
+    "Fighting", "Poison", "Ground", "Flying", "Psychic", "Bug",
+    "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy",
+]
+TYPE_INDEX: Dict[str, int] = {name.lower(): i for i, name in enumerate(TYPES)}
+
+# Extra row/column used for padding: "no move" gives NaN, "no second type" multiplies by 1
+NO_TYPE = len(TYPES)
+
+
+class TypeChart:
+    """Dense attacker x defender effectiveness matrix with vectorized matchup queries."""
+
+    def __init__(self, matrix: np.ndarray):
+        if matrix.shape != (len(TYPES), len(TYPES)):
+            raise ValueError(f"Expected a {len(TYPES)}x{len(TYPES)} matrix, got {matrix.shape}")
+        self.matrix = matrix.astype(np.float32)
+
+        padded = np.ones((NO_TYPE + 1, NO_TYPE + 1), dtype=np.float32)
+        padded[:NO_TYPE, :NO_TYPE] = self.matrix
+        padded[NO_TYPE, :] = np.nan
+        self._padded = padded
+
+    @classmethod
+    def from_json(cls, path: str = DEFENDING_CHART_PATH) -> "TypeChart":
+        # Only the 18 single-type rows are needed, dual types are the product of two columns
+        with open(path, "r", encoding="utf-8") as f:
+            defending_chart = json.load(f)
+
+        matrix = np.ones((len(TYPES), len(TYPES)), dtype=np.float32)
+        for defender in TYPES:
+            for attacker, multiplier in defending_chart[defender].items():
+                matrix[TYPE_INDEX[attacker.lower()], TYPE_INDEX[defender.lower()]] = multiplier
+        return cls(matrix)
+
+    @classmethod
+    def from_bundle(cls, bundle: DataBundle) -> "TypeChart":
+        # The bundle stores its own type order; map it onto TYPES
+        order = [TYPE_INDEX[name.lower()] for name in bundle.type_names]
+        matrix = np.ones((len(TYPES), len(TYPES)), dtype=np.float32)
+        matrix[np.ix_(order, order)] = bundle.type_matrix
+        return cls(matrix)
+
+    @staticmethod
+    def type_id(type_name: Optional[str]) -> int:
+        if not type_name:
+            return NO_TYPE
+        return TYPE_INDEX.get(type_name.strip().lower(), NO_TYPE)
+
+    def type_ids(self, types: Sequence[Optional[str]], width: int = 2) -> np.ndarray:
+        ids = [self.type_id(t) for t in types[:width]]
+        ids += [NO_TYPE] * (width - len(ids))
+        return np.array(ids, dtype=np.intp)
+
+    def effectiveness(self, move_type: Optional[str], defender_types: Sequence[str]) -> float:
+        """Multiplier of a move of `move_type` against a Pokémon with `defender_types`."""
+        attacker = self.type_id(move_type)
+        if attacker == NO_TYPE:
+            return 1.0
+        d1, d2 = self.type_ids(defender_types)
+        return float(self._padded[attacker, d1] * self._padded[attacker, d2])
+
+    def effectiveness_batch(self, move_ids: np.ndarray, defender_ids: np.ndarray) -> np.ndarray:
+        """Broadcasted lookup: move_ids of any shape against defender_ids of shape (..., 2)."""
+        return self._padded[move_ids, defender_ids[..., 0]] * self._padded[move_ids, defender_ids[..., 1]]
+
+    def encode_moves(self, move_types: Sequence[Sequence[Optional[str]]], max_moves: int = 4) -> np.ndarray:
+        # (attackers, max_moves) move-type ids, padded with NO_TYPE
+        ids = np.full((len(move_types), max_moves), NO_TYPE, dtype=np.intp)
+        for i, types in enumerate(move_types):
+            for j, move_type in enumerate(types[:max_moves]):
+                ids[i, j] = self.type_id(move_type)
+        return ids
+
+    def encode_defenders(self, defender_types: Sequence[Sequence[Optional[str]]]) -> np.ndarray:
+        # (defenders, 2) type ids, single types padded with NO_TYPE
+        return np.stack([self.type_ids(types) for types in defender_types]) if defender_types \
+            else np.empty((0, 2), dtype=np.intp)
+
+    def matchup_grid(
+        self,
+        move_types: Sequence[Sequence[Optional[str]]],
+        defender_types: Sequence[Sequence[Optional[str]]],
+        defender_tera_types: Optional[Sequence[Optional[str]]] = None,
+        max_moves: int = 4,
+    ) -> np.ndarray:
+        """Team-vs-team effectiveness in one call.
+
+        Returns shape (attackers, max_moves, defenders) or, when tera types are given,
+        (attackers, max_moves, defenders, 2) where the last axis is [base types, terastallized].
+        Padded move slots are NaN, as is the tera column for defenders with an unknown tera type.
+        """
+        move_ids = self.encode_moves(move_types, max_moves)[:, :, None]
+        defender_ids = self.encode_defenders(defender_types)[None, None, :, :]
+        grid = self.effectiveness_batch(move_ids, defender_ids)
+        if defender_tera_types is None:
+            return grid
+
+        tera_ids = np.array([self.type_id(t) for t in defender_tera_types], dtype=np.intp)
+        tera_grid = self._padded[move_ids, tera_ids[None, None, :]]
+        tera_grid = np.where(tera_ids[None, None, :] == NO_TYPE, np.nan, tera_grid)
+        return np.stack([grid, tera_grid], axis=-1)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            attacker: {defender: float(self.matrix[i, j]) for j, defender in enumerate(TYPES)}
+            for i, attacker in enumerate(TYPES)
+        }
+
+
+@lru_cache(maxsize=None)
+def get_type_chart(path: Optional[str] = None) -> TypeChart:
+    if path is None:
+        return TypeChart.from_bundle(get_bundle())
+    return TypeChart.from_json(path)
+
+
+def format_effectiveness(multiplier: float) -> str:
+    if np.isnan(multiplier):
+        return "N/A"
+    return f"{multiplier:g}x"
+
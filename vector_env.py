@@ -0,0 +1,243 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from state_encoder import StateEncoder
+
+
+def _run_action(env, action):
+    # Ints index into env.legal_actions(); a "terastallize" flag runs the two-step browser flow
+    if isinstance(action, (int, np.integer)):
+        action = env.legal_actions(0)[int(action)]
+    if action.get("terastallize") and action["type"] == "move":
+        env.step({"type": "move", "move_name": "Terastallize"})
+        action = {key: value for key, value in action.items() if key != "terastallize"}
+    result = env.step(action)
+    if not isinstance(result, tuple):
+        # A message instead of a transition (e.g. the Terastallize confirmation)
+        return None, 0.0, False, {"action_result": result}
+    return result
+
+
+def _info_for(env, info: Dict[str, Any]) -> Dict[str, Any]:
+    if hasattr(env, "legal_actions") and not getattr(env, "done", False):
+        info["legal_actions"] = env.legal_actions(0)
+    return info
+
+
+def _worker(env_fns: Dict[int, Callable], encoder: Callable, names: Dict[str, str], n_envs: int,
+            observation_size: int, auto_reset: bool, pipe):
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    observations = np.ndarray((n_envs, observation_size), dtype=np.float32, buffer=blocks["observations"].buf)
+    rewards = np.ndarray((n_envs,), dtype=np.float32, buffer=blocks["rewards"].buf)
+    dones = np.ndarray((n_envs,), dtype=np.bool_, buffer=blocks["dones"].buf)
+    envs = {}
+
+    def reset(index):
+        env = envs[index]
+        env.reset()
+        observations[index] = encoder(env.game_state)
+        rewards[index], dones[index] = 0.0, False
+        return _info_for(env, {})
+
+    def step(index, action):
+        env = envs[index]
+        _, reward, done, info = _run_action(env, action)
+        info = dict(info or {})
+        observations[index] = encoder(env.game_state)
+        rewards[index], dones[index] = reward, done
+        if done and auto_reset:
+            # Gym convention: hand back the last observation and start the next battle
+            info["final_observation"] = observations[index].copy()
+            env.close()
+            env.reset()
+            observations[index] = encoder(env.game_state)
+        return _info_for(env, info)
+
+    try:
+        envs = {index: env_fn() for index, env_fn in env_fns.items()}
+        while True:
+            command, data = pipe.recv()
+            try:
+                if command == "reset":
+                    pipe.send(("ok", [reset(index) for index in data]))
+                elif command == "step":
+                    pipe.send(("ok", [step(index, action) for index, action in data]))
+                elif command == "call":
+                    name, args, kwargs = data
+                    pipe.send(("ok", [getattr(envs[index], name)(*args, **kwargs) for index in sorted(envs)]))
+                elif command == "close":
+                    pipe.send(("ok", None))
+                    break
+            except Exception:
+                pipe.send(("error", traceback.format_exc()))
+    finally:
+        for env in envs.values():
+            for method in ("close", "shutdown"):
+                try:
+                    getattr(env, method, lambda: None)()
+                except Exception:
+                    pass
+        for block in blocks.values():
+            block.close()
+
+
+class VectorPokemonEnv:
+    """Runs N environments in subprocess workers and returns stacked NumPy arrays.
+
+    `env_fns` build one environment each inside its worker, so browser drivers are never pickled.
+    Any backend with reset/step/game_state works. `encoder(game_state)` turns the state into a float32
+    vector of length `observation_size` (StateEncoder by default), which the worker writes straight into
+    a shared-memory buffer.
+    Only actions and small info dicts go through the pipes. Environments are spread over `num_workers`
+    processes (one each by default), and each worker gets one message per batch.
+
+    step() advances all environments in lockstep. step_async()/poll()/step_wait() let slow backends
+    such as the browser be stepped independently. Async readiness is tracked per worker.
+    """
+
+    def __init__(self, env_fns: Sequence[Callable], encoder: Optional[Callable] = None,
+                 observation_size: Optional[int] = None, num_workers: Optional[int] = None, auto_reset: bool = True,
+                 start_method: Optional[str] = None):
+        if encoder is None:
+            encoder = StateEncoder()
+        if observation_size is None:
+            observation_size = encoder.size
+        self.n_envs = len(env_fns)
+        self.observation_size = observation_size
+        self.num_workers = max(1, min(num_workers or self.n_envs, self.n_envs))
+        context = mp.get_context(start_method)
+
+        sizes = {
+            "observations": self.n_envs * observation_size * np.dtype(np.float32).itemsize,
+            "rewards": self.n_envs * np.dtype(np.float32).itemsize,
+            "dones": self.n_envs * np.dtype(np.bool_).itemsize,
+        }
+        self._blocks = {key: shared_memory.SharedMemory(create=True, size=max(size, 1)) for key, size in sizes.items()}
+        self.observations = np.ndarray((self.n_envs, observation_size), dtype=np.float32,
+                                       buffer=self._blocks["observations"].buf)
+        self.rewards = np.ndarray((self.n_envs,), dtype=np.float32, buffer=self._blocks["rewards"].buf)
+        self.dones = np.ndarray((self.n_envs,), dtype=np.bool_, buffer=self._blocks["dones"].buf)
+        self.observations[:] = 0
+        self.rewards[:] = 0
+        self.dones[:] = False
+
+        # Environment i lives in worker i % num_workers
+        self.worker_of = [index % self.num_workers for index in range(self.n_envs)]
+        names = {key: block.name for key, block in self._blocks.items()}
+        self._pipes = []
+        self._processes = []
+        for worker in range(self.num_workers):
+            parent, child = context.Pipe()
+            assigned = {index: env_fns[index] for index in range(self.n_envs) if self.worker_of[index] == worker}
+            process = context.Process(
+                target=_worker,
+                args=(assigned, encoder, names, self.n_envs, observation_size, auto_reset, child),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        # worker -> env indices of the batch it is currently stepping
+        self._waiting: Dict[int, List[int]] = {}
+        self._infos: Dict[int, Dict[str, Any]] = {}
+        self.closed = False
+
+    def _receive(self, worker: int):
+        status, payload = self._pipes[worker].recv()
+        if status == "error":
+            raise RuntimeError(f"Worker {worker} failed:\n{payload}")
+        return payload
+
+    def _group(self, indices: Sequence[int], items: Sequence[Any]) -> Dict[int, List[Any]]:
+        groups: Dict[int, List[Any]] = {}
+        for index, item in zip(indices, items):
+            groups.setdefault(self.worker_of[index], []).append(item)
+        return groups
+
+    def reset(self, indices: Optional[Sequence[int]] = None):
+        indices = list(range(self.n_envs) if indices is None else indices)
+        groups = self._group(indices, indices)
+        for worker, batch in groups.items():
+            self._pipes[worker].send(("reset", batch))
+        infos = {}
+        for worker, batch in groups.items():
+            infos.update(zip(batch, self._receive(worker)))
+        return self.observations.copy(), [infos[index] for index in indices]
+
+    def step_async(self, actions: Sequence[Any], indices: Optional[Sequence[int]] = None):
+        indices = list(range(self.n_envs) if indices is None else indices)
+        if len(actions) != len(indices):
+            raise ValueError(f"Expected {len(indices)} actions, got {len(actions)}")
+        groups = self._group(indices, list(zip(indices, actions)))
+        busy = [worker for worker in groups if worker in self._waiting]
+        if busy:
+            raise RuntimeError(f"Workers {busy} are still stepping; collect them with step_wait first")
+        for worker, batch in groups.items():
+            self._pipes[worker].send(("step", batch))
+            self._waiting[worker] = [index for index, _ in batch]
+
+    def poll(self, timeout: float = 0.0) -> List[int]:
+        # Environments whose step has finished and can be collected with step_wait
+        workers = list(self._waiting)
+        ready = mp.connection.wait([self._pipes[w] for w in workers], timeout=timeout)
+        return [index for w in workers if self._pipes[w] in ready for index in self._waiting[w]]
+
+    def step_wait(self, indices: Optional[Sequence[int]] = None):
+        if indices is None:
+            indices = [index for batch in self._waiting.values() for index in batch]
+        indices = list(indices)
+        for worker in {self.worker_of[index] for index in indices}:
+            if worker in self._waiting:
+                batch = self._waiting.pop(worker)
+                self._infos.update(zip(batch, self._receive(worker)))
+        infos = [self._infos.pop(index, {}) for index in indices]
+        return (self.observations[indices].copy(), self.rewards[indices].copy(),
+                self.dones[indices].copy(), infos)
+
+    def step(self, actions: Sequence[Any]):
+        self.step_async(actions)
+        return self.step_wait(list(range(self.n_envs)))
+
+    def call(self, name: str, *args, **kwargs) -> List[Any]:
+        # Run a method on every environment, e.g. call("legal_actions", 0)
+        for pipe in self._pipes:
+            pipe.send(("call", (name, args, kwargs)))
+        results = {}
+        for worker in range(self.num_workers):
+            batch = [index for index in range(self.n_envs) if self.worker_of[index] == worker]
+            results.update(zip(batch, self._receive(worker)))
+        return [results[index] for index in range(self.n_envs)]
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for worker in list(self._waiting):
+            try:
+                self._receive(worker)
+            except Exception:
+                pass
+        for pipe in self._pipes:
+            try:
+                pipe.send(("close", None))
+                pipe.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self._processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,422 @@
+import asyncio
+import json
+import logging
+import threading
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, Optional
+
+import websockets
+
+from battle_log import BattleLogReader
+from battle_protocol import ProtocolParser, RequestEvent, describe_event
+from battle_tracker import BattleStateTracker
+from environment import DEFAULT_TIMEOUTS
+from move_dex import normalize_name
+from species_dex import SpeciesDex, get_species_dex
+
+SHOWDOWN_URL = "wss://sim3.psim.us/showdown/websocket"
+LOCAL_SHOWDOWN_URL = "ws://localhost:8000/showdown/websocket"
+LOGIN_SERVER_URL = "https://play.pokemonshowdown.com/api/login"
+ASSERTION_URL = "https://play.pokemonshowdown.com/action.php"
+
+# The server sends our request before the battle update it belongs to; if no update follows
+# within this many seconds the request is treated as complete anyway
+REQUEST_GRACE = 0.5
+
+
+class ShowdownConnection:
+    """One logged-in WebSocket connection, shared by every battle of the same account.
+
+    Incoming messages are routed to per-room queues, so dozens of battles can run
+    concurrently over a single socket on one event loop. A connection is only shared once it is open;
+    a rejected login or a dead reader fails every waiter and evicts it, so the next env starts afresh.
+    """
+
+    _connections: Dict[tuple, "ShowdownConnection"] = {}
+    _connect_locks: Dict[tuple, asyncio.Lock] = {}
+
+    def __init__(self, url: str, username: str, password: Optional[str], login_server: Optional[str]):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.login_server = login_server
+        self.websocket = None
+        self.logged_in = asyncio.Event()
+        # Set on login and on failure, so waiters wake up either way
+        self.ready = asyncio.Event()
+        self.failure: Optional[Exception] = None
+        self.room_queues: Dict[str, asyncio.Queue] = {}
+        self.left_rooms = set()
+        self.new_rooms: asyncio.Queue = asyncio.Queue()
+        self.challenges: asyncio.Queue = asyncio.Queue()
+        self.search_lock = asyncio.Lock()
+        self.users = 0
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def get(cls, url: str, username: str, password: Optional[str],
+                  login_server: Optional[str] = LOGIN_SERVER_URL,
+                  login_timeout: float = DEFAULT_TIMEOUTS["login"]) -> "ShowdownConnection":
+        loop = asyncio.get_running_loop()
+        key = (id(loop), url, username.lower())
+        # Envs of the same account connect one at a time, so only one socket is opened for them
+        async with cls._connect_locks.setdefault(key, asyncio.Lock()):
+            connection = cls._connections.get(key)
+            if connection is None:
+                connection = cls(url, username, password, login_server)
+                await connection.connect()
+                cls._connections[key] = connection
+            connection.users += 1
+        try:
+            await asyncio.wait_for(connection.ready.wait(), login_timeout)
+        except asyncio.TimeoutError:
+            connection.fail(TimeoutError(f"Login as {username} timed out after {login_timeout}s"))
+        try:
+            if connection.failure is not None:
+                raise connection.failure
+        except BaseException:
+            await connection.release()
+            raise
+        return connection
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, max_size=None)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def send(self, message: str, room: str = ""):
+        await self.websocket.send(f"{room}|{message}")
+
+    async def release(self):
+        self.users -= 1
+        if self.users <= 0:
+            self._evict()
+            if self._reader:
+                self._reader.cancel()
+            await self.websocket.close()
+
+    def _evict(self):
+        for key, connection in list(self._connections.items()):
+            if connection is self:
+                del self._connections[key]
+
+    def fail(self, error: Exception):
+        # Raised to everyone waiting in get(); later envs for this account open a new connection
+        if self.failure is None:
+            self.failure = error
+        self._evict()
+        self.ready.set()
+
+    def room_queue(self, room_id: str) -> asyncio.Queue:
+        return self.room_queues.setdefault(room_id, asyncio.Queue())
+
+    async def _read_loop(self):
+        try:
+            await self._read_messages()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Showdown connection for {self.username} failed: {str(e)}")
+            self.fail(e)
+        else:
+            self.fail(ConnectionError(f"Showdown closed the connection for {self.username}"))
+
+    async def _read_messages(self):
+        async for message in self.websocket:
+            room_id = ""
+            if message.startswith(">"):
+                room_id, _, message = message[1:].partition("\n")
+                room_id = room_id.strip()
+
+            if room_id.startswith("battle-"):
+                if room_id in self.left_rooms:
+                    continue
+                if room_id not in self.room_queues:
+                    # First message of a new battle (usually our request, before |init|)
+                    self.room_queue(room_id)
+                    await self.new_rooms.put(room_id)
+                await self.room_queues[room_id].put(message)
+                continue
+
+            for line in message.split("\n"):
+                await self._handle_global(line)
+
+    async def _handle_global(self, line: str):
+        if line.startswith("|challstr|"):
+            await self._login(line[len("|challstr|"):])
+        elif line.startswith("|updateuser|"):
+            name = line.split("|")[2].strip()
+            if normalize_name(name) == normalize_name(self.username):
+                self.logged_in.set()
+                self.ready.set()
+        elif line.startswith("|updatechallenges|"):
+            challenges = json.loads(line[len("|updatechallenges|"):])
+            for challenger, battle_format in challenges.get("challengesFrom", {}).items():
+                await self.challenges.put((challenger, battle_format))
+        elif line.startswith("|nametaken|"):
+            self.fail(ConnectionError(f"Login as {self.username} rejected: {line.split('|', 3)[-1]}"))
+        elif line.startswith("|popup|"):
+            popup = line[len("|popup|"):]
+            logging.error(f"Showdown popup: {popup}")
+            if not self.logged_in.is_set():
+                # Before login, a popup means the server turned the login down
+                self.fail(ConnectionError(f"Login as {self.username} rejected: {popup}"))
+
+    async def _login(self, challstr: str):
+        if self.login_server is None:
+            # Local servers with noguestsecurity accept names without an assertion
+            await self.send(f"/trn {self.username}")
+            return
+        assertion = await asyncio.to_thread(self._fetch_assertion, challstr)
+        await self.send(f"/trn {self.username},0,{assertion}")
+
+    def _fetch_assertion(self, challstr: str) -> str:
+        if self.password:
+            data = urllib.parse.urlencode({
+                "name": self.username, "pass": self.password, "challstr": challstr,
+            }).encode()
+            with urllib.request.urlopen(self.login_server, data=data, timeout=30) as response:
+                body = response.read().decode()
+            return json.loads(body[1:])["assertion"]  # Response is prefixed with "]"
+        query = urllib.parse.urlencode({
+            "act": "getassertion", "userid": normalize_name(self.username), "challstr": challstr,
+        })
+        with urllib.request.urlopen(f"{ASSERTION_URL}?{query}", timeout=30) as response:
+            return response.read().decode()
+
+
+class AsyncShowdownEnv:
+    """Browserless battle environment speaking the Showdown WebSocket protocol directly.
+
+    Mirrors PokemonShowdownEnv's reset()/step()/get_observation()/close() contract as coroutines.
+    `mode` is "search" (ladder), "challenge" (challenge `opponent`) or "accept" (wait for a challenge).
+    Types, abilities and stats come from `species_dex`; without one the constructor raises, since every
+    Pokémon would otherwise be typeless.
+    """
+
+    def __init__(self, username, password=None, url: str = SHOWDOWN_URL, battle_format: str = "gen9randombattle",
+                 mode: str = "search", opponent: Optional[str] = None, login_server: Optional[str] = LOGIN_SERVER_URL,
+                 species_dex: Optional[SpeciesDex] = None, timeouts: Optional[Dict[str, float]] = None):
+        self.username = username
+        self.password = password
+        self.url = url
+        self.battle_format = battle_format
+        self.mode = mode
+        self.opponent = opponent
+        self.login_server = login_server
+        self.species_dex = species_dex if species_dex is not None else get_species_dex()
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.connection: Optional[ShowdownConnection] = None
+        self.room_id: Optional[str] = None
+        self.pending_terastallize = False
+        self._new_battle()
+
+    def _new_battle(self):
+        self.tracker = BattleStateTracker(species_dex=self.species_dex)
+        self.game_state = self.tracker.game_state
+        self.parser = ProtocolParser()
+        self.log_reader = BattleLogReader(self.game_state.turn_logs)
+        self.request: Optional[Dict[str, Any]] = None
+        self.request_updated = False
+        self.last_rqid = None
+
+    async def reset(self):
+        if self.room_id:
+            await self.leave_battle()
+        self._new_battle()
+        if self.connection is None:
+            self.connection = await ShowdownConnection.get(self.url, self.username, self.password, self.login_server,
+                                                           self.timeouts["login"])
+
+        self.room_id = await self.find_battle()
+        await self.wait_for_request(self.timeouts["match"])
+        return self.get_observation()
+
+    async def find_battle(self) -> str:
+        connection = self.connection
+        # new_rooms is shared by every env on the connection (and only one search per format is allowed
+        # per account), so finding a battle is serialized or two envs could take each other's rooms
+        async with connection.search_lock:
+            if self.mode == "accept":
+                challenger, _ = await asyncio.wait_for(connection.challenges.get(), self.timeouts["match"])
+                await connection.send("/utm null")
+                await connection.send(f"/accept {challenger}")
+            else:
+                await connection.send("/utm null")
+                if self.mode == "challenge":
+                    await connection.send(f"/challenge {self.opponent}, {self.battle_format}")
+                else:
+                    await connection.send(f"/search {self.battle_format}")
+            room_id = await asyncio.wait_for(connection.new_rooms.get(), self.timeouts["match"])
+        print(f"Match found: {room_id}")
+        return room_id
+
+    def _process(self, message: str):
+        for line in message.split("\n"):
+            if not line.strip():
+                continue
+            for event in self.parser.feed(line):
+                self.game_state.events.append(event)
+                self.tracker.apply(event)
+                if isinstance(event, RequestEvent):
+                    self.request = event.request
+                    self.request_updated = False
+                    continue
+                line_text = describe_event(event, self.tracker.player_side, self.tracker.player_names)
+                if line_text:
+                    self.log_reader.feed([line_text])
+            if not line.startswith("|request|"):
+                self.request_updated = True
+
+    def _ready(self) -> bool:
+        if self.tracker.finished:
+            return True
+        request = self.request
+        if not request or request.get("wait") or not self.request_updated:
+            return False
+        return request.get("rqid") != self.last_rqid
+
+    async def wait_for_request(self, timeout: float) -> bool:
+        queue = self.connection.room_queue(self.room_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self._ready():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            waiting_on_update = self.request is not None and not self.request_updated
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), min(remaining, REQUEST_GRACE) if waiting_on_update else remaining
+                )
+            except asyncio.TimeoutError:
+                if waiting_on_update:
+                    self.request_updated = True
+                    continue
+                return False
+            self._process(message)
+            # Drain anything else that already arrived before checking readiness
+            while not queue.empty():
+                self._process(queue.get_nowait())
+        return True
+
+    def get_observation(self):
+        turn = self.game_state.turn
+        self.game_state.chat_log = self.log_reader.turn_text(turn - 1 if turn > 1 else 0)
+        return {
+            "chat_log": self.game_state.chat_log,
+            self.game_state.player.name + " Active Pokemon": self.game_state.player.active_pokemon,
+            self.game_state.opponent.name + " Active Pokemon": self.game_state.opponent.active_pokemon,
+            self.game_state.player.name + " Team Revealed": self.game_state.player.revealed_pokemon,
+            self.game_state.opponent.name + " Team Revealed": self.game_state.opponent.revealed_pokemon,
+            "turn": turn
+        }
+
+    def choice_for(self, action) -> str:
+        request = self.request or {}
+        if action["type"] == "move":
+            active = (request.get("active") or [{}])[0]
+            move_id = normalize_name(action["move_name"])
+            for i, move in enumerate(active.get("moves", []), 1):
+                if normalize_name(move["move"]) == move_id or move.get("id") == move_id:
+                    if move.get("disabled"):
+                        raise ValueError(f"Cannot select {action['move_name']} as it is disabled")
+                    return f"move {i}" + (" terastallize" if self.pending_terastallize else "")
+            raise ValueError(f"Could not find move: {action['move_name']}")
+        if action["type"] == "switch":
+            target = normalize_name(action["switch_name"])
+            for i, pokemon in enumerate(request.get("side", {}).get("pokemon", []), 1):
+                name = pokemon["ident"].split(": ", 1)[1]
+                if normalize_name(name) == target:
+                    if pokemon.get("active") or pokemon["condition"].endswith("fnt"):
+                        raise ValueError(f"Cannot switch to {action['switch_name']} as it is fainted or active")
+                    return f"switch {i}"
+            raise ValueError(f"Could not find {action['switch_name']} in the switch options")
+        raise ValueError(f"Invalid action type: {action['type']}")
+
+    async def step(self, action):
+        if action["type"] == "move" and action["move_name"] == "Terastallize":
+            # Same two-step flow as the browser: flag tera now, submit it with the next move
+            if not self.game_state.player.can_terastallize:
+                return "Cannot terastallize as you are already terastallized"
+            self.pending_terastallize = True
+            active = self.game_state.player.active_pokemon
+            return f"You have selected to terastallize {active.name} into the {active.tera_type} type."
+
+        try:
+            choice = self.choice_for(action)
+        except ValueError as e:
+            return self.get_observation(), 0, False, {"action_result": str(e)}
+
+        rqid = self.request.get("rqid")
+        await self.connection.send(f"/choose {choice}|{rqid}", self.room_id)
+        self.last_rqid = rqid
+        self.pending_terastallize = False
+
+        if not await self.wait_for_request(self.timeouts["turn"]):
+            print("Timeout waiting for turn completion")
+
+        observation = self.get_observation()
+        return observation, self.calculate_reward(observation), self.is_game_over(), {"action_result": choice}
+
+    def is_game_over(self) -> bool:
+        return self.tracker.finished
+
+    def calculate_reward(self, observation):
+        # +1 for a win, -1 for a loss, 0 while the battle is running or on a tie
+        if not self.tracker.finished or self.tracker.winner is None:
+            return 0
+        return 1 if normalize_name(self.tracker.winner) == normalize_name(self.username) else -1
+
+    async def leave_battle(self):
+        if not self.tracker.finished:
+            await self.connection.send("/forfeit", self.room_id)
+        await self.connection.send(f"/leave {self.room_id}")
+        self.connection.left_rooms.add(self.room_id)
+        self.connection.room_queues.pop(self.room_id, None)
+        self.room_id = None
+
+    async def close(self):
+        if self.connection is None:
+            return
+        if self.room_id:
+            await self.leave_battle()
+        await self.connection.release()
+        self.connection = None
+
+
+class _BackgroundLoop:
+    # Single event loop thread shared by every synchronous env in the process
+    _lock = threading.Lock()
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def run(cls, coroutine):
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, daemon=True, name="showdown-ws").start()
+        return asyncio.run_coroutine_threadsafe(coroutine, cls._loop).result()
+
+
+class ShowdownWebSocketEnv:
+    """Synchronous facade over AsyncShowdownEnv so Agent.battle_loop can use either backend."""
+
+    def __init__(self, username, password=None, **kwargs):
+        self.async_env = AsyncShowdownEnv(username, password, **kwargs)
+
+    @property
+    def game_state(self):
+        return self.async_env.game_state
+
+    def reset(self):
+        return _BackgroundLoop.run(self.async_env.reset())
+
+    def step(self, action):
+        return _BackgroundLoop.run(self.async_env.step(action))
+
+    def get_observation(self):
+        return self.async_env.get_observation()
+
+    def close(self):
+        _BackgroundLoop.run(self.async_env.close())